@@ -36,6 +36,9 @@ POOL_COMMAND_TIMEOUT = 5.0  # Düşürüldü - Hızlı query timeout
 POOL_STATEMENT_CACHE_SIZE = 0  # PgBouncer için zorunlu
 POOL_ACQUIRE_TIMEOUT = 2.0  # Connection acquire timeout
 
+# Çekiliş katılımcıları cursor'dan bu kadar satırlık parçalarla okunur
+WINNER_CURSOR_PREFETCH = 1000
+
 async def get_db_pool():
     """Ultra-fast database pool - Performance optimized"""
     global db_pool
@@ -260,6 +263,27 @@ async def init_database() -> bool:
         # Dinamik komutlar tablosunu oluştur
         await create_custom_commands_table()
         
+        # Gecikmeli aksiyonlar tablosunu oluştur
+        await create_delayed_actions_table()
+        
+        # FSM / konuşma durumu tablosunu oluştur
+        await create_fsm_storage_table()
+        
+        # Tekil arka plan işleri için lider lease tablosu
+        await create_leader_leases_table()
+        
+        # Worker'lar arası paylaşılan cooldown'lar (bot geneli sohbet cevabı)
+        await create_shared_cooldowns_table()
+        
+        # Tekil aktif kullanıcı sayaçları (HyperLogLog register'ları)
+        await create_activity_sketches_table()
+        
+        # Etkinlik katılımcı sayacı / ödül havuzu sütunları
+        await create_event_counter_columns()
+        
+        # Sayfalı listeler için (zaman, id) indeksleri
+        await create_list_indexes()
+        
         # Test verilerini ekle
         await insert_test_data()
         
@@ -423,7 +447,9 @@ async def create_tables() -> None:
                     created_at TIMESTAMP DEFAULT NOW(),
                     ends_at TIMESTAMP,
                     winner_count INTEGER DEFAULT 1,
-                    group_id BIGINT
+                    group_id BIGINT,
+                    participant_count INTEGER NOT NULL DEFAULT 0,
+                    total_pool DECIMAL(12,2) NOT NULL DEFAULT 0
                 )
             """)
             
@@ -633,14 +659,20 @@ async def register_user(user_id: int) -> bool:
     try:
         async with db_pool.acquire() as conn:
             # Kullanıcıyı kayıtlı olarak işaretle
-            result = await conn.execute("""
+            row = await conn.fetchrow("""
                 UPDATE users 
                 SET is_registered = TRUE, 
                     registration_date = NOW(),
                     last_activity = NOW()
                 WHERE user_id = $1
+                RETURNING kirve_points, total_messages, first_name, username
             """, user_id)
             
+            if row:
+                from utils.rank_index import user_rank_index
+                user_rank_index.set_name(user_id, row['first_name'], row['username'])
+                user_rank_index.set_user(user_id, row['kirve_points'] or 0, row['total_messages'] or 0)
+            
             return True
             
     except Exception as e:
@@ -702,6 +734,9 @@ async def unregister_user(user_id: int) -> bool:
                 WHERE user_id = $1
             """, user_id)
             
+            from utils.rank_index import user_rank_index
+            user_rank_index.remove_user(user_id)
+            
             logger.info(f"🗑️ Kullanıcı kaydı silindi - User: {user_id}")
             return True
             
@@ -949,6 +984,10 @@ async def add_points_to_user(user_id: int, points: float, group_id: int = None)
             except Exception as e:
                 logger.warning(f"⚠️ Cache temizleme hatası: {e}")
             
+            # Sıralama indeksi (COUNT(*) sorgusu yerine)
+            from utils.rank_index import user_rank_index
+            user_rank_index.add(user_id, points_delta=points, messages_delta=1)
+            
             logger.info(f"💎 Sistem aktivitesi - User: {user_id}")
             return True
                 
@@ -957,6 +996,34 @@ async def add_points_to_user(user_id: int, points: float, group_id: int = None)
         return False
 
 
+async def credit_event_prize(user_id: int, points: float, event_id: int) -> bool:
+    """Çekiliş ödülünü bakiyeye ekle - günlük/haftalık limit yok, mesaj sayılmaz"""
+    if not db_pool:
+        return False
+    
+    try:
+        async with db_pool.acquire() as conn:
+            result = await conn.execute("""
+                UPDATE users 
+                SET kirve_points = kirve_points + $2
+                WHERE user_id = $1
+            """, user_id, points)
+        
+        if result == "UPDATE 0":
+            logger.warning(f"⚠️ Ödül verilemedi, kullanıcı bulunamadı - User: {user_id}, Event: {event_id}")
+            return False
+        
+        from utils.rank_index import user_rank_index
+        user_rank_index.add(user_id, points_delta=points)
+        
+        logger.info(f"🏆 Çekiliş ödülü eklendi - User: {user_id}, Event: {event_id}, Amount: {points:.2f} KP")
+        return True
+        
+    except Exception as e:
+        logger.error(f"❌ Çekiliş ödülü hatası - User: {user_id}, Event: {event_id}: {e}")
+        return False
+
+
 # ==============================================
 # GRUP YÖNETİMİ FONKSİYONLARI
 # ==============================================
@@ -1223,40 +1290,30 @@ async def get_user_event_participation(user_id: int, event_id: int) -> dict:
         logger.error(f"❌ Get user event participation hatası: {e}")
         return {}
 
-async def get_event_participant_count(event_id: int) -> int:
-    """Etkinlik katılımcı sayısını getir"""
-    if not db_pool:
-        return 0
-    
-    try:
-        async with db_pool.acquire() as conn:
-            # Önce event_participations tablosundan kontrol et
-            count = await conn.fetchval("""
-                SELECT COUNT(*) FROM event_participations 
-                WHERE event_id = $1 AND status = 'active'
-            """, event_id)
-            
-            if count and count > 0:
-                logger.info(f"✅ Event participant count (participations): {count}")
-                return count
-            
-            # Eğer event_participations'da yoksa event_participants'tan kontrol et
-            count = await conn.fetchval("""
-                SELECT COUNT(*) FROM event_participants 
-                WHERE event_id = $1 AND status = 'active'
-            """, event_id)
-            
-            logger.info(f"✅ Event participant count (participants): {count}")
-            return count or 0
-            
-    except Exception as e:
-        logger.error(f"❌ Get event participant count hatası: {e}")
-        return 0
-
 # ==============================================
 # EVENT PARTICIPATION FONKSİYONLARI
 # ==============================================
 
+async def _adjust_event_counters(conn, event_id: int, count_delta: int, pool_delta) -> None:
+    """events.participant_count / total_pool sayaçlarını katılım değişikliğiyle aynı transaction'da güncelle"""
+    await conn.execute("""
+        UPDATE events
+        SET participant_count = GREATEST(participant_count + $2, 0),
+            total_pool = GREATEST(total_pool + $3, 0)
+        WHERE id = $1
+    """, event_id, count_delta, pool_delta)
+
+async def delete_user_event_participations(conn, user_id: int) -> int:
+    """Kullanıcının tüm etkinlik katılımlarını sil - aktif olanlar etkinlik sayaçlarından düşülür"""
+    removed = await conn.fetch("""
+        DELETE FROM event_participants WHERE user_id = $1
+        RETURNING event_id, payment_amount, status
+    """, user_id)
+    for row in removed:
+        if row['status'] == 'active':
+            await _adjust_event_counters(conn, row['event_id'], -1, -row['payment_amount'])
+    return len(removed)
+
 async def join_event(user_id: int, event_id: int, payment_amount: float) -> bool:
     """Etkinliğe katılım kaydet"""
     if not db_pool:
@@ -1264,21 +1321,20 @@ async def join_event(user_id: int, event_id: int, payment_amount: float) -> bool
     
     try:
         async with db_pool.acquire() as conn:
-            # Daha önce katılım var mı kontrol et
-            existing = await conn.fetchval("""
-                SELECT id FROM event_participants 
-                WHERE user_id = $1 AND event_id = $2
-            """, user_id, event_id)
-            
-            if existing:
-                logger.warning(f"⚠️ Zaten katılım var: User {user_id} -> Event {event_id}")
-                return False
-            
-            # Katılımı kaydet
-            await conn.execute("""
-                INSERT INTO event_participants (user_id, event_id, payment_amount)
-                VALUES ($1, $2, $3)
-            """, user_id, event_id, payment_amount)
+            async with conn.transaction():
+                # Katılımı kaydet - daha önce katılım varsa eklenmez
+                inserted = await conn.fetchval("""
+                    INSERT INTO event_participants (user_id, event_id, payment_amount)
+                    VALUES ($1, $2, $3)
+                    ON CONFLICT (event_id, user_id) DO NOTHING
+                    RETURNING id
+                """, user_id, event_id, payment_amount)
+                
+                if not inserted:
+                    logger.warning(f"⚠️ Zaten katılım var: User {user_id} -> Event {event_id}")
+                    return False
+                
+                await _adjust_event_counters(conn, event_id, 1, payment_amount)
             
             logger.info(f"✅ Event katılımı kaydedildi: User {user_id} -> Event {event_id}")
             return True
@@ -1294,22 +1350,20 @@ async def withdraw_from_event(user_id: int, event_id: int) -> bool:
     
     try:
         async with db_pool.acquire() as conn:
-            # Katılımı bul
-            participation = await conn.fetchrow("""
-                SELECT id, payment_amount, status FROM event_participants 
-                WHERE user_id = $1 AND event_id = $2 AND status = 'active'
-            """, user_id, event_id)
-            
-            if not participation:
-                logger.warning(f"⚠️ Aktif katılım bulunamadı: User {user_id} -> Event {event_id}")
-                return False
-            
-            # Çekilmeyi kaydet
-            await conn.execute("""
-                UPDATE event_participants 
-                SET status = 'withdrawn'
-                WHERE id = $1
-            """, participation['id'])
+            async with conn.transaction():
+                # Aktif katılımı çekildi olarak işaretle
+                payment_amount = await conn.fetchval("""
+                    UPDATE event_participants 
+                    SET status = 'withdrawn'
+                    WHERE user_id = $1 AND event_id = $2 AND status = 'active'
+                    RETURNING payment_amount
+                """, user_id, event_id)
+                
+                if payment_amount is None:
+                    logger.warning(f"⚠️ Aktif katılım bulunamadı: User {user_id} -> Event {event_id}")
+                    return False
+                
+                await _adjust_event_counters(conn, event_id, -1, -payment_amount)
             
             logger.info(f"✅ Event çekilme kaydedildi: User {user_id} -> Event {event_id}")
             return True
@@ -1370,15 +1424,14 @@ async def can_user_join_event(user_id: int, event_id: int) -> bool:
         return False
 
 async def get_event_participant_count(event_id: int) -> int:
-    """Etkinlik katılımcı sayısını getir"""
+    """Etkinlik katılımcı sayısını getir (events.participant_count sayacı)"""
     if not db_pool:
         return 0
     
     try:
         async with db_pool.acquire() as conn:
             count = await conn.fetchval("""
-                SELECT COUNT(*) FROM event_participants 
-                WHERE event_id = $1 AND status = 'active'
+                SELECT participant_count FROM events WHERE id = $1
             """, event_id)
             
             return count or 0
@@ -1395,7 +1448,8 @@ async def get_event_info_for_end(event_id: int) -> dict:
     try:
         async with db_pool.acquire() as conn:
             event = await conn.fetchrow("""
-                SELECT id, event_name, max_participants, event_type, created_by
+                SELECT id, event_name, max_participants, event_type, created_by,
+                       participant_count, total_pool
                 FROM events WHERE id = $1
             """, event_id)
             
@@ -1407,56 +1461,61 @@ async def get_event_info_for_end(event_id: int) -> dict:
         logger.error(f"❌ Get event info for end hatası: {e}")
         return {}
 
-async def get_event_winners(event_id: int, winner_count: int) -> list:
-    """Etkinlik kazananlarını seç - Gelişmiş algoritma"""
+async def get_event_winners(event_id: int, winner_count: int, seed: Optional[int] = None) -> list:
+    """
+    Etkinlik kazananlarını seç - katılım miktarıyla orantılı ağırlıklı çekiliş
+    Katılımcılar server-side cursor ile akıtılır (sıralama/COUNT yok), bellekte
+    sadece winner_count aday tutulur. seed verilmezse üretilir ve loglanır;
+    aynı seed ile çekiliş tekrar edilebilir.
+    """
     if not db_pool:
         return []
     
+    from utils.winner_selection import WeightedReservoir, new_draw_seed
+    
     try:
+        if seed is None:
+            seed = new_draw_seed()
+        reservoir = WeightedReservoir(winner_count, seed)
+        
         async with db_pool.acquire() as conn:
-            # Katılımcı sayısını kontrol et
-            participant_count = await conn.fetchval("""
-                SELECT COUNT(*) FROM event_participants 
-                WHERE event_id = $1 AND status = 'active'
-            """, event_id)
-            
-            logger.info(f"🔍 Event {event_id} - get_event_winners participant_count: {participant_count}")
-            
+            # Cursor transaction içinde olmalı; (event_id, user_id) unique index'i sabit sıra verir
+            async with conn.transaction():
+                async for row in conn.cursor("""
+                    SELECT user_id, payment_amount
+                    FROM event_participants
+                    WHERE event_id = $1 AND status = 'active'
+                    ORDER BY user_id
+                """, event_id, prefetch=WINNER_CURSOR_PREFETCH):
+                    reservoir.offer((row['user_id'], row['payment_amount']), row['payment_amount'])
+            
+            participant_count = reservoir.seen
             if participant_count == 0:
                 logger.info(f"🎯 No participants for event: {event_id}")
                 return []
             
-            # Kazanan sayısını katılımcı sayısına göre ayarla
-            actual_winners = min(winner_count, participant_count)
-            
-            # Kazanan seçim algoritması
-            winners = await conn.fetch("""
-                WITH weighted_participants AS (
-                    SELECT 
-                        ep.user_id, 
-                        ep.payment_amount, 
-                        u.first_name, 
-                        u.last_name, 
-                        u.username,
-                        -- Katılım miktarına göre ağırlık (daha fazla ödeyen daha şanslı)
-                        (ep.payment_amount * 10 + RANDOM()) as weight
-                    FROM event_participants ep
-                    JOIN users u ON ep.user_id = u.user_id
-                    WHERE ep.event_id = $1 AND ep.status = 'active'
-                )
-                SELECT user_id, payment_amount, first_name, last_name, username
-                FROM weighted_participants
-                ORDER BY weight DESC
-                LIMIT $2
-            """, event_id, actual_winners)
-            
-            logger.info(f"🔍 Event {event_id} - event_participants'tan kazananlar: {winners}")
+            selected = reservoir.result()
             
-            result = [dict(winner) for winner in winners]
-            logger.info(f"🎯 Get event winners - Event: {event_id}, Winners: {len(result)}, Participants: {participant_count}, Details: {result}")
-            
-            result = [dict(winner) for winner in winners]
-            logger.info(f"🎯 Get event winners - Event: {event_id}, Winners: {len(result)}, Participants: {participant_count}")
+            # Sadece kazananların kullanıcı bilgileri
+            user_rows = await conn.fetch("""
+                SELECT user_id, first_name, last_name, username
+                FROM users
+                WHERE user_id = ANY($1::bigint[])
+            """, [user_id for user_id, _ in selected])
+            users = {row['user_id']: row for row in user_rows}
+            
+            result = []
+            for user_id, payment_amount in selected:
+                user = users.get(user_id)
+                result.append({
+                    'user_id': user_id,
+                    'payment_amount': payment_amount,
+                    'first_name': user['first_name'] if user else None,
+                    'last_name': user['last_name'] if user else None,
+                    'username': user['username'] if user else None,
+                })
+            
+            logger.info(f"🎲 Çekiliş - Event: {event_id}, Seed: {seed}, Winners: {[w['user_id'] for w in result]}, Participants: {participant_count}")
             return result
             
     except Exception as e:
@@ -1492,18 +1551,15 @@ async def end_event(event_id: int) -> bool:
         async with db_pool.acquire() as conn:
             # Etkinlik bilgilerini al
             event = await conn.fetchrow("""
-                SELECT id, event_name, max_participants, created_by FROM events 
+                SELECT id, event_name, max_participants, created_by, participant_count FROM events 
                 WHERE id = $1 AND is_active = TRUE
             """, event_id)
             
             if not event:
                 return False
             
-            # Toplam katılımcı sayısını al
-            participant_count = await conn.fetchval("""
-                SELECT COUNT(*) FROM event_participants 
-                WHERE event_id = $1 AND status = 'active'
-            """, event_id)
+            # Toplam katılımcı sayısı
+            participant_count = event['participant_count']
             
             logger.info(f"🔍 Event {event_id} - event_participants count: {participant_count}")
             
@@ -1570,11 +1626,16 @@ async def cancel_event(event_id: int) -> bool:
                 logger.info(f"💰 Point geri verildi: User {participant['user_id']}, Amount: {participant['payment_amount']:.2f}")
             
             # Katılımcıları iptal et
-            await conn.execute("""
-                UPDATE event_participants 
-                SET status = 'cancelled'
-                WHERE event_id = $1 AND status = 'active'
-            """, event_id)
+            async with conn.transaction():
+                await conn.execute("""
+                    UPDATE event_participants 
+                    SET status = 'cancelled'
+                    WHERE event_id = $1 AND status = 'active'
+                """, event_id)
+                await conn.execute("""
+                    UPDATE events SET participant_count = 0, total_pool = 0
+                    WHERE id = $1
+                """, event_id)
             
             logger.info(f"✅ Event iptal edildi: {event_id} - {len(participants)} katılımcıya point geri verildi")
             return True
@@ -1592,18 +1653,14 @@ async def get_event_status(event_id: int) -> dict:
         async with db_pool.acquire() as conn:
             # Etkinlik bilgilerini al
             event = await conn.fetchrow("""
-                SELECT id, event_name, max_participants, is_active, created_at
+                SELECT id, event_name, max_participants, is_active, created_at, participant_count, total_pool
                 FROM events WHERE id = $1
             """, event_id)
             
             if not event:
                 return {}
             
-            # Katılımcı sayısını al
-            participant_count = await conn.fetchval("""
-                SELECT COUNT(*) FROM event_participants 
-                WHERE event_id = $1 AND status = 'active'
-            """, event_id)
+            participant_count = event['participant_count']
             
             return {
                 'id': event['id'],
@@ -1612,6 +1669,7 @@ async def get_event_status(event_id: int) -> dict:
                 'max_winners': event['max_participants'],
                 'status': 'active' if event['is_active'] else 'completed',
                 'participant_count': participant_count,
+                'total_pool': float(event['total_pool'] or 0),
                 'created_at': event['created_at'].strftime('%d.%m.%Y %H:%M') if event['created_at'] else 'Bilinmiyor',
                 'completed_at': None
             }
@@ -1651,15 +1709,16 @@ async def get_market_products_with_details() -> list:
         logger.error(f"❌ Market ürünleri getirme hatası: {e}")
         return []
 
-async def get_user_orders_with_details(user_id: int, limit: int = 10) -> list:
-    """Kullanıcının siparişlerini detaylarıyla getir"""
+async def get_user_orders_page(user_id: int, page_token: Optional[str] = None, page_size: int = 10):
+    """Kullanıcının siparişleri - keyset sayfası (en yeni önce)"""
+    from utils.keyset_pagination import KeysetPage, fetch_keyset_page
     try:
         pool = await get_db_pool()
         if not pool:
-            return []
+            return KeysetPage()
         
         async with pool.acquire() as conn:
-            orders = await conn.fetch("""
+            page = await fetch_keyset_page(conn, """
                 SELECT 
                     o.id,
                     o.order_number,
@@ -1674,15 +1733,18 @@ async def get_user_orders_with_details(user_id: int, limit: int = 10) -> list:
                 FROM market_orders o
                 JOIN market_products p ON o.product_id = p.id
                 WHERE o.user_id = $1
-                ORDER BY o.created_at DESC
-                LIMIT $2
-            """, user_id, limit)
-            
-            return [dict(o) for o in orders]
+            """, [user_id], sort_column="o.created_at", id_column="o.id",
+                page_token=page_token, page_size=page_size)
+            page.rows = [dict(o) for o in page.rows]
+            return page
             
     except Exception as e:
         logger.error(f"❌ Kullanıcı siparişleri getirme hatası: {e}")
-        return []
+        return KeysetPage()
+
+async def get_user_orders_with_details(user_id: int, limit: int = 10) -> list:
+    """Kullanıcının siparişlerini detaylarıyla getir"""
+    return (await get_user_orders_page(user_id, page_size=limit)).rows
 
 async def get_pending_orders_with_details() -> list:
     """Bekleyen siparişleri detaylarıyla getir"""
@@ -2077,6 +2139,180 @@ async def create_custom_commands_table():
             except Exception as e:
                 logger.warning(f"⚠️ Tablo güncelleme hatası: {e}")
 
+async def create_delayed_actions_table():
+    """Gecikmeli aksiyonlar (mesaj silme, hatırlatma) için tabloyu oluşturur"""
+    pool = await get_db_pool()
+    if not pool:
+        return
+    async with pool.acquire() as conn:
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS delayed_actions (
+                id BIGSERIAL PRIMARY KEY,
+                action_type VARCHAR(50) NOT NULL,
+                payload JSONB NOT NULL,
+                due_at TIMESTAMP NOT NULL,
+                created_at TIMESTAMP DEFAULT NOW()
+            )
+        ''')
+        await conn.execute('CREATE INDEX IF NOT EXISTS idx_delayed_actions_due_at ON delayed_actions(due_at)')
+
+async def create_fsm_storage_table():
+    """FSM ve konuşma durumları için UNLOGGED tabloyu oluşturur (WAL yazılmaz)"""
+    pool = await get_db_pool()
+    if not pool:
+        return
+    async with pool.acquire() as conn:
+        await conn.execute('''
+            CREATE UNLOGGED TABLE IF NOT EXISTS fsm_storage (
+                storage_key TEXT PRIMARY KEY,
+                destiny VARCHAR(100) NOT NULL,
+                user_id BIGINT NOT NULL,
+                state TEXT,
+                data JSONB NOT NULL DEFAULT '{}',
+                updated_at TIMESTAMP DEFAULT NOW(),
+                expires_at TIMESTAMP NOT NULL
+            )
+        ''')
+        await conn.execute('CREATE INDEX IF NOT EXISTS idx_fsm_storage_destiny ON fsm_storage(destiny)')
+        await conn.execute('CREATE INDEX IF NOT EXISTS idx_fsm_storage_expires_at ON fsm_storage(expires_at)')
+
+async def create_leader_leases_table():
+    """Lider seçimi lease kayıtları için tabloyu oluşturur"""
+    pool = await get_db_pool()
+    if not pool:
+        return
+    async with pool.acquire() as conn:
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS leader_leases (
+                name VARCHAR(100) PRIMARY KEY,
+                holder TEXT NOT NULL,
+                acquired_at TIMESTAMP DEFAULT NOW(),
+                expires_at TIMESTAMP NOT NULL
+            )
+        ''')
+
+async def create_shared_cooldowns_table():
+    """Worker'lar arası paylaşılan cooldown kayıtları için tabloyu oluşturur"""
+    pool = await get_db_pool()
+    if not pool:
+        return
+    async with pool.acquire() as conn:
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS shared_cooldowns (
+                name VARCHAR(100) PRIMARY KEY,
+                holder TEXT NOT NULL,
+                expires_at TIMESTAMP NOT NULL
+            )
+        ''')
+
+async def try_acquire_shared_cooldown(name: str, holder: str, seconds: float) -> bool:
+    """
+    Paylaşılan cooldown'u al - süresi dolmuşsa ya da zaten bu holder'daysa True.
+    DB'ye ulaşılamazsa True döner (karar yerel cooldown'a kalır).
+    """
+    if not db_pool:
+        return True
+    
+    try:
+        async with db_pool.acquire() as conn:
+            return await conn.fetchval('''
+                WITH claimed AS (
+                    INSERT INTO shared_cooldowns (name, holder, expires_at)
+                    VALUES ($1, $2, NOW() + make_interval(secs => $3))
+                    ON CONFLICT (name) DO UPDATE SET
+                        holder = EXCLUDED.holder,
+                        expires_at = EXCLUDED.expires_at
+                    WHERE shared_cooldowns.expires_at < NOW()
+                    RETURNING holder
+                )
+                SELECT EXISTS (SELECT 1 FROM claimed)
+                    OR EXISTS (SELECT 1 FROM shared_cooldowns WHERE name = $1 AND holder = $2 AND expires_at >= NOW())
+            ''', name, holder, float(seconds))
+    except Exception as e:
+        logger.warning(f"⚠️ Paylaşılan cooldown alınamadı ({name}): {e}")
+        return True
+
+async def create_activity_sketches_table():
+    """Gün / grup bazında HyperLogLog register'ları için tabloyu oluşturur (group_id 0 = tüm gruplar).
+    İlk oluşturmada saklama penceresindeki günler daily_stats'tan doldurulur."""
+    pool = await get_db_pool()
+    if not pool:
+        return
+    from utils.activity_sketch import GLOBAL_GROUP_ID, MAX_CACHED_DAYS, HyperLogLog
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            existed = await conn.fetchval("SELECT to_regclass('activity_sketches') IS NOT NULL")
+            await conn.execute('''
+                CREATE TABLE IF NOT EXISTS activity_sketches (
+                    day DATE NOT NULL,
+                    group_id BIGINT NOT NULL,
+                    registers BYTEA NOT NULL,
+                    updated_at TIMESTAMP DEFAULT NOW(),
+                    PRIMARY KEY (day, group_id)
+                )
+            ''')
+            if existed:
+                return
+            
+            # Geçmiş haftalık/aylık sayılar sıfırdan başlamasın
+            sketches = {}
+            async for row in conn.cursor('''
+                SELECT DISTINCT group_id, message_date, user_id FROM daily_stats
+                WHERE group_id IS NOT NULL AND message_date >= CURRENT_DATE - $1::int
+            ''', MAX_CACHED_DAYS):
+                for group_id in (row['group_id'], GLOBAL_GROUP_ID):
+                    key = (row['message_date'], group_id)
+                    sketch = sketches.get(key)
+                    if sketch is None:
+                        sketch = sketches[key] = HyperLogLog()
+                    sketch.add(row['user_id'])
+            if sketches:
+                await conn.executemany('''
+                    INSERT INTO activity_sketches (day, group_id, registers)
+                    VALUES ($1, $2, $3)
+                    ON CONFLICT (day, group_id) DO NOTHING
+                ''', [(day, group_id, sketch.to_bytes()) for (day, group_id), sketch in sketches.items()])
+                logger.info(f"✅ Aktivite taslakları daily_stats'tan dolduruldu ({len(sketches)} gün/grup)")
+
+async def create_event_counter_columns():
+    """events tablosuna participant_count / total_pool sütunlarını ekler (ilk eklemede mevcut katılımlardan doldurulur)"""
+    pool = await get_db_pool()
+    if not pool:
+        return
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            has_pool = await conn.fetchval('''
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'events' AND column_name = 'total_pool'
+            ''')
+            await conn.execute('ALTER TABLE events ADD COLUMN IF NOT EXISTS participant_count INTEGER NOT NULL DEFAULT 0')
+            await conn.execute('ALTER TABLE events ADD COLUMN IF NOT EXISTS total_pool DECIMAL(12,2) NOT NULL DEFAULT 0')
+            if not has_pool:
+                await conn.execute('''
+                    UPDATE events e
+                    SET participant_count = s.participant_count, total_pool = s.total_pool
+                    FROM (
+                        SELECT event_id, COUNT(*) AS participant_count, COALESCE(SUM(payment_amount), 0) AS total_pool
+                        FROM event_participants
+                        WHERE status = 'active'
+                        GROUP BY event_id
+                    ) s
+                    WHERE e.id = s.event_id
+                ''')
+                logger.info("✅ Etkinlik sayaçları mevcut katılımlardan dolduruldu")
+
+async def create_list_indexes():
+    """Keyset sayfalamalı listelerin (created_at/updated_at, id) indeksleri"""
+    pool = await get_db_pool()
+    if not pool:
+        return
+    async with pool.acquire() as conn:
+        await conn.execute('CREATE INDEX IF NOT EXISTS idx_market_orders_status_created ON market_orders(status, created_at DESC, id DESC)')
+        await conn.execute('CREATE INDEX IF NOT EXISTS idx_market_orders_status_updated ON market_orders(status, updated_at DESC, id DESC)')
+        await conn.execute('CREATE INDEX IF NOT EXISTS idx_market_orders_user_created ON market_orders(user_id, created_at DESC, id DESC)')
+        await conn.execute('CREATE INDEX IF NOT EXISTS idx_market_products_created ON market_products(created_at DESC, id DESC)')
+        await conn.execute('CREATE INDEX IF NOT EXISTS idx_custom_commands_created ON custom_commands(created_at DESC, id DESC)')
+
 async def add_custom_command(command_name: str, scope: int, response_message: str, button_text: str, button_url: str, created_by: int) -> bool:
     pool = await get_db_pool()
     if not pool:
@@ -2129,6 +2365,23 @@ async def list_custom_commands() -> list:
         ''')
         return [dict(cmd) for cmd in cmds]
 
+async def list_custom_commands_page(page_token: Optional[str] = None, page_size: int = 10):
+    """Dinamik komutlar - keyset sayfası (en yeni önce)"""
+    from utils.keyset_pagination import KeysetPage, fetch_keyset_page
+    pool = await get_db_pool()
+    if not pool:
+        return KeysetPage()
+    async with pool.acquire() as conn:
+        page = await fetch_keyset_page(conn, '''
+            SELECT 
+                id, command_name, scope, response_message, 
+                button_text, button_url, created_by, created_at, is_active
+            FROM custom_commands 
+            WHERE TRUE
+        ''', sort_column="created_at", id_column="id", page_token=page_token, page_size=page_size)
+        page.rows = [dict(cmd) for cmd in page.rows]
+        return page
+
 async def delete_custom_command(command_name: str) -> bool:
     """Dinamik komutu sil"""
     pool = await get_db_pool()
@@ -2345,10 +2598,8 @@ async def delete_user_account(user_id: int) -> bool:
                     DELETE FROM market_orders WHERE user_id = $1
                 """, user_id)
                 
-                # 2. Event katılımlarını sil
-                await conn.execute("""
-                    DELETE FROM event_participants WHERE user_id = $1
-                """, user_id)
+                # 2. Event katılımlarını sil (etkinlik sayaçları düşülür)
+                await delete_user_event_participations(conn, user_id)
                 
                 # 3. Custom commands'ları sil (bu kullanıcı tarafından oluşturulan)
                 await conn.execute("""
@@ -2360,6 +2611,9 @@ async def delete_user_account(user_id: int) -> bool:
                     DELETE FROM users WHERE user_id = $1
                 """, user_id)
                 
+                from utils.rank_index import user_rank_index
+                user_rank_index.remove_user(user_id)
+                
                 logger.critical(f"🚨 Kullanıcı hesabı tamamen silindi - User ID: {user_id}")
                 return True
                     
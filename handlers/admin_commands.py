@@ -28,10 +28,10 @@ def set_bot_instance(bot_instance):
     _bot_instance = bot_instance
 
 async def delete_message_after_delay(message, delay=5):
-    """Mesajı belirtilen süre sonra sil"""
+    """Mesajı belirtilen süre sonra sil - delayed action scheduler üzerinden"""
     try:
-        await asyncio.sleep(delay)
-        await message.delete()
+        from utils.delayed_actions import schedule_message_deletion
+        await schedule_message_deletion(message.chat.id, message.message_id, delay)
     except:
         pass
 
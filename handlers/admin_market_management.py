@@ -14,6 +14,8 @@ from aiogram.filters import Command
 from config import get_config
 from database import get_db_pool
 from utils.logger import logger
+from utils.conversation_state import FlowStateDict
+from utils.keyset_pagination import fetch_keyset_page, page_buttons, split_page_token
 
 router = Router()
 
@@ -37,13 +39,13 @@ def get_bot_instance():
     return _bot_instance
 
 # Ürün oluşturma durumu
-product_creation_data = {}
+product_creation_data = FlowStateDict("product_creation")
 
 # Ürün düzenleme durumu
-product_edit_data = {}
+product_edit_data = FlowStateDict("product_edit")
 
 # Ürün silme durumu
-product_delete_data = {}
+product_delete_data = FlowStateDict("product_delete")
 
 # ==============================================
 # MARKET YÖNETİM KOMUTLARI
@@ -297,8 +299,8 @@ async def send_orders_list(user_id: int, reply_func) -> None:
         await reply_func("❌ Sipariş listesi yüklenemedi!")
 
 
-async def send_orders_list_direct(user_id: int) -> None:
-    """Sipariş listesini doğrudan kullanıcıya gönder"""
+async def send_orders_list_direct(user_id: int, page_token: Optional[str] = None, message: Optional[Message] = None) -> None:
+    """Sipariş listesini doğrudan kullanıcıya gönder (message verilirse o mesaj güncellenir)"""
     try:
         if not _bot_instance:
             logger.error("❌ Bot instance yok!")
@@ -320,10 +322,10 @@ async def send_orders_list_direct(user_id: int) -> None:
                 JOIN market_products p ON o.product_id = p.id
                 JOIN users u ON o.user_id = u.user_id
                 WHERE o.status = 'pending'
-                ORDER BY o.created_at DESC
-                LIMIT 20
             """
-            orders = await conn.fetch(orders_query)
+            page = await fetch_keyset_page(conn, orders_query, sort_column="o.created_at", id_column="o.id",
+                                           page_token=page_token, page_size=20)
+            orders = page.rows
             
             if not orders:
                 await _bot_instance.send_message(user_id, "📋 **Bekleyen Sipariş Yok**\n\n✅ Tüm siparişler işlenmiş!")
@@ -362,11 +364,17 @@ async def send_orders_list_direct(user_id: int) -> None:
                     )
                 ])
             
+            navigation = page_buttons(page, "market_pending_list")
+            if navigation:
+                keyboard.inline_keyboard.append(navigation)
             keyboard.inline_keyboard.append([
                 InlineKeyboardButton(text="🔄 Yenile", callback_data="admin_orders_refresh")
             ])
             
-            await _bot_instance.send_message(user_id, orders_text, reply_markup=keyboard)
+            if message:
+                await message.edit_text(orders_text, reply_markup=keyboard)
+            else:
+                await _bot_instance.send_message(user_id, orders_text, reply_markup=keyboard)
             
     except Exception as e:
         logger.error(f"❌ Sipariş listesi hatası: {e}")
@@ -527,6 +535,9 @@ async def process_reject_order(user_id: int, order_number: str, reply_func) -> N
             balance_query = "UPDATE users SET kirve_points = $1 WHERE user_id = $2"
             await conn.execute(balance_query, new_balance, order['user_id'])
             
+            from utils.rank_index import user_rank_index
+            user_rank_index.set_points(order['user_id'], new_balance)
+            
             # Siparişi reddet
             reject_query = """
                 UPDATE market_orders 
@@ -594,6 +605,9 @@ async def process_reject_order_direct(user_id: int, order_number: str) -> None:
             balance_query = "UPDATE users SET kirve_points = $1 WHERE user_id = $2"
             await conn.execute(balance_query, new_balance, order['user_id'])
             
+            from utils.rank_index import user_rank_index
+            user_rank_index.set_points(order['user_id'], new_balance)
+            
             # Siparişi reddet
             reject_query = """
                 UPDATE market_orders 
@@ -1467,6 +1481,12 @@ async def market_callback_handler(callback: CallbackQuery):
         elif action == "market_orders":
             logger.info("📦 Sipariş yönetimi açılıyor...")
             await show_pending_orders(callback)
+        elif action.startswith("market_orders:"):
+            await show_pending_orders(callback, split_page_token(action, "market_orders"))
+        elif action.startswith("market_list_products:"):
+            await show_products_list(callback, split_page_token(action, "market_list_products"))
+        elif action.startswith("market_pending_list:"):
+            await send_orders_list_direct(user_id, split_page_token(action, "market_pending_list"), callback.message)
         elif action == "market_approved":
             logger.info("✅ Onaylanan siparişler gösteriliyor...")
             await show_approved_orders(callback)
@@ -1481,14 +1501,14 @@ async def market_callback_handler(callback: CallbackQuery):
             await show_market_report(callback)
         # Onaylanan sipariş filtreleri
         elif action.startswith("market_approved_"):
-            time_filter = action.replace("market_approved_", "")
+            time_filter, _, page_token = action.replace("market_approved_", "").partition(":")
             logger.info(f"✅ Onaylanan siparişler filtreleniyor: {time_filter}")
-            await show_approved_orders_filtered(callback, time_filter)
+            await show_approved_orders_filtered(callback, time_filter, page_token or None)
         # Reddedilen sipariş filtreleri
         elif action.startswith("market_rejected_"):
-            time_filter = action.replace("market_rejected_", "")
+            time_filter, _, page_token = action.replace("market_rejected_", "").partition(":")
             logger.info(f"❌ Reddedilen siparişler filtreleniyor: {time_filter}")
-            await show_rejected_orders_filtered(callback, time_filter)
+            await show_rejected_orders_filtered(callback, time_filter, page_token or None)
         elif action == "market_cancel_creation":
             logger.info("❌ Ürün oluşturma iptal ediliyor...")
             await cancel_product_creation(callback)
@@ -1672,8 +1692,8 @@ async def delete_product_from_db(product_id: int, admin_id: int) -> bool:
 # DİĞER FONKSİYONLAR (PLACEHOLDER)
 # ==============================================
 
-async def show_products_list(callback: CallbackQuery):
-    """Ürün listesini göster"""
+async def show_products_list(callback: CallbackQuery, page_token: Optional[str] = None):
+    """Ürün listesini göster - sayfa başına 10 ürün"""
     try:
         user_id = callback.from_user.id
         config = get_config()
@@ -1690,12 +1710,13 @@ async def show_products_list(callback: CallbackQuery):
             return
         
         async with pool.acquire() as conn:
-            products = await conn.fetch("""
+            page = await fetch_keyset_page(conn, """
                 SELECT p.id, p.name, p.description, p.price, p.stock, p.company_link as site_link, p.company_name as site_name, 
                        p.is_active, p.created_at, p.category as category_name
                 FROM market_products p
-                ORDER BY p.created_at DESC
-            """)
+                WHERE TRUE
+            """, sort_column="p.created_at", id_column="p.id", page_token=page_token, page_size=10)
+        products = page.rows
         
         if not products:
             await callback.message.edit_text(
@@ -1752,6 +1773,9 @@ async def show_products_list(callback: CallbackQuery):
             ],
             [InlineKeyboardButton(text="⬅️ Geri", callback_data="market_management")]
         ])
+        navigation = page_buttons(page, "market_list_products")
+        if navigation:
+            keyboard.inline_keyboard.insert(0, navigation)
         
         await callback.message.edit_text(
             response,
@@ -1999,8 +2023,8 @@ async def refresh_market_menu(callback: CallbackQuery):
         await callback.answer("❌ Menü yenilenirken hata oluştu!", show_alert=True) 
 
 # Sipariş yönetimi fonksiyonları
-async def show_pending_orders(callback: CallbackQuery):
-    """Bekleyen siparişleri göster"""
+async def show_pending_orders(callback: CallbackQuery, page_token: Optional[str] = None):
+    """Bekleyen siparişleri göster - sayfa başına 5 sipariş"""
     try:
         logger.info("📦 show_pending_orders fonksiyonu başlatıldı")
         
@@ -2017,14 +2041,14 @@ async def show_pending_orders(callback: CallbackQuery):
         # Database'den bekleyen siparişleri al
         async with pool.acquire() as conn:
             logger.info("🔍 Bekleyen siparişler sorgulanıyor...")
-            orders = await conn.fetch("""
+            page = await fetch_keyset_page(conn, """
                 SELECT o.*, u.username, p.name as product_name 
                 FROM market_orders o 
                 JOIN users u ON o.user_id = u.user_id 
                 JOIN market_products p ON o.product_id = p.id 
                 WHERE o.status = 'pending' 
-                ORDER BY o.created_at DESC
-            """)
+            """, sort_column="o.created_at", id_column="o.id", page_token=page_token, page_size=5)
+        orders = page.rows
         
         logger.info(f"📊 {len(orders)} adet bekleyen sipariş bulundu")
         
@@ -2042,12 +2066,11 @@ async def show_pending_orders(callback: CallbackQuery):
             logger.info("✅ Boş sipariş mesajı gönderildi")
             return
         
-        # İlk 5 siparişi göster
         logger.info("📝 Sipariş listesi hazırlanıyor...")
         response = "📦 **Bekleyen Siparişler**\n\n"
         keyboard_buttons = []
         
-        for i, order in enumerate(orders[:5]):
+        for i, order in enumerate(orders):
             response += f"**{i+1}. {order['product_name']}**\n"
             response += f"👤 Kullanıcı: @{order['username']}\n"
             response += f"💰 Fiyat: {order['total_price']:.2f} KP\n"
@@ -2064,6 +2087,9 @@ async def show_pending_orders(callback: CallbackQuery):
                 )
             ])
         
+        navigation = page_buttons(page, "market_orders")
+        if navigation:
+            keyboard_buttons.append(navigation)
         keyboard_buttons.append([InlineKeyboardButton(text="⬅️ Geri", callback_data="market_management")])
         keyboard = InlineKeyboardMarkup(inline_keyboard=keyboard_buttons)
         
@@ -2127,7 +2153,7 @@ Hangi zaman aralığındaki onaylanan siparişleri görmek istiyorsun?
         logger.error(f"❌ Approved orders menu hatası: {e}")
         await callback.answer("❌ Bir hata oluştu!", show_alert=True)
 
-async def show_approved_orders_filtered(callback: CallbackQuery, time_filter: str):
+async def show_approved_orders_filtered(callback: CallbackQuery, time_filter: str, page_token: Optional[str] = None):
     """Filtrelenmiş onaylanan siparişleri göster"""
     try:
         from database import get_db_pool
@@ -2138,7 +2164,7 @@ async def show_approved_orders_filtered(callback: CallbackQuery, time_filter: st
         
         # Tarih filtresi SQL'i
         date_filter = {
-            "today": "DATE(o.updated_at) = CURRENT_DATE",
+            "today": "o.updated_at >= CURRENT_DATE",
             "week": "o.updated_at >= CURRENT_DATE - INTERVAL '7 days'",
             "month": "o.updated_at >= DATE_TRUNC('month', CURRENT_DATE)",
             "last_month": "o.updated_at >= DATE_TRUNC('month', CURRENT_DATE - INTERVAL '1 month') AND o.updated_at < DATE_TRUNC('month', CURRENT_DATE)",
@@ -2158,15 +2184,14 @@ async def show_approved_orders_filtered(callback: CallbackQuery, time_filter: st
         }
         
         async with pool.acquire() as conn:
-            orders = await conn.fetch(f"""
+            page = await fetch_keyset_page(conn, f"""
                 SELECT o.*, u.username, p.name as product_name 
                 FROM market_orders o 
                 JOIN users u ON o.user_id = u.user_id 
                 JOIN market_products p ON o.product_id = p.id 
                 WHERE o.status = 'approved' AND {date_filter[time_filter]}
-                ORDER BY o.updated_at DESC
-                LIMIT 20
-            """)
+            """, sort_column="o.updated_at", id_column="o.id", page_token=page_token, page_size=20)
+        orders = page.rows
         
         if not orders:
             keyboard = InlineKeyboardMarkup(inline_keyboard=[
@@ -2191,6 +2216,9 @@ async def show_approved_orders_filtered(callback: CallbackQuery, time_filter: st
         keyboard = InlineKeyboardMarkup(inline_keyboard=[
             [InlineKeyboardButton(text="⬅️ Geri", callback_data="market_approved")]
         ])
+        navigation = page_buttons(page, f"market_approved_{time_filter}")
+        if navigation:
+            keyboard.inline_keyboard.insert(0, navigation)
         
         await callback.message.edit_text(
             response,
@@ -2250,7 +2278,7 @@ Hangi zaman aralığındaki reddedilen siparişleri görmek istiyorsun?
         logger.error(f"❌ Rejected orders menu hatası: {e}")
         await callback.answer("❌ Bir hata oluştu!", show_alert=True)
 
-async def show_rejected_orders_filtered(callback: CallbackQuery, time_filter: str):
+async def show_rejected_orders_filtered(callback: CallbackQuery, time_filter: str, page_token: Optional[str] = None):
     """Filtrelenmiş reddedilen siparişleri göster"""
     try:
         from database import get_db_pool
@@ -2261,7 +2289,7 @@ async def show_rejected_orders_filtered(callback: CallbackQuery, time_filter: st
         
         # Tarih filtresi SQL'i
         date_filter = {
-            "today": "DATE(o.updated_at) = CURRENT_DATE",
+            "today": "o.updated_at >= CURRENT_DATE",
             "week": "o.updated_at >= CURRENT_DATE - INTERVAL '7 days'",
             "month": "o.updated_at >= DATE_TRUNC('month', CURRENT_DATE)",
             "last_month": "o.updated_at >= DATE_TRUNC('month', CURRENT_DATE - INTERVAL '1 month') AND o.updated_at < DATE_TRUNC('month', CURRENT_DATE)",
@@ -2281,15 +2309,14 @@ async def show_rejected_orders_filtered(callback: CallbackQuery, time_filter: st
         }
         
         async with pool.acquire() as conn:
-            orders = await conn.fetch(f"""
+            page = await fetch_keyset_page(conn, f"""
                 SELECT o.*, u.username, p.name as product_name 
                 FROM market_orders o 
                 JOIN users u ON o.user_id = u.user_id 
                 JOIN market_products p ON o.product_id = p.id 
                 WHERE o.status = 'rejected' AND {date_filter[time_filter]}
-                ORDER BY o.updated_at DESC
-                LIMIT 20
-            """)
+            """, sort_column="o.updated_at", id_column="o.id", page_token=page_token, page_size=20)
+        orders = page.rows
         
         if not orders:
             keyboard = InlineKeyboardMarkup(inline_keyboard=[
@@ -2314,6 +2341,9 @@ async def show_rejected_orders_filtered(callback: CallbackQuery, time_filter: st
         keyboard = InlineKeyboardMarkup(inline_keyboard=[
             [InlineKeyboardButton(text="⬅️ Geri", callback_data="market_rejected")]
         ])
+        navigation = page_buttons(page, f"market_rejected_{time_filter}")
+        if navigation:
+            keyboard.inline_keyboard.insert(0, navigation)
         
         await callback.message.edit_text(
             response,
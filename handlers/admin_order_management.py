@@ -9,6 +9,7 @@ from aiogram import types, Router, F
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.filters import Command
 from database import get_db_pool
+from utils.conversation_state import FlowStateDict
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +17,7 @@ logger = logging.getLogger(__name__)
 router = Router()
 
 # Admin sipariş durumları - Global olarak erişilebilir
-admin_order_states = {}
+admin_order_states = FlowStateDict("admin_order")
 
 def get_admin_order_states():
     """Global admin_order_states'e erişim"""
@@ -437,6 +438,9 @@ async def handle_admin_order_message(message: types.Message) -> None:
                     WHERE user_id = $2
                 """, refund_amount, order_info['user_id'])
                 
+                from utils.rank_index import user_rank_index
+                user_rank_index.add(order_info['user_id'], points_delta=float(refund_amount))
+                
                 logger.info(f"💰 Bakiye iade edildi - User: {order_info['user_id']}, Amount: {refund_amount} KP")
                 
                 # Müşteriye red mesajı gönder
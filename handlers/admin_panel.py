@@ -15,6 +15,7 @@ from config import get_config
 from database import get_db_pool
 from utils.logger import logger, log_system, log_error, log_warning, log_info
 from utils.command_logger import log_command, log_admin
+from utils.conversation_state import FlowStateDict
 
 router = Router()
 
@@ -384,6 +385,10 @@ async def admin_panel_callback(callback: types.CallbackQuery) -> None:
             logger.info(f"🔍 RECRUITMENT INTERVAL CALLBACK - User: {user_id}, Action: {action}")
             # Mesaj aralığı ayarlama
             await handle_recruitment_interval_callback(callback, action)
+        elif action and action.startswith("admin_orders_page:"):
+            from utils.keyset_pagination import split_page_token
+            await callback.answer()
+            await _send_orders_list_privately(user_id, split_page_token(action, "admin_orders_page"))
         elif action and action.startswith("admin_order_"):
             logger.info(f"🔍 ADMIN ORDER CALLBACK - User: {user_id}, Action: {action}")
             # Sipariş işlemleri
@@ -1189,7 +1194,7 @@ Hangi işlemi yapmak istiyorsun? {datetime.now().strftime('%H:%M')}
 # ==============================================
 
 # Global market product data storage
-product_data_storage = {}
+product_data_storage = FlowStateDict("product_step")
 
 async def start_product_creation(callback: types.CallbackQuery) -> None:
     """Market ürün ekleme sürecini başlat"""
@@ -1966,39 +1971,11 @@ async def clean_messages_command(message: types.Message) -> None:
         
         # Mesajları sil
         try:
-            deleted_count = 0
-            
-            # GELİŞMİŞ SİLME ALGORİTMASI: Daha güvenilir
-            try:
-                # Son mesajları getir ve sil
-                async for msg in message.bot.get_chat_history(message.chat.id, limit=delete_count):
-                    try:
-                        # Kendi mesajımızı silme
-                        if msg.message_id == message.message_id:
-                            continue
-                            
-                        await message.bot.delete_message(message.chat.id, msg.message_id)
-                        deleted_count += 1
-                        await asyncio.sleep(0.1)  # Rate limiting
-                        
-                        # Limit kontrolü
-                        if deleted_count >= delete_count - 1:  # -1 çünkü komut mesajı zaten silinmiş
-                            break
-                            
-                    except Exception as e:
-                        logger.debug(f"Mesaj silme hatası (ID: {msg.message_id}): {e}")
-                        continue
-                        
-            except Exception as e:
-                logger.error(f"❌ Chat history hatası: {e}")
-                # Fallback: Basit silme yöntemi
-                for i in range(1, delete_count):
-                    try:
-                        await message.bot.delete_message(message.chat.id, message.message_id - i)
-                        deleted_count += 1
-                        await asyncio.sleep(0.1)
-                    except:
-                        break
+            # TOPLU SİLME: deleteMessages ile tek (en fazla iki) API çağrısı
+            from utils.message_deletion import message_deletion_service
+            deleted_count = await message_deletion_service.delete_recent(
+                message.bot, message.chat.id, message.message_id, delete_count - 1  # -1 çünkü komut mesajı zaten silinmiş
+            )
             
             # Sonucu özel mesajla bildir
             if _bot_instance:
@@ -2304,12 +2281,17 @@ async def list_orders_command(message: types.Message) -> None:
         await message.reply("❌ Sipariş listesi yüklenirken hata oluştu!")
 
 
-async def _send_orders_list_privately(user_id: int):
-    """Sipariş listesini özel mesajla gönder"""
+async def _send_orders_list_privately(user_id: int, page_token: Optional[str] = None):
+    """Sipariş listesini özel mesajla gönder - 20'şerli, devamı "Sonraki" ile"""
     try:
-        async with db_pool.acquire() as conn:
+        from utils.keyset_pagination import fetch_keyset_page
+        pool = await get_db_pool()
+        if not pool:
+            await _bot_instance.send_message(user_id, "❌ Database bağlantısı yok!")
+            return
+        async with pool.acquire() as conn:
             # Sadece pending siparişleri al
-            orders = await conn.fetch("""
+            page = await fetch_keyset_page(conn, """
                 SELECT 
                     o.id, o.order_number, o.user_id, o.total_price, o.status, o.created_at,
                     p.name as product_name, p.company_name,
@@ -2318,9 +2300,8 @@ async def _send_orders_list_privately(user_id: int):
                 JOIN market_products p ON o.product_id = p.id
                 JOIN users u ON o.user_id = u.user_id
                 WHERE o.status = 'pending'
-                ORDER BY o.created_at DESC
-                LIMIT 20
-            """)
+            """, sort_column="o.created_at", id_column="o.id", page_token=page_token, page_size=20)
+            orders = page.rows
             
             if not orders:
                 await _bot_instance.send_message(
@@ -2375,11 +2356,15 @@ async def _send_orders_list_privately(user_id: int):
                     reply_markup=keyboard
                 )
             
-            # Son mesaj olarak yenile butonu
+            # Son mesaj olarak yenile (ve varsa devamı) butonu
             if orders:
                 refresh_keyboard = InlineKeyboardMarkup(inline_keyboard=[
                     [InlineKeyboardButton(text="🔄 Yenile", callback_data="admin_orders_refresh")]
                 ])
+                if page.next_token:
+                    refresh_keyboard.inline_keyboard.insert(0, [
+                        InlineKeyboardButton(text="Sonraki ➡️", callback_data=f"admin_orders_page:{page.next_token}")
+                    ])
                 
                 await _bot_instance.send_message(
                     user_id,
@@ -2602,6 +2587,9 @@ async def handle_admin_order_message(message: types.Message) -> None:
                     WHERE user_id = $2
                 """, refund_amount, order_data['user_id'])
                 
+                from utils.rank_index import user_rank_index
+                user_rank_index.add(order_data['user_id'], points_delta=float(refund_amount))
+                
                 logger.info(f"💰 Bakiye iade edildi - User: {order_data['user_id']}, Amount: {refund_amount} KP")
                 
                 # Müşteriye bildirim gönder
@@ -3160,9 +3148,8 @@ async def test_sql_queries_command(message: types.Message) -> None:
                 """, target_user_id)
                 
                 # 2. Event katılımlarını sil
-                event_deleted = await conn.execute("""
-                    DELETE FROM event_participants WHERE user_id = $1
-                """, target_user_id)
+                from database import delete_user_event_participations
+                event_deleted = await delete_user_event_participations(conn, target_user_id)
                 
                 # 3. Daily stats'ları sil
                 daily_stats_deleted = await conn.execute("""
@@ -3179,6 +3166,9 @@ async def test_sql_queries_command(message: types.Message) -> None:
                     DELETE FROM users WHERE user_id = $1
                 """, target_user_id)
                 
+                from utils.rank_index import user_rank_index
+                user_rank_index.remove_user(target_user_id)
+                
                 # Sonuçları göster
                 result_message = f"""
 🔍 **DIRECT SQL DELETE TEST SONUÇLARI**
@@ -3484,23 +3474,10 @@ async def show_user_report(callback: types.CallbackQuery) -> None:
                   AND registration_date >= CURRENT_DATE - INTERVAL '7 days'
             """)
             
-            # En aktif kullanıcılar (top 10)
-            top_users = await conn.fetch("""
-                SELECT total_messages, kirve_points
-                FROM users 
-                WHERE is_registered = TRUE 
-                ORDER BY total_messages DESC 
-                LIMIT 10
-            """)
-            
-            # En yüksek bakiyeli kullanıcılar (top 10)
-            top_balance = await conn.fetch("""
-                SELECT kirve_points, total_messages
-                FROM users 
-                WHERE is_registered = TRUE 
-                ORDER BY kirve_points DESC 
-                LIMIT 10
-            """)
+            # En aktif / en yüksek bakiyeli kullanıcılar (top 10) - liderlik tablosundan
+            from utils.leaderboard import leaderboards
+            top_users = leaderboards.get_top("messages")
+            top_balance = leaderboards.get_top("points")
         
         response = f"""
 👥 **KULLANICI RAPORU**
@@ -3644,8 +3621,7 @@ async def show_event_report(callback: types.CallbackQuery) -> None:
             
             # Son etkinlikler
             recent_events = await conn.fetch("""
-                SELECT title, status, created_at, 
-                       (SELECT COUNT(*) FROM event_participants WHERE event_id = e.id) as participant_count
+                SELECT title, status, created_at, participant_count
                 FROM events e
                 ORDER BY created_at DESC
                 LIMIT 5
@@ -3949,11 +3925,9 @@ async def show_detailed_event_report(callback: types.CallbackQuery) -> None:
                 SELECT 
                     e.name,
                     e.event_type,
-                    COUNT(ep.user_id) as participant_count
+                    e.participant_count
                 FROM events e
-                LEFT JOIN event_participants ep ON e.id = ep.event_id
-                GROUP BY e.id, e.name, e.event_type
-                ORDER BY participant_count DESC
+                ORDER BY e.participant_count DESC
                 LIMIT 5
             """)
         
@@ -4010,14 +3984,17 @@ async def show_detailed_system_report(callback: types.CallbackQuery) -> None:
                 SELECT 
                     message_date,
                     COALESCE(SUM(message_count), 0) as total_messages,
-                    COALESCE(SUM(points_earned), 0) as total_points,
-                    COUNT(DISTINCT user_id) as active_users
+                    COALESCE(SUM(points_earned), 0) as total_points
                 FROM daily_stats 
                 WHERE message_date >= CURRENT_DATE - INTERVAL '7 days'
                 GROUP BY message_date
                 ORDER BY message_date DESC
             """)
             
+            # Günlük tekil aktif kullanıcılar HLL taslaklarından
+            from utils.activity_sketch import activity_counter
+            active_users = await activity_counter.count_per_day([record['message_date'] for record in weekly_activity])
+            
             # Sistem performansı
             system_stats = await conn.fetchrow("""
                 SELECT 
@@ -4037,7 +4014,7 @@ async def show_detailed_system_report(callback: types.CallbackQuery) -> None:
         
         for record in weekly_activity:
             date_str = record['message_date'].strftime('%d.%m')
-            response += f"• {date_str}: **{record['total_messages']}** mesaj, **{record['total_points']:.2f}** KP, **{record['active_users']}** aktif kullanıcı\n"
+            response += f"• {date_str}: **{record['total_messages']}** mesaj, **{record['total_points']:.2f}** KP, **{active_users[record['message_date']]}** aktif kullanıcı\n"
         
         response += f"""
 🔧 **Sistem Performansı:**
@@ -4893,8 +4870,7 @@ async def handle_points_setting(callback: types.CallbackQuery, action: str) -> N
             
             # Input state'i kaydet
             from utils.memory_manager import memory_manager
-            cache_manager = memory_manager.get_cache_manager()
-            cache_manager.set_cache(f"input_state_{user_id}", "custom_points", ttl=300)
+            memory_manager.set_input_state(user_id, "custom_points")
             
             logger.info(f"✅ Özel kazanım input başlatıldı - User: {user_id}")
             logger.info(f"🔍 Input state kaydedildi: custom_points - User: {user_id}")
@@ -4975,8 +4951,7 @@ async def handle_daily_limit_setting(callback: types.CallbackQuery, action: str)
             
             # Input state'i kaydet
             from utils.memory_manager import memory_manager
-            cache_manager = memory_manager.get_cache_manager()
-            cache_manager.set_cache(f"input_state_{user_id}", "custom_daily", ttl=300)
+            memory_manager.set_input_state(user_id, "custom_daily")
             
             logger.info(f"✅ Özel günlük limit input başlatıldı - User: {user_id}")
             return
@@ -5099,8 +5074,7 @@ async def start_custom_points_input(callback: types.CallbackQuery) -> None:
         
         # Input state'i kaydet
         from utils.memory_manager import memory_manager
-        cache_manager = memory_manager.get_cache_manager()
-        cache_manager.set_cache(f"input_state_{user_id}", "custom_points", ttl=300)
+        memory_manager.set_input_state(user_id, "custom_points")
         
         logger.info(f"✅ Özel kazanım input başlatıldı - User: {user_id}")
         logger.info(f"🔍 Input state kaydedildi: custom_points - User: {user_id}")
@@ -5141,8 +5115,7 @@ async def start_custom_daily_input(callback: types.CallbackQuery) -> None:
         
         # Input state'i kaydet
         from utils.memory_manager import memory_manager
-        cache_manager = memory_manager.get_cache_manager()
-        cache_manager.set_cache(f"input_state_{user_id}", "custom_daily", ttl=300)
+        memory_manager.set_input_state(user_id, "custom_daily")
         
         logger.info(f"✅ Özel günlük limit input başlatıldı - User: {user_id}")
         
@@ -5179,8 +5152,7 @@ async def start_custom_weekly_input(callback: types.CallbackQuery) -> None:
         
         # Input state'i kaydet
         from utils.memory_manager import memory_manager
-        cache_manager = memory_manager.get_cache_manager()
-        cache_manager.set_cache(f"input_state_{user_id}", "custom_weekly", ttl=300)
+        memory_manager.set_input_state(user_id, "custom_weekly")
         
         logger.info(f"✅ Özel haftalık limit input başlatıldı - User: {user_id}")
         
@@ -5204,8 +5176,7 @@ async def handle_custom_input(message: types.Message) -> None:
         
         # Input state'ini kontrol et
         from utils.memory_manager import memory_manager
-        cache_manager = memory_manager.get_cache_manager()
-        input_state = cache_manager.get_cache(f"input_state_{user_id}")
+        input_state = memory_manager.get_input_state(user_id)
         
         logger.info(f"🔍 Input state: {input_state} - User: {user_id}")
         
@@ -5303,7 +5274,7 @@ async def handle_custom_input(message: types.Message) -> None:
                     await message.reply("❌ Limit güncellenirken hata oluştu!")
             
             # Input state'ini temizle
-            cache_manager.delete_cache(f"input_state_{user_id}")
+            memory_manager.clear_input_state(user_id)
             
         except ValueError:
             await message.reply("❌ Geçersiz sayı formatı! Lütfen sayı girin (örn: 0.05)")
@@ -25,10 +25,10 @@ def set_bot_instance(bot_instance):
     _bot_instance = bot_instance
 
 async def delete_message_after_delay(message, delay=5):
-    """Mesajı belirtilen süre sonra sil"""
+    """Mesajı belirtilen süre sonra sil - delayed action scheduler üzerinden"""
     try:
-        await asyncio.sleep(delay)
-        await message.delete()
+        from utils.delayed_actions import schedule_message_deletion
+        await schedule_message_deletion(message.chat.id, message.message_id, delay)
     except:
         pass
 
@@ -196,7 +196,7 @@ async def send_error_message(message: types.Message, text: str) -> None:
                 await _bot_instance.send_message(message.from_user.id, text)
             except Exception as e:
                 logger.error(f"❌ Bot instance mesaj gönderme hatası: {e}")
-        asyncio.create_task(delete_message_after_delay(sent_message))
+        await delete_message_after_delay(sent_message)
 
 async def send_response_message(message: types.Message, text: str) -> None:
     """Yanıt mesajı gönder"""
@@ -209,7 +209,7 @@ async def send_response_message(message: types.Message, text: str) -> None:
                 await _bot_instance.send_message(message.from_user.id, text, parse_mode="Markdown")
             except Exception as e:
                 logger.error(f"❌ Bot instance mesaj gönderme hatası: {e}")
-        asyncio.create_task(delete_message_after_delay(sent_message))
+        await delete_message_after_delay(sent_message)
 
 # =============================
 # KOMUT HANDLER'LARI
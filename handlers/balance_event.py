@@ -637,6 +637,9 @@ async def process_surprise_event(amount: float, reason: str, admin_id: int) -> d
                         WHERE user_id = $2
                     """, new_balance, user["user_id"])
                     
+                    from utils.rank_index import user_rank_index
+                    user_rank_index.set_points(user["user_id"], new_balance)
+                    
                     # İşlem logunu kaydet
                     await conn.execute("""
                         INSERT INTO balance_logs (user_id, admin_id, action, amount, reason, created_at)
@@ -646,7 +649,7 @@ async def process_surprise_event(amount: float, reason: str, admin_id: int) -> d
                     # Kullanıcıya bildirim gönder
                     await send_surprise_notification(user["user_id"], amount, reason)
                     
-                    # Admin'e sürpriz etkinlik bildirimi gönder (her kullanıcı için ayrı)
+                    # Admin'e sürpriz etkinlik bildirimi (digest'te toplanır)
                     await send_admin_surprise_notification(
                         admin_id=admin_id,
                         user_info=user,
@@ -700,26 +703,20 @@ async def send_surprise_notification(user_id: int, amount: float, reason: str) -
 
 
 async def send_admin_surprise_notification(admin_id: int, user_info: dict, old_balance: float, new_balance: float, amount: float, reason: str) -> None:
-    """Admin'e sürpriz etkinlik bildirimi gönder"""
+    """Admin'e sürpriz etkinlik bildirimi - digest'e eklenir, tek özet mesaj olarak gider"""
     try:
-        from main import bot  # Bot instance'ını al
+        import html
+        from utils.notification_digest import admin_notification_aggregator
         
         change_amount = new_balance - old_balance
         
-        response = f"""
-🎉 **Sürpriz Etkinlik - Kullanıcı Bildirimi**
-
-**👤 Kullanıcı:** {user_info["first_name"]}
-**🆔 ID:** `{user_info["user_id"]}`
-**💰 Eski Bakiye:** {old_balance:.2f} KP
-**💰 Yeni Bakiye:** {new_balance:.2f} KP
-**📈 Değişim:** +{change_amount:.2f} KP
-
-**📝 Etkinlik:** {reason}
-**⏰ Tarih:** {datetime.now().strftime('%d.%m.%Y %H:%M')}
-
-**✅ Sürpriz etkinlik kullanıcıya uygulandı!**
-        """
+        # Özet HTML - kullanıcı verisi kaçırılır
+        line = (
+            f"• {html.escape(user_info['first_name'] or '')} (<code>{user_info['user_id']}</code>): "
+            f"{old_balance:.2f} → {new_balance:.2f} KP (+{change_amount:.2f}) - {html.escape(reason or '')}"
+        )
+        
+        await admin_notification_aggregator.notify(admin_id, "surprise_event", line)
         
         logger.info(f"✅ Surprise event completed - User: {user_info['user_id']}, Amount: {amount}, Reason: {reason}")
         
@@ -35,10 +35,10 @@ def set_bot_instance(bot_instance):
     _bot_instance = bot_instance
 
 async def delete_message_after_delay(message, delay=5):
-    """Mesajı belirtilen süre sonra sil"""
+    """Mesajı belirtilen süre sonra sil - delayed action scheduler üzerinden"""
     try:
-        await asyncio.sleep(delay)
-        await message.delete()
+        from utils.delayed_actions import schedule_message_deletion
+        await schedule_message_deletion(message.chat.id, message.message_id, delay)
     except:
         pass
 
@@ -347,6 +347,9 @@ async def add_balance_simple(user_id: int, amount: float) -> dict:
                 WHERE user_id = $2
             """, new_balance, user_id)
             
+            from utils.rank_index import user_rank_index
+            user_rank_index.set_points(user_id, new_balance)
+            
             logger.info(f"💰 Bakiye eklendi - User: {user_id}, Amount: {amount}, Old: {current_balance}, New: {new_balance}")
             
             return {
@@ -387,6 +390,9 @@ async def remove_balance_simple(user_id: int, amount: float) -> dict:
                 WHERE user_id = $2
             """, new_balance, user_id)
             
+            from utils.rank_index import user_rank_index
+            user_rank_index.set_points(user_id, new_balance)
+            
             logger.info(f"💰 Bakiye çıkarıldı - User: {user_id}, Amount: {amount}, Old: {current_balance}, New: {new_balance}")
             
             return {
@@ -407,7 +413,7 @@ async def send_error_message(message: Message, text: str) -> None:
     else:
         sent_message = await message.answer("❌ Hata oluştu! Detaylar özel mesajda.")
         await _bot_instance.send_message(message.from_user.id, text)
-        asyncio.create_task(delete_message_after_delay(sent_message))
+        await delete_message_after_delay(sent_message)
 
 async def send_response_message(message: Message, text: str) -> None:
     """Yanıt mesajı gönder"""
@@ -416,7 +422,7 @@ async def send_response_message(message: Message, text: str) -> None:
     else:
         sent_message = await message.answer("✅ İşlem tamamlandı! Detaylar özel mesajda.")
         await _bot_instance.send_message(message.from_user.id, text, parse_mode="Markdown")
-        asyncio.create_task(delete_message_after_delay(sent_message))
+        await delete_message_after_delay(sent_message)
 
 async def notify_user_balance_change(user_id: int, admin_id: int, amount: float, operation: str, old_balance: float, new_balance: float) -> None:
     """Kullanıcıya bakiye değişikliği bildirimi gönder"""
@@ -13,6 +13,7 @@ from aiogram.fsm.state import State, StatesGroup
 from config import get_config
 from database import get_db_pool
 from utils.logger import logger
+from utils.conversation_state import FlowStateDict
 
 # Router tanımla
 router = Router()
@@ -29,7 +30,7 @@ def set_bot_instance(bot_instance):
     _bot_instance = bot_instance
 
 # Global FSM storage
-broadcast_states = {}
+broadcast_states = FlowStateDict("broadcast")
 
 # ==============================================
 # ROUTER HANDLER'LARI
@@ -3,24 +3,21 @@
 """
 
 import logging
-import time
 from aiogram import types
 from aiogram.types import Message
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 
 from database import is_user_registered, save_user_info
+from utils.cooldown_manager import cooldowns
 
 logger = logging.getLogger(__name__)
 
 # Bot instance setter
 _bot_instance = None
 
-# Kayıtsız kullanıcılar için cooldown sistemi
-unregistered_user_cooldowns = {}
-
-# Kayıtlı kullanıcılar için menü cooldown sistemi
-registered_user_menu_cooldowns = {}
+# Kayıtsız kullanıcılar için cooldown süresi
+UNREGISTERED_USER_COOLDOWN = 600  # 10 dakika
 
 def set_bot_instance(bot_instance):
     global _bot_instance
@@ -60,20 +57,10 @@ async def handle_chat_message(message: Message) -> None:
             return
         
         else:
-            # Kayıtsız kullanıcı - Cooldown kontrolü
-            current_time = time.time()
-            cooldown_duration = 600  # 10 dakika
-            
-            # Kullanıcının son mesaj zamanını kontrol et
-            if user.id in unregistered_user_cooldowns:
-                last_message_time = unregistered_user_cooldowns[user.id]
-                if current_time - last_message_time < cooldown_duration:
-                    # Cooldown aktif, mesaj gönderme
-                    logger.info(f"⏰ Kayıtsız kullanıcı cooldown'da - User: {user.first_name} ({user.id})")
-                    return
-            
-            # Cooldown geçmişse veya ilk mesajsa
-            unregistered_user_cooldowns[user.id] = current_time
+            # Kayıtsız kullanıcı - Cooldown kontrolü (geçmişse veya ilk mesajsa yeniden başlar)
+            if not cooldowns.try_acquire("unregistered_reminder", user.id, UNREGISTERED_USER_COOLDOWN):
+                logger.info(f"⏰ Kayıtsız kullanıcı cooldown'da - User: {user.first_name} ({user.id})")
+                return
             
             # Özelden kayıt mesajı gönder
             from handlers.chat_system import send_registration_reminder
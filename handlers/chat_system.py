@@ -5,20 +5,17 @@ Bot'un grup sohbetlerinde doğal konuşabilmesi için
 
 import random
 import asyncio
-import time
 import re
 from typing import Optional, Dict
 from aiogram import Bot
 from aiogram.types import Message
 from utils.logger import logger
-from utils.cooldown_manager import cooldown_manager
+from utils.cooldown_manager import cooldown_manager, cooldowns
 from database import is_user_registered
 from config import get_config
 from aiogram import types
-
-# Bot başlangıç koruması
-bot_startup_time = time.time() - 300  # 5 dakika önce başlat (koruma geçmiş olsun)
-STARTUP_PROTECTION_DURATION = 60  # 1 dakika koruma
+from utils.catch_up import is_stale_message, get_catch_up_stats
+from utils.text_matcher import MultiPatternMatcher
 
 # Chat sistemi ayarları
 chat_system_active = True
@@ -26,7 +23,6 @@ chat_probability = 0.15  # %15 ihtimalle cevap ver (daha seçici)
 min_message_length = 3  # Minimum mesaj uzunluğu (3 harf)
 
 # Kayıt olmayan kullanıcılar için teşvik sistemi
-unregistered_users_last_message = {}  # {user_id: timestamp}
 REGISTRATION_REMINDER_INTERVAL = 600  # 10 dakika (600 saniye)
 
 # Selamlaşma kalıpları - Sadece gerçek selamlamalar
@@ -314,30 +310,65 @@ JARGON_REPLIES = {
     "ne yapıyorsunuz": "Sohbete katılıyorum! Sen ne yapıyorsun?"
 }
 
-import re
+# KirveHub / point / pozitif mesaj tetikleyicileri (alt metin olarak aranır)
+KIRVEHUB_TERMS = ["kirvehub", "kirve hub"]
+POINT_TERMS = ["point", "puan", "kp"]
+POSITIVE_WORDS = ["güzel", "harika", "mükemmel", "süper", "muhteşem", "çok iyi"]
+
+# Tüm kalıp tabloları tek otomatta: kategori -> (tablo, kelime sınırı)
+_chat_matcher = MultiPatternMatcher()
+_chat_key_order: Dict[str, Dict[str, int]] = {}
+
+
+def rebuild_chat_matcher() -> None:
+    """Kalıp tablolarından otomatı kur (import'ta ve tablolar değişince)"""
+    global _chat_matcher, _chat_key_order
+    tables = {
+        "jargon": (JARGON_REPLIES, True),
+        "shortcut": (SHORTCUTS, True),
+        "greeting": (GREETINGS, False),
+        "question": (QUESTIONS, False),
+        "daily": (DAILY_CHAT, False),
+        "kirvehub": (KIRVEHUB_TERMS, False),
+        "point": (POINT_TERMS, False),
+        "positive": (POSITIVE_WORDS, False),
+    }
+    matcher = MultiPatternMatcher()
+    key_order = {}
+    for category, (table, whole_word) in tables.items():
+        key_order[category] = {}
+        for index, key in enumerate(table):
+            matcher.add(key, category, whole_word=whole_word)
+            key_order[category][key] = index
+    _chat_matcher, _chat_key_order = matcher.build(), key_order
+    logger.info(f"🔎 Sohbet kalıp otomatı kuruldu - {len(matcher)} kalıp")
+
+
+def match_chat_patterns(text: str) -> Dict[str, list]:
+    """Tek geçişte tüm kategoriler - anahtarlar tablo sırasında"""
+    order = _chat_key_order
+    return {
+        category: sorted(keys, key=order[category].__getitem__)
+        for category, keys in _chat_matcher.match_keys(text).items()
+    }
 
-def find_shortcuts(text):
-    found = []
-    for k in SHORTCUTS:
-        # kelime olarak geçiyorsa
-        if re.search(rf"\b{k}\b", text):
-            found.append(k)
-    return found
-
-def find_jargon_reply(text):
-    # En son geçen ve baskın jargon için cevap döndür
-    found = []
-    for k in JARGON_REPLIES:
-        if re.search(rf"\b{k}\b", text):
-            found.append(k)
+
+def find_shortcuts(text, matches: Optional[Dict[str, list]] = None):
+    if matches is None:
+        matches = match_chat_patterns(text)
+    return matches.get("shortcut", [])
+
+def find_jargon_reply(text, matches: Optional[Dict[str, list]] = None):
+    # Eşleşen jargonlardan tabloda en sonda olanın cevabı
+    if matches is None:
+        matches = match_chat_patterns(text)
+    found = matches.get("jargon")
     if found:
-        # En son geçen jargonun cevabını döndür
         return JARGON_REPLIES[found[-1]]
     return None
 
-def is_bot_startup_protection_active():
-    """Bot başlangıç koruması aktif mi kontrol et"""
-    return (time.time() - bot_startup_time) < STARTUP_PROTECTION_DURATION
+
+rebuild_chat_matcher()
 
 async def send_registration_reminder(user_id: int, user_name: str):
     """Kayıt olmayan kullanıcıya hatırlatma mesajı gönder"""
@@ -440,40 +471,30 @@ Merhaba {user_name}! 👋
         logger.error(f"❌ Hatırlatma mesajı gönderme hatası: {e}")
 
 def should_send_registration_reminder(user_id: int) -> bool:
-    """Kayıt olmayan kullanıcıya hatırlatma gönderilmeli mi kontrol et"""
-    current_time = time.time()
-    
-    # Kullanıcının son mesaj zamanını kontrol et
-    if user_id in unregistered_users_last_message:
-        last_message_time = unregistered_users_last_message[user_id]
-        # 10 dakika geçmişse hatırlatma gönder
-        if current_time - last_message_time >= REGISTRATION_REMINDER_INTERVAL:
-            unregistered_users_last_message[user_id] = current_time
-            return True
-    
-    return False
+    """Kayıt olmayan kullanıcıya hatırlatma gönderilmeli mi kontrol et (10 dakikada bir)"""
+    return cooldowns.try_acquire("unregistered_reminder", user_id, REGISTRATION_REMINDER_INTERVAL)
 
 def cleanup_unregistered_user(user_id: int):
     """Kullanıcı gruptan çıktığında veya kayıt olduğunda temizlik yap"""
-    if user_id in unregistered_users_last_message:
-        del unregistered_users_last_message[user_id]
+    if cooldowns.cancel("unregistered_reminder", user_id):
         logger.info(f"🧹 Kayıt olmayan kullanıcı temizlendi - User: {user_id}")
 
 def is_user_in_unregistered_list(user_id: int) -> bool:
     """Kullanıcı kayıt olmayan kullanıcılar listesinde mi kontrol et"""
-    return user_id in unregistered_users_last_message
+    return cooldowns.is_active("unregistered_reminder", user_id)
         
-async def handle_chat_message(message: Message) -> Optional[str]:
+async def handle_chat_message(message: Message, is_registered: Optional[bool] = None) -> Optional[str]:
     """
     Sohbet mesajını analiz et ve uygun cevabı döndür
+    is_registered verilirse (pipeline'dan) tekrar sorgulanmaz
     """
     try:
         user_id = message.from_user.id
         text = message.text.lower().strip()
         
-        # Bot başlangıç koruması kontrolü
-        if is_bot_startup_protection_active():
-            logger.info(f"🛡️ Bot başlangıç koruması aktif - User: {user_id}")
+        # Restart sonrası eski mesajlara cevap verme (catch-up)
+        if is_stale_message(message):
+            logger.info(f"⏪ Eski mesaj, cevap verilmiyor - User: {user_id}")
             return None
         
         # Temel kontroller
@@ -501,7 +522,8 @@ async def handle_chat_message(message: Message) -> Optional[str]:
             return None
             
         # Kayıt kontrolü
-        is_registered = await is_user_registered(user_id)
+        if is_registered is None:
+            is_registered = await is_user_registered(user_id)
         
         # Kayıt olmayan kullanıcılar için hiçbir şey yapma (message_monitor.py'de hallediliyor)
         if not is_registered:
@@ -510,14 +532,17 @@ async def handle_chat_message(message: Message) -> Optional[str]:
         # Mesajı kaydet
         await cooldown_manager.record_user_message(user_id)
         
+        # Tüm kalıp tabloları tek geçişte
+        matches = match_chat_patterns(text)
+        
         # Jargonlara özel cevap
-        jargon_reply = find_jargon_reply(text)
+        jargon_reply = find_jargon_reply(text, matches)
         if jargon_reply:
             logger.info(f"✅ Jargon cevabı: {jargon_reply}")
             return jargon_reply
 
         # Kısaltma tespiti (diğerleri)
-        found_shortcuts = find_shortcuts(text)
+        found_shortcuts = find_shortcuts(text, matches)
         if found_shortcuts:
             responses = []
             for sc in found_shortcuts:
@@ -535,34 +560,31 @@ async def handle_chat_message(message: Message) -> Optional[str]:
             return yanit
 
         # Selamlaşma kontrolü - Sadece gerçek selamlamalar
-        for greeting, responses in GREETINGS.items():
-            if greeting in text:
-                response = random.choice(responses)
-                logger.info(f"✅ Selamlaşma cevabı: {response}")
-                return response
+        if matches.get("greeting"):
+            response = random.choice(GREETINGS[matches["greeting"][0]])
+            logger.info(f"✅ Selamlaşma cevabı: {response}")
+            return response
                 
         # Soru kontrolü - Sadece gerçek sorular
-        for question, responses in QUESTIONS.items():
-            if question in text:
-                response = random.choice(responses)
-                logger.info(f"✅ Soru cevabı: {response}")
-                return response
+        if matches.get("question"):
+            response = random.choice(QUESTIONS[matches["question"][0]])
+            logger.info(f"✅ Soru cevabı: {response}")
+            return response
                 
         # Günlük konuşma kalıpları kontrolü - Sadece gerçek tepkiler
-        for phrase, responses in DAILY_CHAT.items():
-            if phrase in text:
-                response = random.choice(responses)
-                logger.info(f"✅ Günlük konuşma cevabı: {response}")
-                return response
+        if matches.get("daily"):
+            response = random.choice(DAILY_CHAT[matches["daily"][0]])
+            logger.info(f"✅ Günlük konuşma cevabı: {response}")
+            return response
                 
         # KirveHub kelimesi kontrolü - Sadece gerçekten KirveHub hakkında konuşulduğunda
-        if "kirvehub" in text or "kirve hub" in text:
+        if matches.get("kirvehub"):
             response = random.choice(KIRVEHUB_RESPONSES)
             logger.info(f"✅ KirveHub cevabı: {response}")
             return response
             
         # Point kelimesi kontrolü - Sadece gerçekten point hakkında konuşulduğunda
-        if "point" in text or "puan" in text or "kp" in text:
+        if matches.get("point"):
             response = random.choice(POINT_RESPONSES)
             logger.info(f"✅ Point cevabı: {response}")
             return response
@@ -570,8 +592,7 @@ async def handle_chat_message(message: Message) -> Optional[str]:
         # Çok nadir genel cevaplar - Sadece çok pozitif mesajlarda
         if random.random() < 0.005:  # %0.5 ihtimalle (daha nadir)
             # Sadece çok pozitif mesajlarda cevap ver
-            positive_words = ["güzel", "harika", "mükemmel", "süper", "muhteşem", "çok iyi"]
-            if any(word in text for word in positive_words):
+            if matches.get("positive"):
                 response = random.choice([
                     "Evet, gerçekten güzel! 😊",
                     "Haklısın! 💎",
@@ -588,7 +609,7 @@ async def handle_chat_message(message: Message) -> Optional[str]:
         logger.error(f"❌ Chat message handler hatası: {e}")
         return None
 
-async def send_chat_response(message: Message, response: str):
+async def send_chat_response(message: Message, response: str, is_registered: Optional[bool] = None):
     """Sohbet cevabını gönder"""
     try:
         config = get_config()
@@ -596,7 +617,8 @@ async def send_chat_response(message: Message, response: str):
         
         # Kayıt kontrolü ve yönlendirme
         user_id = message.from_user.id
-        is_registered = await is_user_registered(user_id)
+        if is_registered is None:
+            is_registered = await is_user_registered(user_id)
         
         # Kayıt olmayan kullanıcılar için özel mesaj kontrolü
         if not is_registered and any(keyword in response.lower() for keyword in ["kayıt ol", "point kazan", "etkinliklere katıl"]):
@@ -660,8 +682,7 @@ def get_chat_stats() -> Dict:
         "active": chat_system_active,
         "probability": chat_probability,
         "min_length": min_message_length,
-        "startup_protection_active": is_bot_startup_protection_active(),
-        "startup_protection_remaining": max(0, STARTUP_PROTECTION_DURATION - (time.time() - bot_startup_time)),
+        "catch_up": get_catch_up_stats(),
         "greetings_count": len(GREETINGS),
         "questions_count": len(QUESTIONS),
         "daily_chat_count": len(DAILY_CHAT),
@@ -16,12 +16,13 @@ from aiogram.fsm.state import State, StatesGroup
 from config import get_config
 from database import get_db_pool
 from utils.logger import logger
+from utils.conversation_state import FlowStateDict
 
 router = Router()
 
 # Global variables
 _bot_instance = None
-command_creation_states = {}  # Komut oluşturma durumları
+command_creation_states = FlowStateDict("command_creation")  # Komut oluşturma durumları
 
 def set_bot_instance(bot_instance):
     global _bot_instance
@@ -581,8 +582,10 @@ async def list_custom_commands_handler(callback: types.CallbackQuery) -> None:
             await callback.answer("❌ Bu işlemi sadece admin yapabilir!", show_alert=True)
             return
         
-        from database import list_custom_commands
-        commands = await list_custom_commands()
+        from database import list_custom_commands_page
+        from utils.keyset_pagination import page_buttons, split_page_token
+        page = await list_custom_commands_page(split_page_token(callback.data, "list_custom_commands"), 10)
+        commands = page.rows
         
         if not commands:
             response = """
@@ -602,11 +605,9 @@ Komut oluşturmak için "🔧 Yeni Komut Oluştur" butonuna tıklayın.
             response = f"""
 📋 **DİNAMİK KOMUTLAR**
 
-**Toplam:** {len(commands)} komut
-
 """
             
-            for i, cmd in enumerate(commands[:10], 1):  # İlk 10 komut
+            for i, cmd in enumerate(commands, 1):
                 scope_name = get_scope_name(cmd["scope"])
                 response += f"**ID: {cmd['id']}** `{cmd['command_name']}` - {scope_name}\n"
                 response += f"   📝 {cmd['reply_text'][:30]}...\n"
@@ -614,14 +615,14 @@ Komut oluşturmak için "🔧 Yeni Komut Oluştur" butonuna tıklayın.
                     response += f"   🔘 {cmd['button_text']}\n"
                 response += f"   📅 {cmd['created_at'].strftime('%d.%m.%Y %H:%M')}\n\n"
             
-            if len(commands) > 10:
-                response += f"... ve {len(commands) - 10} komut daha\n\n"
-            
             keyboard = InlineKeyboardMarkup(inline_keyboard=[
                 [InlineKeyboardButton(text="🔧 Yeni Komut Oluştur", callback_data="admin_command_creator")],
                 [InlineKeyboardButton(text="🗑️ Komut Sil", callback_data="delete_custom_command")],
                 [InlineKeyboardButton(text="⬅️ Geri", callback_data="admin_command_creator")]
             ])
+            navigation = page_buttons(page, "list_custom_commands")
+            if navigation:
+                keyboard.inline_keyboard.insert(0, navigation)
         
         await callback.message.edit_text(response, parse_mode="Markdown", reply_markup=keyboard)
         
@@ -11,7 +11,7 @@ from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKe
 from aiogram.filters import Command
 
 from config import get_config
-from database import db_pool, end_event, get_event_participant_count, get_event_winners, get_latest_active_event_in_group, get_event_info_for_end, cancel_event, get_event_status
+from database import db_pool, end_event, get_event_winners, get_latest_active_event_in_group, get_event_info_for_end, cancel_event, get_event_status
 from utils.logger import logger
 
 router = Router()
@@ -125,24 +125,23 @@ async def end_lottery_command(message: Message):
         
         if success:
             # Kazananları tekrar al (end_event'ten sonra)
-            participant_count = await get_event_participant_count(event_id)
+            participant_count = event_details.get('participant_count', 0)
             winners = await get_event_winners(event_id, event_details.get('max_winners', 1))
             
-            # Point havuzu hesapla
-            total_pool = participant_count * event_details.get('entry_cost', 0)
+            # Point havuzu - katılımlarla birlikte tutulan sayaç
+            total_pool = float(event_details.get('total_pool') or 0)
             winner_share = total_pool / len(winners) if winners else 0
             
             # Kazananlara point ver
             if winners:
-                from database import add_points_to_user
+                from database import credit_event_prize
                 for winner in winners:
                     try:
-                        # Kazananlara point ver
-                        await add_points_to_user(
-                            winner['user_id'], 
-                            winner_share,
-                            group_id=event_details.get('group_id')
-                        )
+                        # Kazananlara point ver - mesaj puanı limitlerinden bağımsız
+                        credited = await credit_event_prize(winner['user_id'], winner_share, event_id)
+                        if not credited:
+                            logger.error(f"❌ Ödül yatırılamadı, bildirim gönderilmedi: User {winner['user_id']}, Event {event_id}")
+                            continue
                         
                         # Kazananlara özel bildirim gönder
                         winner_message = f"""
@@ -43,7 +43,7 @@ async def _send_events_list_privately(user_id: int, is_admin: bool):
         
         async with pool.acquire() as conn:
             events = await conn.fetch(
-                "SELECT id, event_type, event_name, max_participants, created_at FROM events WHERE is_active = TRUE ORDER BY created_at DESC"
+                "SELECT id, event_type, event_name, max_participants, created_at, participant_count FROM events WHERE is_active = TRUE ORDER BY created_at DESC"
             )
         
         if not events:
@@ -57,8 +57,7 @@ async def _send_events_list_privately(user_id: int, is_admin: bool):
         
         message_text = "🚀 **AKTİF ETKİNLİKLER** 🚀\n\n"
         for i, event in enumerate(events, 1):
-            # Katılımcı sayısını al (şimdilik 0)
-            participant_count = 0
+            participant_count = event['participant_count']
             
             event_type = "🎲 Çekiliş" if event['event_type'] == 'lottery' else "💬 Bonus"
             
@@ -387,8 +386,11 @@ async def join_event_handler(callback: CallbackQuery):
         from database import get_event_participant_count
         participant_count = await get_event_participant_count(event_id)
         
-        # Katılımcı sayısını güncelle
-        try:
+        # Katılımcı sayısını güncelle - eşzamanlı katılımlar tek edit'e birleştirilir
+        async def render_group_message():
+            # Edit anındaki güncel sayıyı kullan
+            current_count = await get_event_participant_count(event_id)
+            
             # Event type'ı belirle
             event_type = "Genel Çekiliş" if event_info.get('event_type') == 'lottery' else "Chat Bonus"
             
@@ -400,7 +402,7 @@ async def join_event_handler(callback: CallbackQuery):
 
 💰 **Katılım:** {event_info['entry_cost']:.2f} KP
 🏆 **Kazanan:** {event_info['max_winners']} kişi  
-👥 **Katılımcı:** {participant_count} kişi
+👥 **Katılımcı:** {current_count} kişi
 🎯 **ID:** {event_id}
 
 🎮 **Katılmak için butona tıklayın!**
@@ -413,11 +415,16 @@ Hala kayıtlı değilseniz, botun özel mesajına gidip **/kirvekayit** komutunu
             keyboard = InlineKeyboardMarkup(inline_keyboard=[
                 [InlineKeyboardButton(text="🎲 Çekilişe Katıl 🎲", callback_data=f"join_event_{event_id}")]
             ])
-            
-            await callback.message.edit_text(
-                group_message,
+            return group_message, keyboard
+        
+        try:
+            from utils.edit_coalescer import edit_coalescer
+            await edit_coalescer.request_edit(
+                callback.bot,
+                callback.message.chat.id,
+                callback.message.message_id,
                 parse_mode="Markdown",
-                reply_markup=keyboard
+                render=render_group_message
             )
         except Exception as e:
             logger.error(f"❌ Grup mesajı güncelleme hatası: {e}")
@@ -675,50 +682,54 @@ async def refresh_events_handler(callback: CallbackQuery):
         config = get_config()
         is_admin = callback.from_user.id == config.ADMIN_USER_ID
         
-        from handlers.simple_events import get_active_events
-        events = await get_active_events()
-        
-        if not events:
-            await callback.message.edit_text(
-                "📋 **Aktif Etkinlik Yok**\n\n"
-                "Şu anda aktif etkinlik bulunmuyor.",
-                parse_mode="Markdown"
-            )
-            return
-        
-        events_list = "🎯 **Aktif Etkinlikler:**\n\n"
-        keyboard_buttons = []
-        
-        for i, event in enumerate(events, 1):
-            event_type = "🎲 Çekiliş" if event['event_type'] == 'lottery' else "💬 Bonus"
-            events_list += f"**{i}. {event_type}**\n"
-            events_list += f"📝 {event['event_name']}\n"
-            events_list += f"🏆 Kazanan: {event['max_participants']} kişi\n\n"
+        async def render_events_list():
+            from handlers.simple_events import get_active_events
+            events = await get_active_events()
             
-            # Katılım butonu
-            keyboard_buttons.append([
-                InlineKeyboardButton(
-                    text=f"🎯 {i}. Etkinliğe Katıl", 
-                    callback_data=f"join_event_{event['id']}"
+            if not events:
+                return (
+                    "📋 **Aktif Etkinlik Yok**\n\n"
+                    "Şu anda aktif etkinlik bulunmuyor.",
+                    None
                 )
-            ])
             
-            # Admin için bitirme butonu
-            if is_admin:
+            events_list = "🎯 **Aktif Etkinlikler:**\n\n"
+            keyboard_buttons = []
+            
+            for i, event in enumerate(events, 1):
+                event_type = "🎲 Çekiliş" if event['event_type'] == 'lottery' else "💬 Bonus"
+                events_list += f"**{i}. {event_type}**\n"
+                events_list += f"📝 {event['event_name']}\n"
+                events_list += f"🏆 Kazanan: {event['max_participants']} kişi\n\n"
+                
+                # Katılım butonu
                 keyboard_buttons.append([
                     InlineKeyboardButton(
-                        text=f"🏁 {i}. Etkinliği Bitir", 
-                        callback_data=f"end_event_{event['id']}"
+                        text=f"🎯 {i}. Etkinliğe Katıl", 
+                        callback_data=f"join_event_{event['id']}"
                     )
                 ])
-        
-        keyboard_buttons.append([InlineKeyboardButton(text="🔄 Yenile", callback_data="refresh_events")])
-        keyboard = InlineKeyboardMarkup(inline_keyboard=keyboard_buttons)
-        
-        await callback.message.edit_text(
-            events_list,
+                
+                # Admin için bitirme butonu
+                if is_admin:
+                    keyboard_buttons.append([
+                        InlineKeyboardButton(
+                            text=f"🏁 {i}. Etkinliği Bitir", 
+                            callback_data=f"end_event_{event['id']}"
+                        )
+                    ])
+            
+            keyboard_buttons.append([InlineKeyboardButton(text="🔄 Yenile", callback_data="refresh_events")])
+            return events_list, InlineKeyboardMarkup(inline_keyboard=keyboard_buttons)
+        
+        # Art arda yenilemeler tek edit'e birleştirilir
+        from utils.edit_coalescer import edit_coalescer
+        await edit_coalescer.request_edit(
+            callback.bot,
+            callback.message.chat.id,
+            callback.message.message_id,
             parse_mode="Markdown",
-            reply_markup=keyboard
+            render=render_events_list
         )
         
     except Exception as e:
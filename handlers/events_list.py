@@ -42,11 +42,10 @@ async def get_active_events() -> List[Dict]:
                     e.event_name,
                     e.max_participants,
                     e.created_at,
-                    COUNT(ep.user_id) as participant_count
+                    e.participant_count,
+                    e.total_pool
                 FROM events e
-                LEFT JOIN event_participants ep ON e.id = ep.event_id
                 WHERE e.is_active = TRUE
-                GROUP BY e.id, e.event_type, e.event_name, e.max_participants, e.created_at
                 ORDER BY e.created_at DESC
             """)
         
@@ -62,7 +61,8 @@ async def get_active_events() -> List[Dict]:
                 'created_at': event['created_at'],
                 'message_id': None,
                 'group_id': None,
-                'participant_count': event['participant_count']
+                'participant_count': event['participant_count'],
+                'total_pool': float(event['total_pool'] or 0)
             })
             logger.info(f"📋 Çekiliş bulundu: ID={event['id']}, Title={event['event_name']}, Participants={event['participant_count']}")
         
@@ -162,7 +162,7 @@ async def list_active_lotteries(message: Message) -> None:
 
 🎯 **Toplam Aktif Çekiliş:** {len(events)} adet
 👥 **Toplam Katılımcı:** {sum(e.get('participant_count', 0) for e in events)} kişi
-💰 **Toplam Ödül Havuzu:** {sum(e.get('entry_cost', 0) * e.get('participant_count', 0) for e in events):.2f} KP
+💰 **Toplam Ödül Havuzu:** {sum(e.get('total_pool', 0) for e in events):.2f} KP
         """
         
         await message.reply(summary_message, parse_mode="Markdown")
@@ -273,7 +273,7 @@ async def send_lotteries_list_privately(user_id: int, is_admin: bool = False):
 
 🎯 **Toplam Aktif Çekiliş:** {len(events)} adet
 👥 **Toplam Katılımcı:** {sum(event.get('participant_count', 0) for event in events)} kişi
-💰 **Toplam Ödül Havuzu:** {sum(event.get('entry_cost', 0) * event.get('participant_count', 0) for event in events):.2f} KP
+💰 **Toplam Ödül Havuzu:** {sum(event.get('total_pool', 0) for event in events):.2f} KP
         """
         
         # Bot instance'ını al
@@ -377,7 +377,7 @@ async def send_group_lotteries_list(user_id: int):
 
 🎯 **Toplam Aktif Çekiliş:** {len(events)} adet
 👥 **Toplam Katılımcı:** {sum(event.get('participant_count', 0) for event in events)} kişi
-💰 **Toplam Ödül Havuzu:** {sum(event.get('entry_cost', 0) * event.get('participant_count', 0) for event in events):.2f} KP
+💰 **Toplam Ödül Havuzu:** {sum(event.get('total_pool', 0) for event in events):.2f} KP
         """
         
         # Bot instance'ını al
@@ -459,15 +459,11 @@ async def get_active_events_detailed() -> List[Dict]:
                     e.status,
                     e.group_id,
                     e.message_id,
-                    COUNT(CASE WHEN ep.withdrew_at IS NULL THEN ep.user_id END) as participant_count
+                    e.participant_count,
+                    e.total_pool
                 FROM events e
-                LEFT JOIN event_participations ep ON e.id = ep.event_id
                 WHERE e.status = 'active' 
                     AND e.completed_at IS NULL
-                GROUP BY 
-                    e.id, e.event_type, e.title, e.entry_cost, 
-                    e.max_winners, e.description, e.created_at, e.status,
-                    e.group_id, e.message_id
                 ORDER BY e.created_at DESC
             """
             
@@ -542,24 +538,23 @@ async def refresh_lotteries_list_callback(callback: CallbackQuery):
         config = get_config()
         is_admin = user_id == config.ADMIN_USER_ID
         
-        # Mevcut mesajı güncelle
-        events = await get_active_events_detailed()
-        
-        # Her durumda aynı mesaj ve keyboard
-        message = await create_lotteries_list_message(events, is_admin)
-        keyboard = await create_lotteries_list_keyboard(events, is_admin)
-        
-        try:
-            await callback.message.edit_text(
-                message,
-                parse_mode="HTML",
-                reply_markup=keyboard
-            )
-        except Exception as edit_error:
-            if "message is not modified" in str(edit_error):
-                pass  # Aynı mesaj, güncelleme gerekmiyor
-            else:
-                raise edit_error
+        # Mevcut mesajı güncelle - art arda yenilemeler tek edit'e birleştirilir
+        async def render_lotteries_list():
+            events = await get_active_events_detailed()
+            
+            # Her durumda aynı mesaj ve keyboard
+            message = await create_lotteries_list_message(events, is_admin)
+            keyboard = await create_lotteries_list_keyboard(events, is_admin)
+            return message, keyboard
+        
+        from utils.edit_coalescer import edit_coalescer
+        await edit_coalescer.request_edit(
+            callback.bot,
+            callback.message.chat.id,
+            callback.message.message_id,
+            parse_mode="HTML",
+            render=render_lotteries_list
+        )
         
         await callback.answer("✅ Liste yenilendi!")
         logger.info(f"✅ Çekiliş listesi yenilendi: {user_id}")
@@ -0,0 +1,280 @@
+"""
+🧩 Grup Mesaj Pipeline'ı - Tek giriş noktası
+Grup mesajları sırayla şu aşamalardan geçer:
+    accounting → anti_spam → points → chat_reply
+Her aşama tek tek açılıp kapatılabilir ve süresi ölçülür. Kayıt
+durumu ve sistem ayarları mesaj başına bir kez sorgulanır
+(GroupMessageContext üzerinde memoize edilir).
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from aiogram.types import Message
+
+from database import (
+    is_user_registered, is_group_registered, add_points_to_user,
+    save_user_info, get_user_points_cached
+)
+
+logger = logging.getLogger(__name__)
+
+# Kaç mesajda bir point kazanılır
+MESSAGES_FOR_POINT = 5
+
+
+@dataclass
+class GroupMessageContext:
+    """Tek bir grup mesajı için paylaşılan, memoize edilmiş durum"""
+    message: Message
+    # anti_spam aşaması kapalıysa ya da hata verdiyse point engellenmez
+    flood_ok: bool = True
+    _group_registered: Optional[bool] = None
+    _user_registered: Optional[bool] = None
+    _user_saved: bool = False
+    _user_points: Optional[Dict[str, Any]] = None
+    _system_settings: Optional[Dict[str, Any]] = None
+
+    @property
+    def user(self):
+        return self.message.from_user
+
+    @property
+    def chat(self):
+        return self.message.chat
+
+    async def is_group_registered(self) -> bool:
+        if self._group_registered is None:
+            self._group_registered = await is_group_registered(self.chat.id)
+        return self._group_registered
+
+    async def is_user_registered(self) -> bool:
+        if self._user_registered is None:
+            self._user_registered = await is_user_registered(self.user.id)
+        return self._user_registered
+
+    async def ensure_user_saved(self) -> None:
+        """Kullanıcı satırını mesaj başına sadece bir kez upsert et"""
+        if not self._user_saved:
+            await save_user_info(self.user.id, self.user.username, self.user.first_name, self.user.last_name)
+            self._user_saved = True
+
+    async def get_user_points(self) -> Dict[str, Any]:
+        if self._user_points is None:
+            self._user_points = await get_user_points_cached(self.user.id) or {}
+        return self._user_points
+
+    async def get_system_settings(self) -> Dict[str, Any]:
+        if self._system_settings is None:
+            from handlers.admin_panel import get_system_settings
+            self._system_settings = await get_system_settings()
+        return self._system_settings
+
+
+# Aşama fonksiyonu False döndürürse pipeline durur
+StageFunc = Callable[[GroupMessageContext], Awaitable[bool]]
+
+
+@dataclass
+class PipelineStage:
+    """Açılıp kapatılabilen, süresi ölçülen pipeline aşaması"""
+    name: str
+    func: StageFunc
+    enabled: bool = True
+    calls: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    errors: int = 0
+
+    def record(self, elapsed_ms: float) -> None:
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+
+
+# ==============================================
+# AŞAMALAR
+# ==============================================
+
+async def accounting_stage(ctx: GroupMessageContext) -> bool:
+    """Grup kontrolü, kullanıcı kaydı ve günlük mesaj istatistiği"""
+    from handlers.message_monitor import update_daily_stats
+    from utils.update_executor import load_monitor
+
+    if ctx.user.is_bot:
+        return False
+
+    if not await ctx.is_group_registered():
+        logger.info(f"❌ Grup kayıtlı değil - Chat: {ctx.chat.id}")
+        return False
+
+    await ctx.ensure_user_saved()
+
+    # Mesaj sayısı her zaman kaydedilir (kayıtlı olmayanlar için de)
+    # Kritik yükte write-behind buffer'a ertelenir
+    await update_daily_stats(ctx.user.id, ctx.chat.id, defer=load_monitor.should_defer_stats())
+    return True
+
+
+async def anti_spam_stage(ctx: GroupMessageContext) -> bool:
+    """Flood ve yakın kopya koruması - sonucu points aşaması kullanır"""
+    from handlers.message_monitor import check_flood_protection, check_message_uniqueness
+
+    # Tüm metinler indekse girer (kayıtsızlardan kopyalanan spam da yakalansın)
+    unique = True
+    if ctx.message.text:
+        unique = await check_message_uniqueness(ctx.user.id, ctx.message.text, ctx.chat.id)
+
+    if await ctx.is_user_registered():
+        ctx.flood_ok = unique and await check_flood_protection(ctx.user.id)
+    return True
+
+
+async def points_stage(ctx: GroupMessageContext) -> bool:
+    """Kayıtlı kullanıcılara point, kayıtsızlara teşvik mesajı"""
+    from handlers.message_monitor import (
+        send_registration_encouragement, send_milestone_notification,
+        send_weekly_limit_notification
+    )
+
+    user = ctx.user
+
+    if not await ctx.is_user_registered():
+        try:
+            await send_registration_encouragement(user.id, user.first_name, ctx.chat.title)
+        except Exception as e:
+            logger.error(f"❌ Kayıt teşvik mesajı hatası - User: {user.id}, Error: {e}")
+        return True
+
+    if not ctx.flood_ok:
+        logger.info(f"⏰ Mesaj cooldown - User: {user.first_name} ({user.id})")
+        return True
+
+    current_balance = await ctx.get_user_points()
+    new_total_messages = current_balance.get('total_messages', 0) + 1
+
+    if new_total_messages % MESSAGES_FOR_POINT != 0:
+        logger.info(f"📝 Mesaj sayısı artırıldı - User: {user.first_name} ({user.id}), Mesaj: {new_total_messages}/{MESSAGES_FOR_POINT}")
+        return True
+
+    settings = await ctx.get_system_settings()
+    old_balance = current_balance.get('kirve_points', 0.0)
+    daily_points = current_balance.get('daily_points', 0.0)
+    daily_limit = settings.get('daily_limit', 5.0)
+
+    if daily_points >= daily_limit:
+        logger.info(f"⏰ Günlük limit doldu - User: {user.first_name} ({user.id}), Daily: {daily_points}/{daily_limit}")
+        return True
+
+    point_amount = settings.get('points_per_message', 0.02)
+    await add_points_to_user(user.id, point_amount, ctx.chat.id)
+
+    new_balance = old_balance + point_amount
+
+    # Milestone kontrolü - 1.00 KP'ye ulaştı mı?
+    if old_balance < 1.0 and new_balance >= 1.0:
+        await send_milestone_notification(user.id, user.first_name, new_balance)
+
+    # Haftalık limit kontrolü (20.00 KP)
+    weekly_points = current_balance.get('weekly_points', 0.0)
+    if weekly_points < 20.0 and weekly_points + point_amount >= 20.0:
+        await send_weekly_limit_notification(user.id, user.first_name, 20.0)
+
+    logger.info(f"💎 Point eklendi - User: {user.first_name} ({user.id}), Points: +{point_amount}, New Balance: {new_balance:.2f}, Mesaj: {new_total_messages}")
+    return True
+
+
+async def chat_reply_stage(ctx: GroupMessageContext) -> bool:
+    """Sohbet sistemi otomatik cevabı"""
+    from handlers.chat_system import handle_chat_message, send_chat_response
+    from utils.cooldown_manager import cooldown_manager
+    from utils.update_executor import load_monitor
+
+    if not ctx.message.text:
+        return True
+
+    # Yük altında opsiyonel otomatik cevaplar kapalı
+    if load_monitor.should_skip_optional():
+        return True
+
+    if not await cooldown_manager.can_respond_to_user(ctx.user.id):
+        return True
+
+    is_registered = await ctx.is_user_registered()
+    response = await handle_chat_message(ctx.message, is_registered=is_registered)
+    if response:
+        await send_chat_response(ctx.message, response, is_registered=is_registered)
+        await cooldown_manager.record_user_message(ctx.user.id)
+    return True
+
+
+# ==============================================
+# PIPELINE
+# ==============================================
+
+class GroupMessagePipeline:
+    """Sıralı, açılıp kapatılabilen aşamalardan oluşan grup mesaj işleyicisi"""
+
+    def __init__(self, stages: List[PipelineStage]):
+        self.stages = stages
+        self._by_name = {stage.name: stage for stage in stages}
+
+    async def process(self, message: Message) -> GroupMessageContext:
+        ctx = GroupMessageContext(message=message)
+        for stage in self.stages:
+            if not stage.enabled:
+                continue
+            started = time.perf_counter()
+            try:
+                should_continue = await stage.func(ctx)
+            except Exception as e:
+                stage.errors += 1
+                logger.error(f"❌ Pipeline aşama hatası ({stage.name}): {e}")
+                should_continue = stage.name != "accounting"
+            finally:
+                stage.record((time.perf_counter() - started) * 1000)
+            if not should_continue:
+                break
+        return ctx
+
+    def set_stage_enabled(self, name: str, enabled: bool) -> bool:
+        """Aşamayı aç/kapat"""
+        stage = self._by_name.get(name)
+        if not stage:
+            return False
+        stage.enabled = enabled
+        logger.info(f"🧩 Pipeline aşaması {'açıldı' if enabled else 'kapatıldı'}: {name}")
+        return True
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Aşama başına çağrı sayısı ve süre istatistikleri"""
+        return {
+            stage.name: {
+                "enabled": stage.enabled,
+                "calls": stage.calls,
+                "errors": stage.errors,
+                "avg_ms": round(stage.total_ms / stage.calls, 2) if stage.calls else 0.0,
+                "max_ms": round(stage.max_ms, 2),
+            }
+            for stage in self.stages
+        }
+
+
+# Global pipeline instance
+group_message_pipeline = GroupMessagePipeline([
+    PipelineStage("accounting", accounting_stage),
+    PipelineStage("anti_spam", anti_spam_stage),
+    PipelineStage("points", points_stage),
+    PipelineStage("chat_reply", chat_reply_stage),
+])
+
+
+def set_stage_enabled(name: str, enabled: bool) -> bool:
+    return group_message_pipeline.set_stage_enabled(name, enabled)
+
+
+def get_pipeline_stats() -> Dict[str, Dict[str, Any]]:
+    return group_message_pipeline.get_stats()
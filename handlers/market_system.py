@@ -4,6 +4,7 @@
 
 import logging
 from datetime import datetime
+from typing import Optional
 from aiogram import types
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
@@ -203,6 +204,9 @@ async def confirm_buy_product_modern(callback: types.CallbackQuery, data: str) -
             WHERE user_id = $2
         """, product_price, user_id)
         
+        from utils.rank_index import user_rank_index
+        user_rank_index.add(user_id, points_delta=-float(product_price))
+        
         # 2. Ürün stoğunu azalt
         await execute_query("""
             UPDATE market_products 
@@ -281,24 +285,32 @@ async def notify_admin_new_order_modern(user_id: int, product: dict, order_numbe
         if not user_info:
             return
         
+        # Kullanıcı / ürün verisi HTML'e kaçırılır (isimlerde <, & vb. olabilir)
+        import html
+        customer = html.escape(user_info['first_name'] or '')
+        if user_info['username']:
+            customer += f" (@{html.escape(user_info['username'])})"
+        product_name = html.escape(str(product['product_name']))
+        company_name = html.escape(str(product['company_name']))
+        
         # Modern admin bildirimi
         admin_message = f"""
 ╔═══════════════════════════════════╗
 ║        📦 YENİ SİPARİŞ 📦        ║
 ╚═══════════════════════════════════╝
 
-📋 **Sipariş Detayları:**
-🆔 **Sipariş No:** `{order_number}`
-👤 **Müşteri:** {user_info['first_name']} (@{user_info['username']})
-🛍️ **Ürün:** {product['product_name']}
-🏢 **Site:** {product['company_name']}
-💰 **Tutar:** {product['price']} KP
+📋 <b>Sipariş Detayları:</b>
+🆔 <b>Sipariş No:</b> <code>{order_number}</code>
+👤 <b>Müşteri:</b> {customer}
+🛍️ <b>Ürün:</b> {product_name}
+🏢 <b>Site:</b> {company_name}
+💰 <b>Tutar:</b> {product['price']} KP
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-⏰ **Tarih:** {datetime.now().strftime('%d.%m.%Y %H:%M')}
+⏰ <b>Tarih:</b> {datetime.now().strftime('%d.%m.%Y %H:%M')}
 
-🔧 **İşlemler:**
+🔧 <b>İşlemler:</b>
 • Siparişi inceleyin
 • Uygunluğunu kontrol edin
 • Onay/red kararı verin
@@ -313,14 +325,26 @@ async def notify_admin_new_order_modern(user_id: int, product: dict, order_numbe
             [InlineKeyboardButton(text="📋 Tüm Siparişler", callback_data="admin_orders_list")]
         ])
         
-        from aiogram import Bot
-        bot = Bot(token=config.BOT_TOKEN)
+        # Yüksek tutarlı siparişler anında, diğerleri digest ile bildirilir
+        from utils.notification_digest import admin_notification_aggregator
+        is_critical = float(product['price']) >= config.ADMIN_DIGEST_CRITICAL_ORDER_PRICE
         
-        await bot.send_message(
-            chat_id=config.ADMIN_USER_ID,
+        digest_line = (
+            f"• <code>{order_number}</code> - {customer} - "
+            f"{product_name} ({company_name}) - {product['price']} KP"
+        )
+        digest_keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="📋 Tüm Siparişler", callback_data="admin_orders_list")]
+        ])
+        
+        await admin_notification_aggregator.notify(
+            config.ADMIN_USER_ID,
+            "new_order",
+            digest_line,
             text=admin_message,
-            parse_mode="Markdown",
-            reply_markup=keyboard
+            critical=is_critical,
+            parse_mode="HTML",
+            reply_markup=keyboard if is_critical else digest_keyboard
         )
         
         logger.info(f"✅ Admin bildirimi gönderildi - Order: {order_number}")
@@ -329,14 +353,16 @@ async def notify_admin_new_order_modern(user_id: int, product: dict, order_numbe
         logger.error(f"❌ Admin bildirimi hatası: {e}")
 
 
-async def show_my_orders(callback: types.CallbackQuery) -> None:
-    """Kullanıcının siparişlerini göster"""
+async def show_my_orders(callback: types.CallbackQuery, page_token: Optional[str] = None) -> None:
+    """Kullanıcının siparişlerini göster - sayfa başına 10 sipariş"""
     try:
         user_id = callback.from_user.id
         
         # Yeni SQL fonksiyonunu kullan
-        from database import get_user_orders_with_details
-        orders = await get_user_orders_with_details(user_id, 10)
+        from database import get_user_orders_page
+        from utils.keyset_pagination import page_buttons
+        page = await get_user_orders_page(user_id, page_token, 10)
+        orders = page.rows
         
         if not orders:
             await callback.message.edit_text(
@@ -385,6 +411,9 @@ async def show_my_orders(callback: types.CallbackQuery) -> None:
             [InlineKeyboardButton(text="🛍️ Market'e Git", callback_data="profile_market")],
             [InlineKeyboardButton(text="⬅️ Geri", callback_data="profile_refresh")]
         ])
+        navigation = page_buttons(page, "my_orders")
+        if navigation:
+            keyboard.inline_keyboard.insert(0, navigation)
         
         await callback.message.edit_text(
             orders_text,
@@ -6,7 +6,7 @@ Grup mesajlarında Kirve Point kazanımı
 import logging
 import asyncio
 from datetime import datetime, timedelta
-from typing import Dict, Set, List
+from typing import Dict, Set, List, Optional, Tuple
 from aiogram import types
 from aiogram.types import Message
 
@@ -14,23 +14,21 @@ from database import (
     is_user_registered, is_group_registered, add_points_to_user, 
     save_user_info, get_user_points, db_pool, get_db_pool, get_user_points_cached
 )
+from utils.cooldown_manager import cooldowns
+from utils.activity_sketch import activity_counter
 
-# Kayıt teşvik mesajları için cooldown cache'i
-registration_encouragement_cooldown: Dict[int, datetime] = {}
+# Kayıt teşvik mesajları arası süre (saniye)
+REGISTRATION_ENCOURAGEMENT_COOLDOWN = 300  # 5 dakika
 
 # Kayıt olmayan kullanıcılara teşvik mesajı gönderme fonksiyonu
 async def send_registration_encouragement(user_id: int, first_name: str, group_name: str) -> None:
     """Kayıt olmayan kullanıcılara teşvik mesajı gönder (5 dakika cooldown)"""
     try:
         # Cooldown kontrolü - 5 dakika
-        now = datetime.now()
-        if user_id in registration_encouragement_cooldown:
-            last_sent = registration_encouragement_cooldown[user_id]
-            time_diff = (now - last_sent).total_seconds()
-            
-            if time_diff < 300:  # 5 dakika = 300 saniye
-                logger.info(f"⏰ Kayıt teşvik cooldown - User: {first_name} ({user_id}), Kalan: {300 - time_diff:.0f}s")
-                return
+        remaining = cooldowns.remaining("registration_encouragement", user_id)
+        if remaining > 0:
+            logger.info(f"⏰ Kayıt teşvik cooldown - User: {first_name} ({user_id}), Kalan: {remaining:.0f}s")
+            return
         
         from config import get_config
         from aiogram import Bot
@@ -68,8 +66,8 @@ Kayıt ol butonuna bas veya `/start` yaz!
             reply_markup=keyboard
         )
         
-        # Cooldown'u güncelle
-        registration_encouragement_cooldown[user_id] = now
+        # Cooldown'u başlat
+        cooldowns.start("registration_encouragement", user_id, REGISTRATION_ENCOURAGEMENT_COOLDOWN)
         
         await bot.session.close()
         logger.info(f"🎯 Kayıt teşvik mesajı gönderildi - User: {first_name} ({user_id})")
@@ -124,11 +122,8 @@ async def get_system_settings() -> dict:
 
 logger = logging.getLogger(__name__)
 
-# Flood koruması için user mesaj cache'i  
-user_last_message: Dict[int, datetime] = {}
-user_message_count: Dict[int, int] = {}
-user_last_messages: Dict[int, List[str]] = {}  # Son mesajları takip et
-user_message_timestamps: Dict[int, List[datetime]] = {}  # Mesaj zamanlarını takip et
+# Flood koruması - mesajlar arası minimum süre (saniye)
+FLOOD_INTERVAL = 10
 
 # Point sistemi ayarları (dinamik)
 async def get_dynamic_settings():
@@ -138,7 +133,7 @@ async def get_dynamic_settings():
         settings = await get_system_settings()
         
         return {
-            'flood_interval': 10,  # Saniye - mesajlar arası minimum süre
+            'flood_interval': FLOOD_INTERVAL,  # Saniye - mesajlar arası minimum süre
             'min_message_length': 5,  # Minimum mesaj uzunluğu
             'messages_for_point': 5,  # Kaç mesajda bir point kazanılır (5 mesaj)
             'daily_limit': settings.get('daily_limit', 5.0),
@@ -147,7 +142,7 @@ async def get_dynamic_settings():
     except Exception as e:
         logger.error(f"❌ Dinamik ayarlar alınamadı: {e}")
         return {
-            'flood_interval': 10,
+            'flood_interval': FLOOD_INTERVAL,
             'min_message_length': 5,
             'messages_for_point': 5,
             'daily_limit': 5.0,
@@ -156,8 +151,59 @@ async def get_dynamic_settings():
 
 
 
-async def update_daily_stats(user_id: int, group_id: int):
-    """Günlük istatistikleri güncelle"""
+# Write-behind istatistik buffer'ı - (user_id, group_id, tarih) -> mesaj sayısı
+# Yük altında daily_stats yazımları burada birikir ve toplu yazılır
+daily_stats_buffer: Dict[Tuple[int, int, object], int] = {}
+DAILY_STATS_FLUSH_INTERVAL = 10  # saniye
+_daily_stats_flush_task: Optional[asyncio.Task] = None
+
+
+def buffer_daily_stats(user_id: int, group_id: int, count: int = 1, day=None) -> None:
+    """Mesaj sayısını buffer'a ekle, periyodik olarak toplu yazılır"""
+    global _daily_stats_flush_task
+    key = (user_id, group_id, day or datetime.now().date())
+    activity_counter.add(user_id, group_id, key[2])
+    daily_stats_buffer[key] = daily_stats_buffer.get(key, 0) + count
+    if not _daily_stats_flush_task or _daily_stats_flush_task.done():
+        _daily_stats_flush_task = asyncio.create_task(_daily_stats_flush_loop())
+
+
+async def _daily_stats_flush_loop() -> None:
+    while daily_stats_buffer:
+        await asyncio.sleep(DAILY_STATS_FLUSH_INTERVAL)
+        await flush_daily_stats_buffer()
+
+
+async def flush_daily_stats_buffer() -> None:
+    """Buffer'daki sayaçları tek executemany ile yaz"""
+    global daily_stats_buffer
+    if not daily_stats_buffer:
+        return
+    batch, daily_stats_buffer = daily_stats_buffer, {}
+    try:
+        pool = await get_db_pool()
+        if not pool:
+            return
+        async with pool.acquire() as conn:
+            await conn.executemany("""
+                INSERT INTO daily_stats (user_id, group_id, message_date, message_count)
+                VALUES ($1, $2, $3, $4)
+                ON CONFLICT (user_id, group_id, message_date)
+                DO UPDATE SET message_count = daily_stats.message_count + EXCLUDED.message_count
+            """, [(user_id, group_id, day, count) for (user_id, group_id, day), count in batch.items()])
+        logger.info(f"📊 Daily stats buffer yazıldı - {len(batch)} satır")
+    except Exception as e:
+        logger.error(f"⚠️ Daily stats buffer yazma hatası: {e}")
+        # Kaybetme - bir sonraki flush'ta tekrar dene
+        for key, count in batch.items():
+            daily_stats_buffer[key] = daily_stats_buffer.get(key, 0) + count
+
+
+async def update_daily_stats(user_id: int, group_id: int, defer: bool = False):
+    """Günlük istatistikleri güncelle (defer=True ise write-behind buffer'a)"""
+    if defer:
+        buffer_daily_stats(user_id, group_id)
+        return
     try:
         from database import db_pool
         if not db_pool:
@@ -166,6 +212,7 @@ async def update_daily_stats(user_id: int, group_id: int):
         async with db_pool.acquire() as conn:
             # Bugünün tarihini al
             today = datetime.now().date()
+            activity_counter.add(user_id, group_id, today)
             
             # Daily stats tablosunu güncelle
             await conn.execute("""
@@ -182,159 +229,32 @@ async def update_daily_stats(user_id: int, group_id: int):
 
 async def monitor_group_message(message: Message) -> None:
     """
-    Grup mesajlarını izle ve point sistemi uygula
+    Grup mesajlarını izle - tüm işlem group_message_pipeline'da
+    (accounting → anti_spam → points → chat_reply)
     """
     try:
-        user = message.from_user
-        chat = message.chat
-        
-        logger.info(f"🔍 MONITOR GROUP MESSAGE ÇAĞRILDI - User: {user.first_name}, Chat: {chat.id}")
-        
-        # Bot mesajlarını yoksay
-        if user.is_bot:
-            logger.info(f"🤖 Bot mesajı yoksayıldı - User: {user.first_name}")
-            return
-            
         # Özel mesajları yoksay
         if message.chat.type == "private":
-            logger.info(f"💬 Özel mesaj yoksayıldı - User: {user.first_name}")
-            return
-            
-        # Grup kayıtlı mı kontrol et
-        is_group_registered_result = await is_group_registered(chat.id)
-        if not is_group_registered_result:
-            logger.info(f"❌ Grup kayıtlı değil - Chat: {chat.id}")
             return
-            
-        logger.info(f"✅ Grup kayıtlı - Chat: {chat.id}")
         
-        # Kullanıcı bilgilerini kaydet
-        await save_user_info(user.id, user.username, user.first_name, user.last_name)
+        from handlers.group_message_pipeline import group_message_pipeline
+        await group_message_pipeline.process(message)
         
-        # Kullanıcı kayıtlı mı kontrol et
-        is_registered = await is_user_registered(user.id)
-        logger.info(f"👤 Kullanıcı kayıt durumu - User: {user.first_name} ({user.id}), Registered: {is_registered}")
-        
-        # Her durumda mesaj sayısını kaydet (kayıtlı olmayanlar için de)
-        # Mesaj sayısı her zaman kaydedilir
-        await update_daily_stats(user.id, chat.id)
-        logger.info(f"📊 Mesaj sayısı kaydedildi - User: {user.first_name} ({user.id})")
-        
-        if not is_registered:
-            logger.info(f"🎯 Kayıt olmayan kullanıcı - User: {user.first_name} ({user.id})")
-            
-            # Kayıt olmayan kullanıcılara teşvik mesajı gönder (cooldown ile)
-            try:
-                await send_registration_encouragement(user.id, user.first_name, chat.title)
-            except Exception as e:
-                logger.error(f"❌ Kayıt teşvik mesajı hatası - User: {user.id}, Error: {e}")
-        else:
-            logger.info(f"💎 Kayıtlı kullanıcı - User: {user.first_name} ({user.id})")
-            
-            # Kayıtlı kullanıcılar için yeni point sistemi
-            # 5 saniye flood protection kontrolü
-            flood_check = await check_flood_protection(user.id)
-            logger.info(f"⏰ Flood check - User: {user.first_name} ({user.id}), Result: {flood_check}")
-            
-            if flood_check:
-                # Kullanıcının toplam mesaj sayısını al
-                current_balance = await get_user_points_cached(user.id)
-                total_messages = current_balance.get('total_messages', 0) if current_balance else 0
-                
-                # Yeni mesaj sayısı
-                new_total_messages = total_messages + 1
-                
-                # Dinamik mesaj sayısında point kazanılır
-                settings = await get_dynamic_settings()
-                messages_for_point = settings['messages_for_point']
-                
-                logger.info(f"📝 Mesaj sayısı - User: {user.first_name} ({user.id}), Current: {new_total_messages}, For point: {messages_for_point}")
-                
-                if new_total_messages % messages_for_point == 0:
-                    old_balance = current_balance.get('kirve_points', 0.0) if current_balance else 0.0
-                    
-                    # Günlük limit kontrolü
-                    daily_points = current_balance.get('daily_points', 0.0) if current_balance else 0.0
-                    system_settings = await get_system_settings()
-                    daily_limit = system_settings.get('daily_limit', 5.0)
-                    
-                    if daily_points >= daily_limit:
-                        logger.info(f"⏰ Günlük limit doldu - User: {user.first_name} ({user.id}), Daily: {daily_points}/{daily_limit}")
-                        return
-                    
-                    # Dinamik point miktarını al
-                    dynamic_point_amount = await get_dynamic_point_amount()
-                    
-                    # Point ekle
-                    await add_points_to_user(user.id, dynamic_point_amount, chat.id)
-                    
-                    # Yeni bakiyeyi al
-                    new_balance = old_balance + dynamic_point_amount
-                    new_daily_points = daily_points + dynamic_point_amount
-                    
-                    # Milestone kontrolü - 1.00 KP'ye ulaştı mı?
-                    if old_balance < 1.0 and new_balance >= 1.0:
-                        await send_milestone_notification(user.id, user.first_name, new_balance)
-                    
-                    # Haftalık limit kontrolü
-                    weekly_points = current_balance.get('weekly_points', 0.0) if current_balance else 0.0
-                    new_weekly_points = weekly_points + dynamic_point_amount
-                    
-                    # Haftalık limit kontrolü (20.00 KP)
-                    if weekly_points < 20.0 and new_weekly_points >= 20.0:
-                        await send_weekly_limit_notification(user.id, user.first_name, 20.0)
-                    
-                    logger.info(f"💎 Point eklendi - User: {user.first_name} ({user.id}), Points: +{dynamic_point_amount}, New Balance: {new_balance:.2f}, Daily: {new_daily_points:.2f}/{daily_limit}, Mesaj: {new_total_messages}")
-                else:
-                    logger.info(f"📝 Mesaj sayısı artırıldı - User: {user.first_name} ({user.id}), Mesaj: {new_total_messages}/{messages_for_point}")
-            else:
-                logger.info(f"⏰ Mesaj cooldown - User: {user.first_name} ({user.id}) 5 saniye beklemeli")
-            
     except Exception as e:
         logger.error(f"❌ Group message handler hatası: {e}")
 
-    # --- SOHBET ZEKASI ENTEGRE ---
-    try:
-        from handlers.chat_system import handle_chat_message, send_chat_response
-        from utils.cooldown_manager import cooldown_manager
-        
-        # Cooldown kontrolü
-        can_respond = await cooldown_manager.can_respond_to_user(message.from_user.id)
-        if can_respond:
-            response = await handle_chat_message(message)
-            if response:
-                await send_chat_response(message, response)
-                # Mesajı kaydet
-                await cooldown_manager.record_user_message(message.from_user.id)
-    except Exception as e:
-        logger.error(f"❌ Chat system (entegre) hatası: {e}")
-
 
 async def check_flood_protection(user_id: int) -> bool:
     """
-    Flood koruması kontrolü
+    Flood koruması kontrolü - son kabul edilen mesajdan sonra FLOOD_INTERVAL dolmadıysa red
     """
     try:
-        now = datetime.now()
-        
-        # Son mesaj zamanını kontrol et
-        if user_id in user_last_message:
-            time_diff = now - user_last_message[user_id]
-            
-            # Dinamik flood interval al
-            settings = await get_dynamic_settings()
-            flood_interval = settings['flood_interval']
-            
-            # Çok hızlı mesaj gönderiyorsa
-            if time_diff.total_seconds() < flood_interval:
-                logger.info(f"⏰ Flood protection - User: {user_id}, Time diff: {time_diff.total_seconds():.1f}s, Limit: {flood_interval}s")
-                return False
-        else:
-            # İlk mesaj - zaman farkı hesaplanamaz
-            logger.info(f"🆕 İlk mesaj - User: {user_id}")
+        remaining = cooldowns.remaining("flood", user_id)
+        if remaining > 0:
+            logger.info(f"⏰ Flood protection - User: {user_id}, Kalan: {remaining:.1f}s, Limit: {FLOOD_INTERVAL}s")
+            return False
         
-        # Son mesaj zamanını güncelle
-        user_last_message[user_id] = now
+        cooldowns.start("flood", user_id, FLOOD_INTERVAL)
         return True
         
     except Exception as e:
@@ -342,48 +262,19 @@ async def check_flood_protection(user_id: int) -> bool:
         return True  # Hata durumunda izin ver
 
 
-async def check_message_uniqueness(user_id: int, message_text: str) -> bool:
+async def check_message_uniqueness(user_id: int, message_text: str, group_id: Optional[int] = None) -> bool:
     """
-    Mesaj benzersizlik kontrolü - Kelime tekrarı koruması (Daha esnek)
+    Mesaj benzersizlik kontrolü - SimHash parmak izi indeksi ile
+    Kullanıcının kendi son mesajlarının, gruptaki ya da başka gruplardaki
+    kopyala-yapıştır mesajların yakın kopyası ise False
     """
     try:
-        current_time = datetime.now()
-        
-        # Kullanıcının son mesajlarını al
-        if user_id not in user_last_messages:
-            user_last_messages[user_id] = []
-        if user_id not in user_message_timestamps:
-            user_message_timestamps[user_id] = []
-        
-        last_messages = user_last_messages[user_id]
-        timestamps = user_message_timestamps[user_id]
-        
-        # Zaman kontrolü - Son 60 saniyede aynı mesaj varsa spam
-        if len(timestamps) >= 1:
-            for i, timestamp in enumerate(timestamps):
-                time_diff = (current_time - timestamp).total_seconds()
-                if time_diff < 60 and last_messages[i] == message_text:
-                    logger.info(f"⚠️ Aynı mesaj tekrarı tespit edildi - User: {user_id}")
-                    return False
-        
-        # Son 3 mesajı kontrol et (daha esnek)
-        for last_msg in last_messages:
-            # Mesajlar çok benzer mi kontrol et
-            if await calculate_similarity(message_text, last_msg) > 0.85:  # %85 benzerlik (daha esnek)
-                logger.info(f"⚠️ Benzer mesaj tespit edildi - User: {user_id}")
-                return False
-        
-        # Yeni mesajı listeye ekle
-        last_messages.append(message_text)
-        timestamps.append(current_time)
-        
-        # Listeyi 3 mesajla sınırla (daha esnek)
-        if len(last_messages) > 3:
-            last_messages.pop(0)
-            timestamps.pop(0)
-        
-        user_last_messages[user_id] = last_messages
-        user_message_timestamps[user_id] = timestamps
+        from utils.spam_fingerprint import message_fingerprints
+        
+        duplicate = message_fingerprints.check_and_add(user_id, message_text, chat_id=group_id)
+        if duplicate:
+            logger.info(f"⚠️ Yakın kopya mesaj tespit edildi - User: {user_id}, Kapsam: {duplicate.scope}, Mesafe: {duplicate.distance}")
+            return False
         return True
         
     except Exception as e:
@@ -459,52 +350,19 @@ Merhaba {first_name}!
         logger.error(f"❌ Haftalık limit bildirimi hatası: {e}")
 
 
-async def calculate_similarity(text1: str, text2: str) -> float:
-    """
-    İki metin arasındaki benzerlik oranını hesapla
-    """
-    try:
-        # Basit benzerlik hesaplama
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
-        
-        if not words1 or not words2:
-            return 0.0
-        
-        # Jaccard similarity
-        intersection = len(words1.intersection(words2))
-        union = len(words1.union(words2))
-        
-        if union == 0:
-            return 0.0
-            
-        return intersection / union
-        
-    except Exception as e:
-        logger.error(f"❌ Similarity calculation hatası: {e}")
-        return 0.0
-
-
 async def cleanup_flood_cache() -> None:
     """
     Eski flood cache verilerini temizle (bellek tasarrufu)
     """
     try:
-        now = datetime.now()
-        cutoff_time = now - timedelta(hours=1)  # 1 saat öncesini temizle
-        
-        # Eski mesaj zamanlarını temizle
-        old_users = [
-            user_id for user_id, last_time in user_last_message.items()
-            if last_time < cutoff_time
-        ]
+        # Flood cooldown'ları tekerlekte kendiliğinden düşer
         
-        for user_id in old_users:
-            user_last_message.pop(user_id, None)
-            user_last_messages.pop(user_id, None)  # Mesaj geçmişini de temizle
+        # Pencereden çıkmış mesaj parmak izleri
+        from utils.spam_fingerprint import message_fingerprints
+        removed = message_fingerprints.cleanup()
             
-        if old_users:
-            logger.info(f"🧹 Flood cache temizlendi - {len(old_users)} kullanıcı")
+        if removed:
+            logger.info(f"🧹 Flood cache temizlendi - {removed} parmak izi grubu")
             
     except Exception as e:
         logger.error(f"❌ Flood cache cleanup hatası: {e}")
@@ -519,6 +377,11 @@ async def start_cleanup_task():
         try:
             await asyncio.sleep(1800)  # 30 dakika bekle
             await cleanup_flood_cache()
+            
+            # Süresi dolan FSM / konuşma durumları (tablo silme sadece liderde)
+            from utils.fsm_storage import fsm_storage
+            from utils.leader_election import leader_elector
+            await fsm_storage.cleanup_expired(purge_table=leader_elector.is_leader)
         except Exception as e:
             logger.error(f"❌ Cleanup task hatası: {e}")
             await asyncio.sleep(60)  # Hata durumunda 1 dakika bekle
@@ -646,18 +509,15 @@ async def send_new_user_recruitment(user_id: int, first_name: str, group_name: s
         config = get_config()
         
         # SIRALI SİSTEM: Kullanıcı bazlı cooldown kontrolü - AÇIK
-        from handlers.recruitment_system import user_recruitment_times, recruitment_message_cooldown
-        
-        current_time = datetime.now()
+        from handlers.recruitment_system import (
+            mark_recruitment_sent, recruitment_cooldown_remaining, recruitment_message_cooldown
+        )
         
-        # Bu kullanıcıya son ne zaman teşvik gönderildi?
-        last_time = user_recruitment_times.get(user_id)
-        if last_time:
-            time_diff = (current_time - last_time).total_seconds()
-            if time_diff < recruitment_message_cooldown:
-                remaining_time = recruitment_message_cooldown - time_diff
-                logger.info(f"⏰ Kullanıcı cooldown: User {user_id} için henüz çok erken ({remaining_time:.0f}s kaldı)")
-                return
+        # Bu kullanıcıya yakın zamanda teşvik gönderildi mi? (özel mesaj teşviki de sayılır)
+        remaining_time = recruitment_cooldown_remaining(user_id, recruitment_message_cooldown)
+        if remaining_time > 0:
+            logger.info(f"⏰ Kullanıcı cooldown: User {user_id} için henüz çok erken ({remaining_time:.0f}s kaldı)")
+            return
         
         # Geçici bot instance
         temp_bot = Bot(token=config.BOT_TOKEN)
@@ -717,7 +577,7 @@ Grupta mesajlaşmaya başladığını görüyorum! Kayıt olarak çok daha fazla
         # Bu yüzden sadece grup reply kullanıyoruz
         
         # Kullanıcı bazlı cooldown kaydı - AÇIK
-        user_recruitment_times[user_id] = current_time
+        mark_recruitment_sent(user_id)
         
         await temp_bot.session.close()
         logger.info(f"🎯 Yeni kullanıcı teşviki tamamlandı - User: {user_id}, Messages: {message_count} (sadece grup reply)")
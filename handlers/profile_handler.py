@@ -5,13 +5,15 @@ Profil handler - Kullanici profil sistemi
 import asyncio
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from aiogram import types
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
 from database import get_user_points, get_user_points_cached, get_user_rank, get_today_stats, get_market_history, get_system_stats, get_user_info
 from utils.logger import logger
+from utils.leaderboard import leaderboards
+from utils.rank_index import user_rank_index
 
 # Bot instance setter
 _bot_instance = None
@@ -239,10 +241,6 @@ async def profile_callback_handler(callback: types.CallbackQuery) -> None:
         user = callback.from_user
         data = callback.data
         
-        # Rate limiting - callback spam önlemi
-        from utils.rate_limiter import rate_limiter
-        await rate_limiter.wait_if_needed(user.id, "callback")
-        
         # Memory management - cache kontrolü
         from utils.memory_manager import memory_manager
         cache_key = f"profile_callback_{user.id}_{data}"
@@ -293,6 +291,10 @@ async def profile_callback_handler(callback: types.CallbackQuery) -> None:
             logger.info(f"Siparişlerim butonu tıklandı - User: {callback.from_user.id}")
             from handlers.market_system import show_my_orders
             await show_my_orders(callback)
+        elif data and data.startswith("my_orders:"):
+            from handlers.market_system import show_my_orders
+            from utils.keyset_pagination import split_page_token
+            await show_my_orders(callback, split_page_token(data, "my_orders"))
         elif data == "profile_orders":
             logger.info(f"Profil siparişlerim butonu tıklandı - User: {callback.from_user.id}")
             from handlers.market_system import show_my_orders
@@ -477,48 +479,35 @@ async def show_market_menu(callback: types.CallbackQuery) -> None:
         await callback.answer("Market menüsü yüklenirken hata oluştu!", show_alert=True)
 
 
+def _render_top_kp(entries: List[Dict[str, Any]]) -> str:
+    ranking_text = ""
+    for i, user in enumerate(entries, 1):
+        ranking_text += f"{i}. 💎 **{user['kirve_points']:.2f} KP** | 👤 {user['first_name']}\n"
+    return ranking_text
+
+
+def _render_top_messages(entries: List[Dict[str, Any]]) -> str:
+    ranking_text = ""
+    for i, user in enumerate(entries, 1):
+        ranking_text += f"{i}. 📝 **{user['total_messages']} mesaj** | 👤 {user['first_name']}\n"
+    return ranking_text
+
+
+leaderboards.register_view("profile_top_kp", "points", _render_top_kp)
+leaderboards.register_view("profile_top_messages", "messages", _render_top_messages)
+
+
 async def show_top_kp_ranking(callback: types.CallbackQuery) -> None:
-    """Top 10 KP sıralaması göster"""
+    """Top 10 KP sıralaması göster - hazır liderlik tablosundan"""
     try:
-        from database import get_db_pool
-        pool = await get_db_pool()
-        if not pool:
-            await callback.answer("Database bağlantısı yok!", show_alert=True)
-            return
+        ranking_text = await leaderboards.get_text("profile_top_kp")
         
-        async with pool.acquire() as conn:
-            # Top 10 KP sıralaması
-            top_kp_users = await conn.fetch("""
-                SELECT u.first_name, u.username, u.kirve_points, u.total_messages
-                FROM users u
-                WHERE u.is_registered = TRUE AND u.kirve_points > 0
-                ORDER BY u.kirve_points DESC
-                LIMIT 10
-            """)
-            
-            # Kullanıcının kendi sıralaması
-            user_id = callback.from_user.id
-            user_rank = await conn.fetchval("""
-                SELECT COUNT(*) + 1
-                FROM users u
-                WHERE u.is_registered = TRUE AND u.kirve_points > (
-                    SELECT kirve_points FROM users WHERE user_id = $1
-                )
-            """, user_id)
-            
-            user_points = await conn.fetchval("""
-                SELECT kirve_points FROM users WHERE user_id = $1
-            """, user_id)
-            
-            # Sıralama listesi oluştur
-            ranking_text = ""
-            for i, user in enumerate(top_kp_users, 1):
-                points = user.get('kirve_points', 0)
-                name = user.get('first_name', 'Anonim')
-                
-                ranking_text += f"{i}. 💎 **{points:.2f} KP** | 👤 {name}\n"
-            
-            response = f"""
+        # Kullanıcının kendi sıralaması
+        ranks = user_rank_index.get_user_ranks(callback.from_user.id)
+        user_rank = ranks['point_rank'] if ranks else None
+        user_points = ranks['points'] if ranks else 0
+        
+        response = f"""
 **💎 TOP 10 KP SIRALAMASI**
 
 {ranking_text}
@@ -526,17 +515,17 @@ async def show_top_kp_ranking(callback: types.CallbackQuery) -> None:
 **👤 SENİN DURUMUN**
 **🏆 Sıralama:** #{user_rank or 'N/A'}
 **💰 Point:** {user_points or 0:.2f} KP
-            """
-            
-            keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="⬅️ Sıralamaya Dön", callback_data="profile_ranking")]
-            ])
-            
-            await callback.message.edit_text(
-                response,
-                parse_mode="Markdown",
-                reply_markup=keyboard
-            )
+        """
+        
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="⬅️ Sıralamaya Dön", callback_data="profile_ranking")]
+        ])
+        
+        await callback.message.edit_text(
+            response,
+            parse_mode="Markdown",
+            reply_markup=keyboard
+        )
             
     except Exception as e:
         logger.error(f"Top KP ranking hatası: {e}")
@@ -544,47 +533,16 @@ async def show_top_kp_ranking(callback: types.CallbackQuery) -> None:
 
 
 async def show_top_messages_ranking(callback: types.CallbackQuery) -> None:
-    """Top 10 mesaj sıralaması göster"""
+    """Top 10 mesaj sıralaması göster - hazır liderlik tablosundan"""
     try:
-        from database import get_db_pool
-        pool = await get_db_pool()
-        if not pool:
-            await callback.answer("Database bağlantısı yok!", show_alert=True)
-            return
+        ranking_text = await leaderboards.get_text("profile_top_messages")
         
-        async with pool.acquire() as conn:
-            # Top 10 mesaj sıralaması
-            top_message_users = await conn.fetch("""
-                SELECT u.first_name, u.username, u.kirve_points, u.total_messages
-                FROM users u
-                WHERE u.is_registered = TRUE AND u.total_messages > 0
-                ORDER BY u.total_messages DESC
-                LIMIT 10
-            """)
-            
-            # Kullanıcının kendi sıralaması
-            user_id = callback.from_user.id
-            user_rank = await conn.fetchval("""
-                SELECT COUNT(*) + 1
-                FROM users u
-                WHERE u.is_registered = TRUE AND u.total_messages > (
-                    SELECT total_messages FROM users WHERE user_id = $1
-                )
-            """, user_id)
-            
-            user_messages = await conn.fetchval("""
-                SELECT total_messages FROM users WHERE user_id = $1
-            """, user_id)
-            
-            # Sıralama listesi oluştur
-            ranking_text = ""
-            for i, user in enumerate(top_message_users, 1):
-                messages = user.get('total_messages', 0)
-                name = user.get('first_name', 'Anonim')
-                
-                ranking_text += f"{i}. 📝 **{messages} mesaj** | 👤 {name}\n"
-            
-            response = f"""
+        # Kullanıcının kendi sıralaması
+        ranks = user_rank_index.get_user_ranks(callback.from_user.id)
+        user_rank = ranks['message_rank'] if ranks else None
+        user_messages = ranks['messages'] if ranks else 0
+        
+        response = f"""
 **📝 TOP 10 MESAJ SIRALAMASI**
 
 {ranking_text}
@@ -592,17 +550,17 @@ async def show_top_messages_ranking(callback: types.CallbackQuery) -> None:
 **👤 SENİN DURUMUN**
 **🏆 Sıralama:** #{user_rank or 'N/A'}
 **📝 Mesaj:** {user_messages or 0} mesaj
-            """
-            
-            keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="⬅️ Sıralamaya Dön", callback_data="profile_ranking")]
-            ])
-            
-            await callback.message.edit_text(
-                response,
-                parse_mode="Markdown",
-                reply_markup=keyboard
-            )
+        """
+        
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="⬅️ Sıralamaya Dön", callback_data="profile_ranking")]
+        ])
+        
+        await callback.message.edit_text(
+            response,
+            parse_mode="Markdown",
+            reply_markup=keyboard
+        )
             
     except Exception as e:
         logger.error(f"Top messages ranking hatası: {e}")
@@ -650,11 +608,14 @@ async def get_weekly_stats(user_id: int) -> Dict[str, Any]:
 
 
 async def get_user_ranking(user_id: int) -> Dict[str, Any]:
-    """Kullanıcı sıralama bilgileri"""
+    """Kullanıcı sıralama bilgileri - bellek içi sıralama indeksinden (sorgusuz)"""
     try:
-        from database import get_db_pool
-        pool = await get_db_pool()
-        if not pool:
+        from utils.rank_index import user_rank_index
+        if not user_rank_index.ready:
+            await user_rank_index.load()
+        
+        ranks = user_rank_index.get_user_ranks(user_id)
+        if not ranks:
             return {
                 'global_rank': 'N/A',
                 'point_rank': 'N/A', 
@@ -663,106 +624,65 @@ async def get_user_ranking(user_id: int) -> Dict[str, Any]:
                 'points_needed': 0.0
             }
         
-        async with pool.acquire() as conn:
-            # Kullanıcının point ve mesaj sayısını al
-            user_data = await conn.fetchrow("""
-                SELECT kirve_points, total_messages 
-                FROM users 
-                WHERE user_id = $1
-            """, user_id)
-            
-            if not user_data:
-                return {
-                    'global_rank': 'N/A',
-                    'point_rank': 'N/A', 
-                    'message_rank': 'N/A',
-                    'next_competitor': 'Yok',
-                    'points_needed': 0.0
-                }
-            
-            user_points = float(user_data['kirve_points'] or 0)
-            user_messages = int(user_data['total_messages'] or 0)
-            
-            # Point sıralaması
-            point_rank = await conn.fetchval("""
-                SELECT COUNT(*) + 1 
-                FROM users 
-                WHERE kirve_points > $1 AND is_registered = true
-            """, user_points)
-            
-            # Mesaj sıralaması
-            message_rank = await conn.fetchval("""
-                SELECT COUNT(*) + 1 
-                FROM users 
-                WHERE total_messages > $1 AND is_registered = true
-            """, user_messages)
-            
-            # Genel sıralama (point + mesaj kombinasyonu)
-            general_rank = await conn.fetchval("""
-                SELECT COUNT(*) + 1 
-                FROM users 
-                WHERE (kirve_points + total_messages * 0.1) > $1 AND is_registered = true
-            """, user_points + user_messages * 0.1)
-            
-            # Toplam katılımcı sayısı
-            total_participants = await conn.fetchval("""
-                SELECT COUNT(*) 
-                FROM users 
-                WHERE is_registered = true
-            """)
-            
-            # Kullanıcı seviyesi (point bazlı)
-            user_level = "Yeni Üye"
-            if user_points >= 10.0:
-                user_level = "Aktif Üye"
-            elif user_points >= 5.0:
-                user_level = "Orta Seviye"
-            elif user_points >= 1.0:
-                user_level = "Başlangıç"
-            
-            # Aktiflik puanı (point + mesaj kombinasyonu)
-            activity_score = user_points + (user_messages * 0.01)
-            
-            # Milestone sistemi
-            milestones = [1.0, 5.0, 10.0, 25.0, 50.0, 100.0]
-            next_milestone = "N/A"
-            milestone_points_needed = 0.0
-            
-            for milestone in milestones:
-                if user_points < milestone:
-                    next_milestone = f"{milestone:.0f} KP"
-                    milestone_points_needed = milestone - user_points
-                    break
-            
-            # Limit sıfırlama zamanı
-            from datetime import datetime, timedelta
-            now = datetime.now()
-            tomorrow = now + timedelta(days=1)
-            next_week = now + timedelta(days=7 - now.weekday())
-            
-            daily_reset = tomorrow.replace(hour=0, minute=0, second=0, microsecond=0)
-            weekly_reset = next_week.replace(hour=0, minute=0, second=0, microsecond=0)
-            
-            # Hangi limit daha yakın
-            if daily_reset < weekly_reset:
-                limit_reset_time = f"Günlük: {daily_reset.strftime('%d.%m.%Y %H:%M')}"
-            else:
-                limit_reset_time = f"Haftalık: {weekly_reset.strftime('%d.%m.%Y %H:%M')}"
-            
-            return {
-                'global_rank': general_rank or 'N/A',
-                'point_rank': point_rank or 'N/A',
-                'message_rank': message_rank or 'N/A',
-                'total_participants': total_participants or 'N/A',
-                'user_level': user_level,
-                'activity_score': f"{activity_score:.2f}",
-                'next_milestone': next_milestone,
-                'milestone_points_needed': milestone_points_needed,
-                'daily_limit': 5.00,
-                'weekly_limit': 20.00,
-                'limit_reset_time': limit_reset_time
-            }
-            
+        user_points = ranks['points']
+        user_messages = ranks['messages']
+        point_rank = ranks['point_rank']
+        message_rank = ranks['message_rank']
+        general_rank = ranks['general_rank']
+        total_participants = ranks['total_participants']
+        
+        # Kullanıcı seviyesi (point bazlı)
+        user_level = "Yeni Üye"
+        if user_points >= 10.0:
+            user_level = "Aktif Üye"
+        elif user_points >= 5.0:
+            user_level = "Orta Seviye"
+        elif user_points >= 1.0:
+            user_level = "Başlangıç"
+        
+        # Aktiflik puanı (point + mesaj kombinasyonu)
+        activity_score = user_points + (user_messages * 0.01)
+        
+        # Milestone sistemi
+        milestones = [1.0, 5.0, 10.0, 25.0, 50.0, 100.0]
+        next_milestone = "N/A"
+        milestone_points_needed = 0.0
+        
+        for milestone in milestones:
+            if user_points < milestone:
+                next_milestone = f"{milestone:.0f} KP"
+                milestone_points_needed = milestone - user_points
+                break
+        
+        # Limit sıfırlama zamanı
+        from datetime import datetime, timedelta
+        now = datetime.now()
+        tomorrow = now + timedelta(days=1)
+        next_week = now + timedelta(days=7 - now.weekday())
+        
+        daily_reset = tomorrow.replace(hour=0, minute=0, second=0, microsecond=0)
+        weekly_reset = next_week.replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        # Hangi limit daha yakın
+        if daily_reset < weekly_reset:
+            limit_reset_time = f"Günlük: {daily_reset.strftime('%d.%m.%Y %H:%M')}"
+        else:
+            limit_reset_time = f"Haftalık: {weekly_reset.strftime('%d.%m.%Y %H:%M')}"
+        
+        return {
+            'global_rank': general_rank or 'N/A',
+            'point_rank': point_rank or 'N/A',
+            'message_rank': message_rank or 'N/A',
+            'total_participants': total_participants or 'N/A',
+            'user_level': user_level,
+            'activity_score': f"{activity_score:.2f}",
+            'next_milestone': next_milestone,
+            'milestone_points_needed': milestone_points_needed,
+            'daily_limit': 5.00,
+            'weekly_limit': 20.00,
+            'limit_reset_time': limit_reset_time
+        }
+        
     except Exception as e:
         logger.error(f"Ranking hatası: {e}")
         return {
@@ -15,6 +15,7 @@ from aiogram.filters import Command
 
 from database import is_user_registered, save_user_info, get_db_pool
 from config import get_config
+from utils.cooldown_manager import cooldowns
 
 logger = logging.getLogger(__name__)
 
@@ -25,13 +26,31 @@ router = Router()
 recruitment_system_active = True  # Production'da açık
 recruitment_interval = 120  # 2 dakika (saniye)
 recruitment_message_cooldown = 120  # 2 dakika (saniye)
+recruitment_user_cooldown = 300  # Özel teşvik mesajından sonra 5 dakika (saniye)
 last_recruitment_time = 0
 last_recruited_user = None
 
 # Eksik değişkenleri tanımla
-user_recruitment_times: Dict[int, datetime] = {}
 last_recruitment_users: Set[int] = set()
 
+
+def mark_recruitment_sent(user_id: int) -> None:
+    """Son teşvik zamanını kaydet - grup cevabı ve özel mesaj aynı kaydı paylaşır"""
+    # Kayıt en uzun cooldown kadar yaşar, her çağrı yeri kendi süresiyle karşılaştırır
+    cooldowns.start(
+        "recruitment", user_id,
+        max(recruitment_message_cooldown, recruitment_user_cooldown),
+        value=time.monotonic()
+    )
+
+
+def recruitment_cooldown_remaining(user_id: int, cooldown: float) -> float:
+    """Son teşvikten bu yana `cooldown` saniye geçmediyse kalan süre"""
+    sent_at = cooldowns.get_value("recruitment", user_id)
+    if sent_at is None:
+        return 0.0
+    return max(0.0, sent_at + cooldown - time.monotonic())
+
 # Özel mesaj şablonları (sadece özel mesajda gönderilir)
 RECRUITMENT_MESSAGES = [
     "🎯 **Kirvem!** Hala gruba kayıt olmadığını görüyorum. Bana özelden yaz, tüm bonusları anlatayım! 💎",
@@ -227,8 +246,8 @@ def set_recruitment_interval(seconds: int):
     logger.info(f"⏰ Recruitment aralığı ayarlandı: {seconds} saniye")
 
 async def start_recruitment_background():
-    """Arka planda recruitment sistemi başlat"""
-    asyncio.create_task(start_recruitment_system())
+    """Arka planda recruitment sistemi başlat (lider işi - iptal edilebilir)"""
+    await start_recruitment_system()
 
 @router.callback_query(F.data.startswith("recruitment_"))
 async def handle_recruitment_callback(callback: CallbackQuery):
@@ -393,13 +412,11 @@ async def check_recruitment_eligibility(user_id: int, username: str, first_name:
             logger.info(f"⏰ Recruitment bugün gönderilmiş - User: {first_name} ({user_id})")
             return False
         
-        # Cooldown kontrolü - 5 dakika
-        now = datetime.now()
-        if user_id in user_recruitment_times:
-            time_diff = now - user_recruitment_times[user_id]
-            if time_diff.total_seconds() < 300:  # 5 dakika = 300 saniye
-                logger.info(f"⏰ Recruitment cooldown - User: {first_name} ({user_id}), Kalan: {300 - time_diff.total_seconds():.0f}s")
-                return False
+        # Cooldown kontrolü
+        remaining = recruitment_cooldown_remaining(user_id, recruitment_user_cooldown)
+        if remaining > 0:
+            logger.info(f"⏰ Recruitment cooldown - User: {first_name} ({user_id}), Kalan: {remaining:.0f}s")
+            return False
         
         return True
         
@@ -433,7 +450,7 @@ async def send_recruitment_message(user_id: int, username: str, first_name: str,
         )
         
         # Recruitment zamanını kaydet
-        user_recruitment_times[user_id] = datetime.now()
+        mark_recruitment_sent(user_id)
         await mark_recruitment_sent_today(user_id)
         
         await bot.session.close()
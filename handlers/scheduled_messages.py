@@ -602,10 +602,11 @@ async def start_scheduled_messages(bot):
         # logger.info(f"🔍 DEBUG - BOT_PROFILES keys: {list(BOT_PROFILES.keys())}")
         
         # Her bot için ayrı task başlat
-        for bot_id, profile in BOT_PROFILES.items():
-            if profile.get('active', False):
-                asyncio.create_task(scheduled_message_task(bot, bot_id, profile))
+        # Tek görev tüm aktif bot profillerini dolaşır (lider işi - iptal edilebilir)
+        await scheduled_message_task(bot)
                 
+    except asyncio.CancelledError:
+        raise
     except Exception as e:
         logger.error(f"❌ Scheduled messages başlatma hatası: {e}")
 
@@ -14,6 +14,8 @@ from aiogram.filters import Command
 from config import get_config
 from database import get_db_pool
 from utils.logger import logger
+from utils.leaderboard import leaderboards
+from utils.activity_sketch import activity_counter
 
 router = Router()
 
@@ -59,7 +61,7 @@ async def get_comprehensive_stats() -> Dict[str, Any]:
             
             # Son 7 gün aktivitesi
             week_ago = today - timedelta(days=7)
-            week_active_users = await conn.fetchval("SELECT COUNT(DISTINCT user_id) FROM daily_stats WHERE message_date >= $1", week_ago)
+            week_active_users = await activity_counter.count_range(week_ago, today)  # HLL taslaklarından
             week_messages = await conn.fetchval("SELECT COALESCE(SUM(message_count), 0) FROM daily_stats WHERE message_date >= $1", week_ago)
             
             # Etkinlik istatistikleri
@@ -68,23 +70,9 @@ async def get_comprehensive_stats() -> Dict[str, Any]:
             completed_events = await conn.fetchval("SELECT COUNT(*) FROM events WHERE status = 'completed'")
             total_participants = await conn.fetchval("SELECT COUNT(*) FROM event_participations WHERE withdrew_at IS NULL")
             
-            # En aktif kullanıcılar (top 10) - KP sıralaması
-            top_users_kp = await conn.fetch("""
-                SELECT u.first_name, u.username, u.kirve_points, u.total_messages
-                FROM users u
-                WHERE u.is_registered = TRUE AND u.kirve_points > 0
-                ORDER BY u.kirve_points DESC
-                LIMIT 10
-            """)
-            
-            # En aktif kullanıcılar (top 10) - Mesaj sıralaması
-            top_users_messages = await conn.fetch("""
-                SELECT u.first_name, u.username, u.kirve_points, u.total_messages
-                FROM users u
-                WHERE u.is_registered = TRUE AND u.total_messages > 0
-                ORDER BY u.total_messages DESC
-                LIMIT 10
-            """)
+            # Top 10 KP / mesaj listeleri liderlik tablosundan (sorgusuz)
+            top_users_kp = leaderboards.get_top("points")
+            top_users_messages = leaderboards.get_top("messages")
             
             # En aktif gruplar
             top_groups = await conn.fetch("""
@@ -138,8 +126,8 @@ async def get_comprehensive_stats() -> Dict[str, Any]:
                 "total_participants": total_participants or 0,
                 
                 # Top listeler
-                "top_users_kp": [dict(user) for user in top_users_kp] if top_users_kp else [],
-                "top_users_messages": [dict(user) for user in top_users_messages] if top_users_messages else [],
+                "top_users_kp": top_users_kp,
+                "top_users_messages": top_users_messages,
                 "top_groups": [dict(group) for group in top_groups] if top_groups else [],
                 "rank_distribution": [dict(rank) for rank in rank_distribution] if rank_distribution else [],
                 
@@ -770,9 +758,8 @@ async def show_performance_stats(callback: types.CallbackQuery) -> None:
 async def show_top_users(callback: types.CallbackQuery) -> None:
     """En aktif kullanıcıları göster"""
     try:
-        stats = await get_comprehensive_stats()
-        top_users_kp = stats.get('top_users_kp', [])
-        top_users_messages = stats.get('top_users_messages', [])
+        # Kullanıcı bilgilerini gizle, sadece sıra ve değerleri göster
+        users_text = await leaderboards.get_text("stats_top_kp")
         
         keyboard = InlineKeyboardMarkup(inline_keyboard=[
             [
@@ -782,18 +769,6 @@ async def show_top_users(callback: types.CallbackQuery) -> None:
             [InlineKeyboardButton(text="⬅️ Geri", callback_data="stats_back_admin")]
         ])
         
-        # KP sıralaması göster
-        users_text = ""
-        if top_users_kp:
-            for i, user in enumerate(top_users_kp, 1):
-                # Kullanıcı bilgilerini gizle, sadece sıra ve değerleri göster
-                points = user.get('kirve_points', 0)
-                messages = user.get('total_messages', 0)
-                
-                users_text += f"{i}. 💎 <b>{points:.2f} KP</b> | 📝 {messages} mesaj\n"
-        else:
-            users_text = "Henüz veri yok"
-        
         message = f"""
 ╔══════════════════════╗
 ║ 👥 <b>EN AKTİF KULLANICILAR</b> 👥 ║
@@ -813,26 +788,37 @@ async def show_top_users(callback: types.CallbackQuery) -> None:
         await callback.answer("❌ Kullanıcı verileri alınamadı!", show_alert=True)
 
 
+def _render_top_users_kp(entries: List[Dict[str, Any]]) -> str:
+    if not entries:
+        return "Henüz veri yok"
+    users_text = ""
+    for i, user in enumerate(entries, 1):
+        users_text += f"{i}. 💎 <b>{user['kirve_points']:.2f} KP</b> | 📝 {user['total_messages']} mesaj\n"
+    return users_text
+
+
+def _render_top_users_messages(entries: List[Dict[str, Any]]) -> str:
+    if not entries:
+        return "Henüz veri yok"
+    users_text = ""
+    for i, user in enumerate(entries, 1):
+        users_text += f"{i}. 📝 <b>{user['total_messages']} mesaj</b> | 💎 {user['kirve_points']:.2f} KP\n"
+    return users_text
+
+
+leaderboards.register_view("stats_top_kp", "points", _render_top_users_kp)
+leaderboards.register_view("stats_top_messages", "messages", _render_top_users_messages)
+
+
 async def show_top_users_kp(callback: types.CallbackQuery) -> None:
-    """KP sıralaması göster"""
+    """KP sıralaması göster - hazır liderlik tablosundan"""
     try:
-        stats = await get_comprehensive_stats()
-        top_users_kp = stats.get('top_users_kp', [])
+        users_text = await leaderboards.get_text("stats_top_kp")
         
         keyboard = InlineKeyboardMarkup(inline_keyboard=[
             [InlineKeyboardButton(text="⬅️ Geri", callback_data="stats_top_users")]
         ])
         
-        users_text = ""
-        if top_users_kp:
-            for i, user in enumerate(top_users_kp, 1):
-                points = user.get('kirve_points', 0)
-                messages = user.get('total_messages', 0)
-                
-                users_text += f"{i}. 💎 <b>{points:.2f} KP</b> | 📝 {messages} mesaj\n"
-        else:
-            users_text = "Henüz veri yok"
-        
         message = f"""
 ╔══════════════════════╗
 ║ 💎 <b>TOP 10 KP SIRALAMASI</b> 💎 ║
@@ -853,25 +839,14 @@ async def show_top_users_kp(callback: types.CallbackQuery) -> None:
 
 
 async def show_top_users_messages(callback: types.CallbackQuery) -> None:
-    """Mesaj sıralaması göster"""
+    """Mesaj sıralaması göster - hazır liderlik tablosundan"""
     try:
-        stats = await get_comprehensive_stats()
-        top_users_messages = stats.get('top_users_messages', [])
+        users_text = await leaderboards.get_text("stats_top_messages")
         
         keyboard = InlineKeyboardMarkup(inline_keyboard=[
             [InlineKeyboardButton(text="⬅️ Geri", callback_data="stats_top_users")]
         ])
         
-        users_text = ""
-        if top_users_messages:
-            for i, user in enumerate(top_users_messages, 1):
-                points = user.get('kirve_points', 0)
-                messages = user.get('total_messages', 0)
-                
-                users_text += f"{i}. 📝 <b>{messages} mesaj</b> | 💎 {points:.2f} KP\n"
-        else:
-            users_text = "Henüz veri yok"
-        
         message = f"""
 ╔══════════════════════╗
 ║ 📝 <b>TOP 10 MESAJ SIRALAMASI</b> 📝 ║
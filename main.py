@@ -29,7 +29,7 @@ from handlers.recruitment_system import (
 from handlers.chat_system import (
     handle_chat_message, send_chat_response, bot_write_command, chat_callback_handler
 )
-from handlers.chat_message_handler import handle_chat_message as handle_chat_message_new, set_bot_instance as set_chat_message_bot_instance
+from handlers.chat_message_handler import set_bot_instance as set_chat_message_bot_instance
 from handlers.admin_panel import router as admin_panel_router
 from handlers.simple_events import router as simple_events_router, set_bot_instance as set_events_bot_instance
 from handlers.unknown_commands import router as unknown_commands_router, set_bot_instance as set_unknown_bot_instance
@@ -51,6 +51,7 @@ from utils.logger import log_system, log_bot, log_error, log_info, log_warning
 from utils.universal_logger import get_universal_logger, log_everything, log_command_attempt
 from utils.rate_limiter import rate_limiter, rate_limit
 from utils.memory_manager import memory_manager, start_memory_cleanup, cleanup_all_resources
+from utils.update_sharding import get_worker_index
 
 # Logger'ı kur
 logger = setup_logger()
@@ -58,7 +59,9 @@ logger = setup_logger()
 # Global bot instance kontrolü
 _bot_instance = None
 _bot_started = False
-_bot_lock_file = "bot_running.lock"
+# Çoklu worker modunda her worker'ın kendi lock dosyası var
+_worker_index = get_worker_index()
+_bot_lock_file = "bot_running.lock" if _worker_index is None else f"bot_running_worker_{_worker_index}.lock"
 
 def check_bot_running():
     """Bot'un zaten çalışıp çalışmadığını kontrol et"""
@@ -126,6 +129,51 @@ async def cleanup_resources():
     try:
         log_system("🧹 Temizlik işlemleri başlatılıyor...")
         
+        # Bekleyen admin bildirim özetlerini gönder
+        try:
+            from utils.notification_digest import admin_notification_aggregator
+            await admin_notification_aggregator.flush_all()
+        except Exception as e:
+            log_error(f"Digest flush hatası: {e}")
+        
+        # Bekleyen konuşma durumu yazmalarını bitir
+        try:
+            from utils.conversation_state import conversation_state_registry
+            await conversation_state_registry.flush()
+        except Exception as e:
+            log_error(f"Konuşma durumu flush hatası: {e}")
+        
+        # Yük izleyiciyi durdur, ertelenmiş istatistikleri yaz
+        try:
+            from utils.update_executor import load_monitor
+            from handlers.message_monitor import flush_daily_stats_buffer
+            from utils.catch_up import catch_up_aggregator
+            load_monitor.stop()
+            await catch_up_aggregator.flush()
+            await flush_daily_stats_buffer()
+            from utils.activity_sketch import activity_counter
+            await activity_counter.flush()
+        except Exception as e:
+            log_error(f"İstatistik buffer flush hatası: {e}")
+        
+        # Lider işlerini durdur ve lease'i bırak (yedek instance hemen devralsın)
+        try:
+            from utils.leader_election import leader_elector
+            await leader_elector.stop()
+        except Exception as e:
+            log_error(f"Lider lease bırakma hatası: {e}")
+        
+        # Gecikmeli aksiyon task'ını durdur (bekleyenler tabloda kalır)
+        from utils.delayed_actions import delayed_action_scheduler
+        delayed_action_scheduler.stop()
+        
+        # Cooldown tekerleğinin tick task'ını durdur
+        from utils.cooldown_manager import cooldowns
+        cooldowns.stop()
+        
+        from utils.rank_index import user_rank_index
+        user_rank_index.stop()
+        
         # Database bağlantısını kapat
         await close_database()
         
@@ -172,9 +220,20 @@ async def main():
         # Konfigürasyon kontrolü
         print("⚙️ Konfigürasyon kontrol ediliyor...")
         config = get_config()
+        if config.BOT_MODE == "webhook":
+            # Secret'sız webhook sahte update kabul eder - başlatma
+            from utils.webhook_server import require_webhook_secret
+            require_webhook_secret(config)
         print("✅ Konfigürasyon yüklendi")
         log_system("Konfigürasyon doğrulandı")
         
+        # Çoklu worker: bu process sadece update'leri alıp worker'lara dağıtır
+        if config.BOT_WORKERS > 1 and _worker_index is None:
+            print(f"🧩 Ön alıcı başlatılıyor - {config.BOT_WORKERS} worker")
+            from utils.update_sharding import run_front
+            await run_front()
+            return
+        
         # Database bağlantısı
         print("🗄️ Database bağlantısı kuruluyor...")
         log_system("Database bağlantısı kuruluyor...")
@@ -193,6 +252,10 @@ async def main():
         print("✅ Bot instance oluşturuldu")
         _bot_instance = bot  # Global instance'ı set et
         
+        # Gönderilen mesajları toplu silme servisi için takip et
+        from utils.message_deletion import setup_message_tracking
+        setup_message_tracking(bot)
+        
         # Bot instance'ını handler'lara aktar
         print("🔗 Bot instance handler'lara aktarılıyor...")
         log_system("Bot instance handler'lara aktarılıyor...")
@@ -216,6 +279,7 @@ async def main():
         from handlers.admin_permission_manager import set_bot_instance as set_admin_permission_bot_instance
         from handlers.admin_market_management import set_bot_instance as set_admin_market_bot_instance
         from handlers.admin_commands import set_bot_instance as set_admin_commands_bot_instance
+        from utils.notification_digest import set_bot_instance as set_notification_digest_bot_instance
         
         set_statistics_bot_instance(bot)
         set_event_management_bot_instance(bot)
@@ -225,6 +289,7 @@ async def main():
         set_admin_permission_bot_instance(bot)
         set_admin_market_bot_instance(bot)
         set_admin_commands_bot_instance(bot)
+        set_notification_digest_bot_instance(bot)  # Admin bildirim özetleri
         
         # Group handler bot instance'ını set et
         from handlers.group_handler import set_bot_instance as set_group_handler_bot_instance
@@ -232,23 +297,49 @@ async def main():
         
         log_system("✅ Bot instance tüm handler'lara aktarıldı!")
         
-        dp = Dispatcher()
+        # FSM durumları Postgres'te (restart'a dayanıklı, cache'li)
+        from utils.fsm_storage import fsm_storage
+        dp = Dispatcher(storage=fsm_storage)
+        
+        # FSM middleware'i get_state ile Postgres'e gider - catch-up ve executor'ın
+        # arkasına al (katlanan mesajlar DB'ye gitmez, state okuması eşzamanlılık limitinde)
+        dp.update.outer_middleware.unregister(dp.fsm)
+        
+        # Restart sonrası eski grup mesajlarını sayaca katla (kuyruğa girmeden)
+        from utils.catch_up import setup_catch_up
+        setup_catch_up(dp)
+        
+        # Callback'leri geldiği anda onayla (spinner'ı kapat), alert'leri follow-up'a çevir
+        # Executor kuyruğundan önce - yoğun grupta da onay beklemez
+        from utils.callback_ack import setup_callback_ack
+        setup_callback_ack(dp, bot)
+        
+        # Update'leri sınırlı eşzamanlılıkla, kullanıcı içi sırayı koruyarak çalıştır
+        from utils.update_executor import setup_update_executor
+        setup_update_executor(dp)
+        dp.update.outer_middleware(dp.fsm)
+        
+        # Mesaj / callback hız limiti - aşılırsa handler'a girmeden düşürülür
+        from utils.rate_limiter import setup_rate_limiter
+        setup_rate_limiter(dp)
+        
+        # Callback'leri sözlük/prefix trie üzerinden tek seferde çöz (filtre zinciri yerine)
+        from utils.callback_router import callback_router, setup_callback_router
+        setup_callback_router(dp)
         
         # Handler'ları kaydet
         log_system("Handler'lar kaydediliyor...")
         
         # 1. CALLBACK HANDLER'LARI (inline button'lar) - ÖNCE callback'leri kaydet
-        dp.callback_query(F.data == "register_user")(register_callback_handler)
-        dp.callback_query(F.data == "get_info")(register_callback_handler)
+        # Not: Aynı key'e ilk kaydedilen handler kazanır (aiogram sırası korunur)
+        callback_router.exact(register_callback_handler, "register_user", "get_info")
         
-        # Chat sistemi callback'leri
-        dp.callback_query(F.data == "register_user")(chat_callback_handler)
-        dp.callback_query(F.data == "show_commands")(chat_callback_handler)
-        dp.callback_query(F.data == "close_message")(chat_callback_handler)
+        # Chat sistemi callback'leri (register_user yukarıda register_handler'a gider)
+        callback_router.exact(chat_callback_handler, "show_commands", "close_message")
         
         # Etkinlik listesi callback'i
         from handlers.events_list import refresh_lotteries_list_callback
-        dp.callback_query(F.data == "refresh_lotteries_list")(refresh_lotteries_list_callback)
+        callback_router.exact(refresh_lotteries_list_callback, "refresh_lotteries_list")
         
         log_system("Callback handler'lar kaydedildi")
         
@@ -257,21 +348,14 @@ async def main():
         set_profile_bot_instance(bot)
         
         # Profil callback'leri - Basit filter
-        dp.callback_query(lambda c: c.data and c.data.startswith("profile_"))(profile_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("buy_product_"))(profile_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("confirm_buy_"))(profile_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("view_product_"))(profile_callback_handler)
-        dp.callback_query(F.data == "product_sold_out")(profile_callback_handler)
-        dp.callback_query(F.data == "my_orders")(profile_callback_handler)
-        dp.callback_query(F.data == "profile_orders")(profile_callback_handler)
-        dp.callback_query(F.data == "insufficient_balance")(profile_callback_handler)
-        dp.callback_query(F.data == "out_of_stock")(profile_callback_handler)
-        dp.callback_query(F.data == "profile_back")(profile_callback_handler)
-        dp.callback_query(F.data == "profile_refresh")(profile_callback_handler)
+        callback_router.prefix(profile_callback_handler, "profile_", "buy_product_", "confirm_buy_", "view_product_", "my_orders:")
+        callback_router.exact(
+            profile_callback_handler,
+            "product_sold_out", "my_orders", "insufficient_balance", "out_of_stock"
+        )
         
         # Ranking callback'leri - Ayrı kayıt
-        dp.callback_query(F.data == "ranking_top_kp")(profile_callback_handler)
-        dp.callback_query(F.data == "ranking_top_messages")(profile_callback_handler)
+        callback_router.exact(profile_callback_handler, "ranking_top_kp", "ranking_top_messages")
         
         # Admin sipariş yönetimi router'ı - YENİ!
         from handlers.admin_order_management import router as admin_order_router
@@ -292,8 +376,8 @@ async def main():
         async def price_callback_wrapper(callback):
             return await handle_price_callback(callback, callback.data)
         
-        dp.callback_query(F.data.startswith("category_"))(category_callback_wrapper)
-        dp.callback_query(F.data.startswith("price_"))(price_callback_wrapper)
+        callback_router.prefix(category_callback_wrapper, "category_")
+        callback_router.prefix(price_callback_wrapper, "price_")
         
         # Admin sipariş callback'leri - admin_panel.py içinde handle ediliyor
         
@@ -320,13 +404,9 @@ async def main():
         # 2. KOMUT HANDLER'LARI
         dp.message(CommandStart())(start_command)
         
-        # 💎 MESAJ MONITOR - Point sistemi ve mesaj kayıt (ÖNCE)
-        # Sadece point sistemi için, dinamik komutları engellemeyecek
+        # 💎 GRUP MESAJ PIPELINE - accounting → anti_spam → points → chat_reply
+        # Tek handler, dinamik komutları (!) engellemeyecek
         dp.message(F.chat.type.in_(["group", "supergroup"]), ~F.text.startswith("/"), ~F.text.startswith("!"))(monitor_group_message)
-        
-        # 💬 CHAT MESAJ HANDLER - Kayıtlı kullanıcıları menu'ye yönlendir (SONRA)
-        # Sadece chat sistemi için, dinamik komutları engellemeyecek
-        dp.message(F.chat.type.in_(["group", "supergroup"]), ~F.text.startswith("/"), ~F.text.startswith("!"))(handle_chat_message_new)
         dp.message(Command("kirvekayit"))(kirvekayit_command)
         dp.message(Command("kayitsil"))(kayitsil_command)
         # Grup komutları handle_group_command_silently'de işleniyor
@@ -514,13 +594,38 @@ async def main():
         
         # BROADCAST CALLBACK HANDLER'LARI - MANUEL KAYIT
         from handlers.broadcast_system import start_broadcast_callback, cancel_broadcast_callback, broadcast_stats_callback, broadcast_back_callback, broadcast_close_callback
-        dp.callback_query(lambda c: c.data == "admin_broadcast")(start_broadcast_callback)
-        dp.callback_query(lambda c: c.data == "admin_broadcast_cancel")(cancel_broadcast_callback)
-        dp.callback_query(lambda c: c.data == "broadcast_stats")(broadcast_stats_callback)
-        dp.callback_query(lambda c: c.data == "broadcast_back")(broadcast_back_callback)
-        dp.callback_query(lambda c: c.data == "broadcast_close")(broadcast_close_callback)
+        callback_router.exact(start_broadcast_callback, "admin_broadcast")
+        callback_router.exact(cancel_broadcast_callback, "admin_broadcast_cancel")
+        callback_router.exact(broadcast_stats_callback, "broadcast_stats")
+        callback_router.exact(broadcast_back_callback, "broadcast_back")
+        callback_router.exact(broadcast_close_callback, "broadcast_close")
         
         # 🔧 CHAT-BASED SİSTEMLER - TEK HANDLER İLE YÖNETİM
+        # Akış -> handler tablosu; liste sırası öncelik sırasıdır
+        from utils.conversation_state import conversation_state_registry
+        from handlers.broadcast_system import process_broadcast_message_router
+        from handlers.dynamic_command_creator import handle_command_creation_input
+        from handlers.admin_market_management import handle_product_edit_input, handle_product_delete_input
+        from handlers.admin_panel import handle_custom_input
+        from handlers.simple_events import handle_lottery_input
+        from handlers.scheduled_messages import handle_scheduled_input
+        
+        conversation_state_registry.register_handlers([
+            ("broadcast", process_broadcast_message_router),
+            ("command_creation", handle_command_creation_input),
+            ("product_creation", handle_product_creation_input),
+            ("product_edit", handle_product_edit_input),
+            ("product_delete", handle_product_delete_input),
+            ("product_step", handle_product_step_input),
+            ("admin_order", handle_admin_order_message),
+            ("settings_input", handle_custom_input),
+            ("lottery", handle_lottery_input),
+            ("scheduled_input", handle_scheduled_input),
+        ])
+        
+        # Yarım kalan akışları (ürün ekleme, çekiliş, bot oluşturma...) geri yükle
+        await conversation_state_registry.attach_storage(fsm_storage, bot.id)
+        
         async def handle_all_chat_inputs(message: Message):
             """Tüm chat-based input sistemlerini tek handler'da yönet"""
             try:
@@ -534,88 +639,9 @@ async def main():
                     log_system(f"⏭️ Komut mesajı atlandı - User: {user_id}")
                     return
                 
-                # 0. BROADCAST SİSTEMİ KONTROLÜ - GERİ EKLENDİ
-                from handlers.broadcast_system import broadcast_states
-                if user_id in broadcast_states and broadcast_states[user_id] == "waiting_for_message":
-                    log_system(f"📢 BROADCAST STATE BULUNDU - User: {user_id}")
-                    # Broadcast mesajını işle
-                    from handlers.broadcast_system import process_broadcast_message_router
-                    await process_broadcast_message_router(message)
-                    return
-                
-                # 1. Komut oluşturma sistemi kontrolü
-                from handlers.dynamic_command_creator import command_creation_states
-                if user_id in command_creation_states:
-                    from handlers.dynamic_command_creator import handle_command_creation_input
-                    await handle_command_creation_input(message)
-                    return
-                
-                # 2. Market ürün ekleme sistemi kontrolü
-                from handlers.admin_market_management import product_creation_data
-                if user_id in product_creation_data:
-                    from handlers.admin_market_management import handle_product_creation_input
-                    await handle_product_creation_input(message)
-                    return
-                
-                # 2.1. Market ürün düzenleme sistemi kontrolü
-                from handlers.admin_market_management import product_edit_data
-                if user_id in product_edit_data:
-                    from handlers.admin_market_management import handle_product_edit_input
-                    await handle_product_edit_input(message)
-                    return
-                
-                # 2.2. Market ürün silme sistemi kontrolü
-                from handlers.admin_market_management import product_delete_data
-                if user_id in product_delete_data:
-                    from handlers.admin_market_management import handle_product_delete_input
-                    await handle_product_delete_input(message)
-                    return
-                
-                # 3. Admin panel ürün adım sistemi kontrolü
-                from handlers.admin_panel import product_data_storage
-                if user_id in product_data_storage:
-                    from handlers.admin_panel import handle_product_step_input
-                    await handle_product_step_input(message)
-                    return
-                
-                # 4. Admin sipariş mesajları kontrolü
-                from handlers.admin_order_management import admin_order_states
-                if user_id in admin_order_states:
-                    from handlers.admin_order_management import handle_admin_order_message
-                    await handle_admin_order_message(message)
-                    return
-                
-                # 5. Custom input kontrolü - Sistem ayarları için
-                from utils.memory_manager import memory_manager
-                cache_manager = memory_manager.get_cache_manager()
-                input_state = cache_manager.get_cache(f"input_state_{user_id}")
-                if input_state and input_state in ["custom_points", "custom_daily", "custom_weekly"]:
-                    log_system(f"💰 CUSTOM INPUT BULUNDU - User: {user_id}, State: {input_state}")
-                    from handlers.admin_panel import handle_custom_input
-                    await handle_custom_input(message)
-                    return
-                
-                # 6. Recruitment response kontrolü - sadece recruitment callback'lerinde çalışır
-                # Burada çağrılmaz, sadece callback'lerde çalışır
-                
-                # 7. Çekiliş input kontrolü - çekiliş oluşturma sürecinde
-                lottery_data = memory_manager.get_lottery_data(user_id)
-                # logger.info(f"🎯 ÇEKİLİŞ KONTROL - User: {user_id}, lottery_data: {lottery_data}")
-                if lottery_data:
-                    log_system(f"🎯 ÇEKİLİŞ INPUT BULUNDU - User: {user_id}, Data: {lottery_data}")
-                    from handlers.simple_events import handle_lottery_input
-                    await handle_lottery_input(message)
-                    return
-                else:
-                    # logger.info(f"🎯 ÇEKİLİŞ DATA YOK - User: {user_id}")
-                    pass
-                
-                # 8. Scheduled Messages input kontrolü
-                input_state = memory_manager.get_input_state(user_id)
-                if input_state and (input_state.startswith("create_bot_") or input_state.startswith("recreate_bot_") or input_state.startswith("add_link_")):
-                    log_system(f"🔍 SCHEDULED INPUT BULUNDU - User: {user_id}, State: {input_state}")
-                    from handlers.scheduled_messages import handle_scheduled_input
-                    await handle_scheduled_input(message)
+                # 0-8. Aktif input akışı (broadcast, komut oluşturma, market, sipariş,
+                # sistem ayarı, çekiliş, zamanlanmış mesaj) - tek kayıt araması
+                if await conversation_state_registry.dispatch(message):
                     return
                 
                 # 9. Dinamik komut çalıştırma kontrolü - en son
@@ -839,17 +865,11 @@ _🏆 Etkinliklerde point'lerinle özel ödüller kazanabilirsin!_
         
         # Admin panel callback'leri - SADECE admin panel prefix'leri (event_ prefix'i YOK!)
         from handlers.admin_panel import admin_panel_callback
-        dp.callback_query(
-            F.data.startswith("admin_") |
-            F.data.startswith("category_") |
-            F.data.startswith("price_") |
-            F.data.startswith("admin_order_") |
-            F.data.startswith("set_points_") |
-            F.data.startswith("set_daily_") |
-            F.data.startswith("set_weekly_") |
-            F.data.startswith("balance_") |
-            F.data.startswith("system_")
-        )(admin_panel_callback)
+        # category_/price_ yukarıdaki wrapper'lara gider (önce kaydedildi)
+        callback_router.prefix(
+            admin_panel_callback,
+            "admin_", "set_points_", "set_daily_", "set_weekly_", "balance_", "system_"
+        )
         
         # Admin panel komutunu manuel olarak kaydet
         from handlers.admin_panel import admin_panel_command
@@ -901,7 +921,11 @@ _🏆 Etkinliklerde point'lerinle özel ödüller kazanabilirsin!_
                 await callback.answer("❌ Hata oluştu!")
         
         # Start menü callback'lerini kaydet
-        dp.callback_query(F.data.in_(["menu_command", "market_command", "events_command", "profile_command", "ranking_command", "help_command", "start_command"]))(start_menu_callback)
+        callback_router.exact(
+            start_menu_callback,
+            "menu_command", "market_command", "events_command", "profile_command",
+            "ranking_command", "help_command", "start_command"
+        )
         
         # Dinamik komut oluşturucu callback'leri - MANUEL KAYIT
         from handlers.dynamic_command_creator import (
@@ -909,12 +933,14 @@ _🏆 Etkinliklerde point'lerinle özel ödüller kazanabilirsin!_
             handle_skip_button_text, handle_skip_button_url,
             list_custom_commands_handler, delete_custom_command_handler
         )
-        dp.callback_query(F.data == "admin_command_creator")(start_command_creation)
-        dp.callback_query(F.data == "cancel_command_creation")(cancel_command_creation)
-        dp.callback_query(F.data == "skip_button_text")(handle_skip_button_text)
-        dp.callback_query(F.data == "skip_button_url")(handle_skip_button_url)
-        dp.callback_query(F.data == "list_custom_commands")(list_custom_commands_handler)
-        dp.callback_query(F.data == "delete_custom_command")(delete_custom_command_handler)
+        # Not: admin_command_creator, admin_ prefix'i önce kaydedildiği için admin_panel_callback'e gider
+        callback_router.exact(start_command_creation, "admin_command_creator")
+        callback_router.exact(cancel_command_creation, "cancel_command_creation")
+        callback_router.exact(handle_skip_button_text, "skip_button_text")
+        callback_router.exact(handle_skip_button_url, "skip_button_url")
+        callback_router.exact(list_custom_commands_handler, "list_custom_commands")
+        callback_router.prefix(list_custom_commands_handler, "list_custom_commands:")
+        callback_router.exact(delete_custom_command_handler, "delete_custom_command")
         
         # 🔥 YENİ EKSİK SİSTEMLER - CALLBACK HANDLER'LAR
         # Zamanlanmış mesajlar sistemi callback'leri - EKSİK FONKSIYONLAR, KALDIRILDI
@@ -934,31 +960,16 @@ _🏆 Etkinliklerde point'lerinle özel ödüller kazanabilirsin!_
         
         # Scheduled Messages callback'leri
         from handlers.scheduled_messages import scheduled_callback_handler
-        dp.callback_query(lambda c: c.data and c.data.startswith("scheduled_"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("toggle_bot_"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("edit_bot_"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("bot_toggle_"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("edit_messages_"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("edit_interval_"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("edit_link_"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("edit_image_"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("edit_name_"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("set_interval_"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("remove_link_"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("add_link_"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("remove_image_"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("add_image_"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("create_bot_profile"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("edit_message_text_"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("send_message_"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("recreate_bot_"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("delete_bot_"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("create_bot_link_yes_"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("create_bot_link_no_"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("select_bot_group_"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("recreate_bot_link_yes_"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("recreate_bot_link_no_"))(scheduled_callback_handler)
-        dp.callback_query(lambda c: c.data and c.data.startswith("select_recreate_group_"))(scheduled_callback_handler)
+        callback_router.prefix(
+            scheduled_callback_handler,
+            "scheduled_", "toggle_bot_", "edit_bot_", "bot_toggle_",
+            "edit_messages_", "edit_interval_", "edit_link_", "edit_image_",
+            "edit_name_", "set_interval_", "remove_link_", "add_link_",
+            "remove_image_", "add_image_", "create_bot_profile", "edit_message_text_",
+            "send_message_", "recreate_bot_", "delete_bot_", "create_bot_link_yes_",
+            "create_bot_link_no_", "select_bot_group_", "recreate_bot_link_yes_", "recreate_bot_link_no_",
+            "select_recreate_group_"
+        )
 
         
         # 🔥 MANUEL HANDLER KAYIT - ÇEKİLİŞ MESAJ HANDLER'ı (AKTİF)
@@ -974,8 +985,21 @@ _🏆 Etkinliklerde point'lerinle özel ödüller kazanabilirsin!_
         # Background task'ları başlat
         asyncio.create_task(start_cleanup_task())
         asyncio.create_task(start_memory_cleanup())  # Memory cleanup
-        asyncio.create_task(start_recruitment_background())  # Kayıt teşvik sistemi
-        asyncio.create_task(start_scheduled_messages(bot))  # Zamanlanmış mesajlar
+        
+        # Tekil işler sadece lider instance'ta çalışır (lease ile seçilir)
+        from utils.leader_election import leader_elector
+        leader_elector.add_job("recruitment", start_recruitment_background)  # Kayıt teşvik sistemi
+        # Not: zamanlanmış mesaj döngüsü önceden hatalı çağrı yüzünden hiç çalışmıyordu; artık liderde gerçekten gönderir
+        leader_elector.add_job("scheduled_messages", lambda: start_scheduled_messages(bot))  # Zamanlanmış mesajlar
+        
+        # Gecikmeli aksiyonlar (mesaj silme, hatırlatma) - tek sleeper task; tablodan bekleyenleri sadece lider yükler
+        from utils.delayed_actions import delayed_action_scheduler, start_delayed_action_scheduler
+        await start_delayed_action_scheduler(bot)
+        leader_elector.add_job("delayed_actions_replay", delayed_action_scheduler.replay_pending)
+        
+        # Profil sıralamaları için bellek içi indeks (açılışta tablodan kurulur)
+        from utils.rank_index import user_rank_index
+        await user_rank_index.start()
         log_system("Background cleanup task başlatıldı!")
         log_system("🎯 Kayıt teşvik sistemi başlatıldı!")
         
@@ -1031,8 +1055,9 @@ _🏆 Etkinliklerde point'lerinle özel ödüller kazanabilirsin!_
             except Exception as e:
                 log_error(f"Startup bildirimi hatası: {e}")
         
-        # Background'da çalıştır
-        asyncio.create_task(delayed_startup_notification())
+        # Background'da çalıştır - sadece lider, devralan lider de bir kez gönderir
+        leader_elector.add_job("startup_notification", delayed_startup_notification, run_once=True)
+        leader_elector.start()
         
         # Bot'u başlat
         print("🚀 Bot polling başlatılıyor...")
@@ -1062,8 +1087,19 @@ _🏆 Etkinliklerde point'lerinle özel ödüller kazanabilirsin!_
         # asyncio.create_task(periodic_logging())
         # print("✅ Periyodik log task'i başlatıldı")
         
-        print("🎯 Bot polling başlatılıyor...")
-        await dp.start_polling(bot, timeout=60, request_timeout=60)
+        if _worker_index is not None:
+            print(f"🧩 Worker {_worker_index} başlatılıyor...")
+            from utils.update_sharding import run_shard_worker
+            await run_shard_worker(dp, bot, _worker_index)
+        elif config.BOT_MODE == "webhook":
+            print("🌐 Bot webhook modunda başlatılıyor...")
+            from utils.webhook_server import run_webhook
+            await run_webhook(dp, bot)
+        else:
+            print("🎯 Bot polling başlatılıyor...")
+            # Daha önce webhook modunda çalıştıysa getUpdates çakışmasın
+            await bot.delete_webhook(drop_pending_updates=False)
+            await dp.start_polling(bot, timeout=60, request_timeout=60)
         
     except KeyboardInterrupt:
         log_system("Bot kullanıcı tarafından durduruldu!")
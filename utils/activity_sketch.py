@@ -0,0 +1,251 @@
+"""
+📈 Tekil Aktif Kullanıcı Sayaçları - HyperLogLog
+Haftalık / günlük aktif kullanıcı sayıları daily_stats üzerinde
+COUNT(DISTINCT user_id) taramasıyla hesaplanmaz:
+    • Her (gün, grup) için 4096 register'lık (4 KB) HLL taslağı tutulur;
+      group_id 0 tüm grupların birleşimidir. Hata payı ~%1.6
+    • Mesaj geldikçe bellek içi taslağa eklenir, ACTIVITY_FLUSH_INTERVAL'da
+      bir activity_sketches tablosundaki register'larla birleştirilir
+      (birden fazla instance aynı satıra güvenle yazar - register bazında max)
+    • Pencere (gün/hafta/ay, grup veya global) = o günlerin taslaklarının
+      birleşimi; kullanıcı sayısından bağımsız, sabit maliyet
+Geçmiş günlerin taslakları bir kez okunup bellekte tutulur.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from database import get_db_pool
+
+logger = logging.getLogger(__name__)
+
+# 2^12 register - standart hata 1.04 / sqrt(4096) ≈ %1.6
+HLL_PRECISION = 12
+HLL_REGISTERS = 1 << HLL_PRECISION
+
+# Tüm gruplar için birleşik taslak
+GLOBAL_GROUP_ID = 0
+
+ACTIVITY_FLUSH_INTERVAL = 60  # saniye
+
+# Bugün/dün taslakları diğer instance'ların yazdıkları için bu aralıkla yeniden okunur
+RECENT_SKETCH_TTL = 60  # saniye
+
+# Bellekte tutulan en eski gün
+MAX_CACHED_DAYS = 62
+
+_SUFFIX_BITS = 64 - HLL_PRECISION
+_SUFFIX_MASK = (1 << _SUFFIX_BITS) - 1
+
+
+def _hash64(value: int) -> int:
+    # Process'ler arası kararlı hash - tablodaki register'lar tüm instance'larda aynı anlamda
+    return int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), "little")
+
+
+class HyperLogLog:
+    """Tekil eleman sayısı tahmini - birleştirilebilir, byte dizisi olarak saklanır"""
+
+    __slots__ = ("registers",)
+
+    def __init__(self, registers: Optional[bytes] = None):
+        self.registers = bytearray(registers) if registers else bytearray(HLL_REGISTERS)
+
+    def add(self, value: int) -> None:
+        hashed = _hash64(value)
+        index = hashed >> _SUFFIX_BITS
+        rank = _SUFFIX_BITS - (hashed & _SUFFIX_MASK).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Register bazında max - birleşim kümesinin taslağı (yerinde)"""
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self) -> int:
+        registers = self.registers
+        m = len(registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in registers)
+        zeros = registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Küçük aralık düzeltmesi (linear counting)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+
+_SketchKey = Tuple[date, int]
+
+
+class ActivityCounter:
+    """(gün, grup) taslakları - bellekte biriktir, tabloya birleştirerek yaz"""
+
+    def __init__(self):
+        self._pending: Dict[_SketchKey, HyperLogLog] = {}  # Henüz yazılmamış eklemeler
+        self._cache: Dict[_SketchKey, Tuple[Optional[float], HyperLogLog]] = {}  # Tablo + yerel eklemeler
+        self._flush_task: Optional[asyncio.Task] = None
+        self.added = 0
+        self.flushed_rows = 0
+
+    # ---------------- kayıt ----------------
+
+    def add(self, user_id: int, group_id: int, day: Optional[date] = None) -> None:
+        """Kullanıcıyı o günün grup ve global taslağına ekle"""
+        day = day or datetime.now().date()
+        for key in ((day, group_id), (day, GLOBAL_GROUP_ID)):
+            self._pending.setdefault(key, HyperLogLog()).add(user_id)
+            cached = self._cache.get(key)
+            if cached:
+                cached[1].add(user_id)
+        self.added += 1
+
+        if not self._flush_task or self._flush_task.done():
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+            except RuntimeError:
+                pass
+
+    async def _flush_loop(self) -> None:
+        while self._pending:
+            await asyncio.sleep(ACTIVITY_FLUSH_INTERVAL)
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Bekleyen taslakları tablodaki register'larla birleştir"""
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        try:
+            pool = await get_db_pool()
+            if not pool:
+                raise ConnectionError("Database pool yok")
+            async with pool.acquire() as conn:
+                async with conn.transaction():
+                    for (day, group_id), sketch in sorted(batch.items(), key=lambda item: item[0]):
+                        inserted = await conn.fetchval('''
+                            INSERT INTO activity_sketches (day, group_id, registers)
+                            VALUES ($1, $2, $3)
+                            ON CONFLICT (day, group_id) DO NOTHING
+                            RETURNING 1
+                        ''', day, group_id, sketch.to_bytes())
+                        if inserted:
+                            continue
+                        stored = await conn.fetchval('''
+                            SELECT registers FROM activity_sketches
+                            WHERE day = $1 AND group_id = $2
+                            FOR UPDATE
+                        ''', day, group_id)
+                        merged = HyperLogLog(stored).merge(sketch)
+                        await conn.execute('''
+                            UPDATE activity_sketches SET registers = $3, updated_at = NOW()
+                            WHERE day = $1 AND group_id = $2
+                        ''', day, group_id, merged.to_bytes())
+            self.flushed_rows += len(batch)
+        except Exception as e:
+            logger.error(f"❌ Aktivite taslağı flush hatası: {e}")
+            # Kaybetme - bir sonraki flush'ta tekrar dene
+            for key, sketch in batch.items():
+                pending = self._pending.get(key)
+                self._pending[key] = pending.merge(sketch) if pending else sketch
+
+    # ---------------- sorgu ----------------
+
+    def _is_fresh(self, key: _SketchKey, loaded_at: Optional[float]) -> bool:
+        if loaded_at is None:
+            return False  # Tablo okunamamıştı
+        if key[0] < datetime.now().date() - timedelta(days=1):
+            return True
+        return time.monotonic() - loaded_at < RECENT_SKETCH_TTL
+
+    async def _load(self, start: date, end: date, group_id: int) -> None:
+        """Penceredeki eksik / bayat taslakları tek sorguyla oku"""
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        missing = [d for d in days if (d, group_id) not in self._cache or not self._is_fresh((d, group_id), self._cache[(d, group_id)][0])]
+        if not missing:
+            return
+
+        stored: Dict[date, bytes] = {}
+        loaded_at = None
+        pool = await get_db_pool()
+        if pool:
+            try:
+                async with pool.acquire() as conn:
+                    rows = await conn.fetch('''
+                        SELECT day, registers FROM activity_sketches
+                        WHERE group_id = $1 AND day = ANY($2::date[])
+                    ''', group_id, missing)
+                stored = {row["day"]: row["registers"] for row in rows}
+                loaded_at = time.monotonic()
+            except Exception as e:
+                logger.error(f"❌ Aktivite taslağı okunamadı: {e}")
+
+        for day in missing:
+            sketch = HyperLogLog(stored.get(day))
+            pending = self._pending.get((day, group_id))
+            if pending:
+                sketch.merge(pending)
+            self._cache[(day, group_id)] = (loaded_at, sketch)
+
+        oldest = datetime.now().date() - timedelta(days=MAX_CACHED_DAYS)
+        for key in [k for k in self._cache if k[0] < oldest]:
+            del self._cache[key]
+
+    async def window_sketch(self, start: date, end: date, group_id: Optional[int] = None) -> HyperLogLog:
+        """[start, end] günlerinin birleşik taslağı"""
+        group_id = GLOBAL_GROUP_ID if group_id is None else group_id
+        await self._load(start, end, group_id)
+        merged = HyperLogLog()
+        day = start
+        while day <= end:
+            cached = self._cache.get((day, group_id))
+            if cached:
+                merged.merge(cached[1])
+            day += timedelta(days=1)
+        return merged
+
+    async def count_range(self, start: date, end: date, group_id: Optional[int] = None) -> int:
+        """Tarih aralığındaki tekil aktif kullanıcı sayısı (tahmini)"""
+        return (await self.window_sketch(start, end, group_id)).count()
+
+    async def count(self, days: int = 1, group_id: Optional[int] = None) -> int:
+        """Bugün dahil son `days` günün tekil aktif kullanıcı sayısı"""
+        today = datetime.now().date()
+        return await self.count_range(today - timedelta(days=days - 1), today, group_id)
+
+    async def count_per_day(self, days: Iterable[date], group_id: Optional[int] = None) -> Dict[date, int]:
+        """Gün bazında tekil aktif kullanıcı sayıları"""
+        days = list(days)
+        if not days:
+            return {}
+        group_id = GLOBAL_GROUP_ID if group_id is None else group_id
+        await self._load(min(days), max(days), group_id)
+        return {day: self._cache[(day, group_id)][1].count() for day in days}
+
+    async def get_active_users(self, group_id: Optional[int] = None) -> Dict[str, int]:
+        """DAU / WAU / MAU"""
+        return {
+            "dau": await self.count(1, group_id),
+            "wau": await self.count(7, group_id),
+            "mau": await self.count(30, group_id),
+        }
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "added": self.added,
+            "pending_sketches": len(self._pending),
+            "cached_sketches": len(self._cache),
+            "flushed_rows": self.flushed_rows,
+        }
+
+
+# Global activity counter instance
+activity_counter = ActivityCounter()
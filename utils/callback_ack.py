@@ -0,0 +1,118 @@
+"""
+⚡ Erken Callback Onayı - Spinner'sız butonlar
+Her callback query geldiği anda boş answer ile onaylanır, handler'lar
+sonra çalışır. Onay update seviyesinde, update executor'ın kuyruğundan
+önce yapılır - yoğun grupta da spinner beklemez. Handler'ın kendi callback.answer() çağrısı session
+middleware'inde yakalanır (query zaten cevaplandı, ikinci answer gösterilmez):
+    • Alert'ler (show_alert) ve ❌ / ⚠️ ile başlayan hata toast'ları
+      kullanıcıya özel mesaj olarak (follow-up) gönderilir
+    • Diğer toast'lar ("✅ Liste yenilendi!" gibi onaylar, "⏳ ..." gibi
+      durum metinleri) ve metinsiz answer'lar sessizce yutulur - sonuç
+      zaten düzenlenen mesajda görünür
+Böylece yavaş handler'lar "query is too old" hatası almaz.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware, Bot, Dispatcher
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import AnswerCallbackQuery, Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import TelegramObject, Update
+
+logger = logging.getLogger(__name__)
+
+# Onaylanmış query'lerin tutulacağı maksimum sayı / süre
+MAX_ACKED_QUERIES = 5000
+ACKED_QUERY_TTL = 900  # 15 dakika - Telegram query ömrü bunun altında
+
+# Bu işaretlerle başlayan toast'lar alert gibi follow-up mesajına çevrilir
+FOLLOWUP_TEXT_PREFIXES = ("❌", "⚠")
+
+
+class CallbackAckRegistry:
+    """Erken onaylanmış callback query ID'leri -> kullanıcı ID'si"""
+
+    def __init__(self):
+        self._acked: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def mark(self, query_id: str, user_id: int) -> None:
+        self._acked[query_id] = (user_id, time.monotonic())
+        self._acked.move_to_end(query_id)
+        self._prune()
+
+    def get_user(self, query_id: str):
+        entry = self._acked.get(query_id)
+        return entry[0] if entry else None
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        while self._acked:
+            query_id, (_, acked_at) = next(iter(self._acked.items()))
+            if len(self._acked) > MAX_ACKED_QUERIES or now - acked_at > ACKED_QUERY_TTL:
+                self._acked.popitem(last=False)
+            else:
+                break
+
+
+callback_ack_registry = CallbackAckRegistry()
+
+
+class EarlyCallbackAckMiddleware(BaseMiddleware):
+    """Callback query'yi kuyruk ve handler'dan önce onaylayan update outer middleware"""
+
+    def __init__(self, registry: CallbackAckRegistry):
+        self.registry = registry
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        query = event.callback_query if isinstance(event, Update) else None
+        if query is not None:
+            try:
+                await data["bot"].answer_callback_query(query.id)
+                self.registry.mark(query.id, query.from_user.id)
+            except Exception as e:
+                # Onay başarısızsa handler'ın kendi answer'ı normal şekilde gider
+                logger.debug(f"Erken callback onayı başarısız ({query.id}): {e}")
+        return await handler(event, data)
+
+
+class CallbackAnswerFollowupMiddleware(BaseRequestMiddleware):
+    """Onaylanmış query'ler için gelen answerCallbackQuery çağrılarını follow-up'a çevirir"""
+
+    def __init__(self, registry: CallbackAckRegistry):
+        self.registry = registry
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: "Bot",
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        if isinstance(method, AnswerCallbackQuery):
+            user_id = self.registry.get_user(method.callback_query_id)
+            if user_id is not None:
+                if method.text and (method.show_alert or method.text.lstrip().startswith(FOLLOWUP_TEXT_PREFIXES)):
+                    # Alert / hata artık gösterilemez - özel mesajla ilet
+                    try:
+                        await bot.send_message(user_id, method.text)
+                    except Exception as e:
+                        logger.debug(f"Callback follow-up gönderilemedi (User: {user_id}): {e}")
+                return True
+        return await make_request(bot, method)
+
+
+def setup_callback_ack(dp: Dispatcher, bot: Bot) -> None:
+    """
+    Erken onay middleware'ini dispatcher'a, follow-up middleware'ini bot session'ına ekle.
+    Update executor'dan önce eklenmeli - onay chat kuyruğunda beklemesin.
+    """
+    dp.update.outer_middleware(EarlyCallbackAckMiddleware(callback_ack_registry))
+    bot.session.middleware(CallbackAnswerFollowupMiddleware(callback_ack_registry))
@@ -0,0 +1,140 @@
+"""
+🧭 Tablo Tabanlı Callback Router - Sabit maliyetli dispatch
+Callback data bir kez okunur; handler tam eşleşme sözlüğü ve prefix
+trie'si üzerinden bulunur. aiogram'ın filtreleri sırayla denemesinin
+yerine çözüm maliyeti kayıtlı handler sayısından bağımsızdır, sadece
+callback data uzunluğuna bağlıdır.
+
+Birden fazla kayıt eşleşirse aiogram'daki gibi ilk kaydedilen kazanır.
+Eşleşme yoksa update normal aiogram akışına (router'lara) devam eder.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.types import CallbackQuery, TelegramObject
+
+logger = logging.getLogger(__name__)
+
+CallbackHandler = Callable[[CallbackQuery], Awaitable[Any]]
+
+
+@dataclass
+class CallbackRoute:
+    """Kayıtlı tek bir callback rotası"""
+    key: str
+    handler: CallbackHandler
+    order: int
+    is_prefix: bool
+    hits: int = 0
+
+
+@dataclass
+class _TrieNode:
+    children: Dict[str, "_TrieNode"] = field(default_factory=dict)
+    route: Optional[CallbackRoute] = None
+
+
+class CallbackRouter:
+    """Tam eşleşme sözlüğü + prefix trie ile callback çözücü"""
+
+    def __init__(self):
+        self._exact: Dict[str, CallbackRoute] = {}
+        self._root = _TrieNode()
+        self._order = 0
+        self.misses = 0
+
+    def _next_order(self) -> int:
+        self._order += 1
+        return self._order
+
+    def exact(self, handler: CallbackHandler, *keys: str) -> None:
+        """`callback.data == key` rotaları"""
+        for key in keys:
+            if key in self._exact:
+                # aiogram'da da ilk kayıt kazanır - sonraki kayıt hiç çalışmazdı
+                logger.debug(f"Callback rotası zaten kayıtlı, atlandı: {key}")
+                continue
+            self._exact[key] = CallbackRoute(key, handler, self._next_order(), is_prefix=False)
+
+    def prefix(self, handler: CallbackHandler, *prefixes: str) -> None:
+        """`callback.data.startswith(prefix)` rotaları"""
+        for prefix in prefixes:
+            node = self._root
+            for char in prefix:
+                node = node.children.setdefault(char, _TrieNode())
+            if node.route is not None:
+                logger.debug(f"Callback prefix'i zaten kayıtlı, atlandı: {prefix}")
+                continue
+            node.route = CallbackRoute(prefix, handler, self._next_order(), is_prefix=True)
+
+    def resolve(self, data: Optional[str]) -> Optional[CallbackRoute]:
+        """Callback data için en önce kaydedilmiş eşleşen rotayı bul"""
+        if not data:
+            return None
+
+        best = self._exact.get(data)
+        node = self._root
+        for char in data:
+            node = node.children.get(char)
+            if node is None:
+                break
+            if node.route and (best is None or node.route.order < best.order):
+                best = node.route
+        return best
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Rota sayıları ve en çok kullanılan rotalar"""
+        routes = list(self._exact.values()) + list(self._iter_prefix_routes())
+        top = sorted((r for r in routes if r.hits), key=lambda r: r.hits, reverse=True)[:10]
+        return {
+            "exact_routes": len(self._exact),
+            "prefix_routes": len(routes) - len(self._exact),
+            "misses": self.misses,
+            "top_routes": [(r.key + ("*" if r.is_prefix else ""), r.hits) for r in top],
+        }
+
+    def _iter_prefix_routes(self) -> Iterable[CallbackRoute]:
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node.route:
+                yield node.route
+            stack.extend(node.children.values())
+
+
+class CallbackRouterMiddleware(BaseMiddleware):
+    """Eşleşen callback'i doğrudan handler'ına gönderen outer middleware"""
+
+    def __init__(self, callback_router: CallbackRouter):
+        self.callback_router = callback_router
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if isinstance(event, CallbackQuery):
+            route = self.callback_router.resolve(event.data)
+            if route:
+                route.hits += 1
+                return await route.handler(event)
+            self.callback_router.misses += 1
+        # Tabloda yok - router'lardaki filtreli handler'lara bırak
+        return await handler(event, data)
+
+
+# Global callback router instance
+callback_router = CallbackRouter()
+
+
+def setup_callback_router(dp: Dispatcher) -> None:
+    """Callback router middleware'ini dispatcher'a ekle (erken onaydan sonra)"""
+    dp.callback_query.outer_middleware(CallbackRouterMiddleware(callback_router))
+
+
+def get_callback_router_stats() -> Dict[str, Any]:
+    return callback_router.get_stats()
@@ -0,0 +1,174 @@
+"""
+⏪ Catch-up Modu - Restart sonrası biriken update'lerin ucuz işlenmesi
+Bot kapalıyken biriken grup mesajları tam pipeline'dan (DB yazımı,
+point, otomatik cevap, bildirim) geçirilmez:
+    • CATCHUP_MESSAGE_AGE'den eski sıradan grup mesajları kullanıcı/grup/gün
+      başına sayaca katlanır ve toplu olarak daily_stats'a yazılır
+    • Bu mesajlar için point, otomatik cevap ve bildirim gönderilmez
+    • Katlanamayan eski update'ler (komutlar, özel mesajlar) en alt
+      catch-up şeridinde çalışır - canlı trafik önce işlenir
+Katlama bellekte, await'siz yapılır; birikmiş kuyruk anında boşalır.
+Middleware FSMContextMiddleware'den önce çalışmalıdır - aksi halde her
+eski mesaj için Postgres'ten state okunur (bkz. setup_catch_up).
+"""
+
+import asyncio
+import logging
+from datetime import date, datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.enums import ContentType
+from aiogram.types import Message, TelegramObject, Update
+
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+# Katlanan sayaçlar bu aralıkla toplu yazılır (saniye)
+CATCHUP_FLUSH_INTERVAL = 5
+
+# Bellekte tutulacak maksimum sayaç - aşılırsa beklemeden yazılır
+MAX_CATCHUP_KEYS = 5000
+
+# Sayaca katlanabilen sıradan mesaj tipleri (servis mesajları hariç)
+FOLDABLE_CONTENT_TYPES = {
+    ContentType.TEXT, ContentType.PHOTO, ContentType.STICKER, ContentType.VIDEO,
+    ContentType.ANIMATION, ContentType.VOICE, ContentType.DOCUMENT,
+    ContentType.AUDIO, ContentType.VIDEO_NOTE,
+}
+
+
+def get_message_age(message: Message) -> float:
+    """Mesajın gönderilmesinden bu yana geçen süre (saniye)"""
+    sent_at = message.date
+    if sent_at.tzinfo is None:
+        sent_at = sent_at.replace(tzinfo=timezone.utc)
+    return (datetime.now(timezone.utc) - sent_at).total_seconds()
+
+
+def is_stale_message(message: Optional[Message]) -> bool:
+    """Mesaj catch-up eşiğinden eski mi"""
+    if message is None or message.date is None:
+        return False
+    return get_message_age(message) > get_config().CATCHUP_MESSAGE_AGE
+
+
+def is_foldable(message: Message) -> bool:
+    """Eski, sıradan, komut olmayan grup mesajı mı"""
+    if message.chat.type not in ("group", "supergroup"):
+        return False
+    if not message.from_user or message.from_user.is_bot:
+        return False
+    if message.content_type not in FOLDABLE_CONTENT_TYPES:
+        return False
+    text = message.text or ""
+    if text.startswith("/") or text.startswith("!"):
+        return False
+    return is_stale_message(message)
+
+
+class CatchUpAggregator:
+    """(user_id, chat_id, gün) -> mesaj sayısı; periyodik toplu yazım"""
+
+    def __init__(self):
+        self._counts: Dict[Tuple[int, int, date], int] = {}
+        self._users: Dict[int, Tuple[Optional[str], Optional[str], Optional[str]]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self.folded = 0
+        self.flushed = 0
+        self.skipped_groups = 0
+
+    def fold(self, message: Message) -> None:
+        user = message.from_user
+        # daily_stats günleri yerel saatle tutuluyor
+        key = (user.id, message.chat.id, message.date.astimezone().date())
+        self._counts[key] = self._counts.get(key, 0) + 1
+        self._users[user.id] = (user.username, user.first_name, user.last_name)
+        self.folded += 1
+
+        if len(self._counts) >= MAX_CATCHUP_KEYS:
+            asyncio.create_task(self.flush())
+        elif not self._flush_task or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while self._counts:
+            await asyncio.sleep(CATCHUP_FLUSH_INTERVAL)
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Sayaçları kayıtlı gruplar için daily_stats buffer'ına aktar"""
+        from database import is_group_registered, save_user_info
+        from handlers.message_monitor import buffer_daily_stats
+
+        if not self._counts:
+            return
+        counts, self._counts = self._counts, {}
+        users, self._users = self._users, {}
+
+        try:
+            registered: Dict[int, bool] = {}
+            for chat_id in {chat_id for _, chat_id, _ in counts}:
+                registered[chat_id] = await is_group_registered(chat_id)
+
+            # daily_stats users'a FK ile bağlı - önce kullanıcı satırları
+            for user_id in {user_id for user_id, chat_id, _ in counts if registered[chat_id]}:
+                await save_user_info(user_id, *users.get(user_id, (None, None, None)))
+
+            for (user_id, chat_id, day), count in counts.items():
+                if not registered[chat_id]:
+                    self.skipped_groups += count
+                    continue
+                buffer_daily_stats(user_id, chat_id, count=count, day=day)
+                self.flushed += count
+            logger.info(f"⏪ Catch-up sayaçları yazıldı - {len(counts)} kullanıcı/grup/gün, {sum(counts.values())} mesaj")
+        except Exception as e:
+            logger.error(f"❌ Catch-up flush hatası: {e}")
+            for key, count in counts.items():
+                self._counts[key] = self._counts.get(key, 0) + count
+            for user_id, info in users.items():
+                self._users.setdefault(user_id, info)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "folded": self.folded,
+            "flushed": self.flushed,
+            "skipped_unregistered": self.skipped_groups,
+            "pending_keys": len(self._counts),
+            "threshold_seconds": get_config().CATCHUP_MESSAGE_AGE,
+        }
+
+
+# Global aggregator instance
+catch_up_aggregator = CatchUpAggregator()
+
+
+class CatchUpMiddleware(BaseMiddleware):
+    """Update outer middleware - eski grup mesajlarını handler'a vermeden katlar"""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if isinstance(event, Update) and event.message is not None and is_foldable(event.message):
+            catch_up_aggregator.fold(event.message)
+            return UNHANDLED
+        return await handler(event, data)
+
+
+def setup_catch_up(dp: Dispatcher) -> None:
+    """
+    Update executor'dan önce eklenmeli - katlanan mesajlar kuyruğa girmez.
+    dp.fsm de bundan sonra eklenmeli (Dispatcher onu kurucuda kaydeder;
+    main.py önce çıkarıp executor'dan sonra tekrar ekler).
+    """
+    dp.update.outer_middleware(CatchUpMiddleware())
+    logger.info(f"⏪ Catch-up modu hazır - eşik: {get_config().CATCHUP_MESSAGE_AGE}s")
+
+
+def get_catch_up_stats() -> Dict[str, Any]:
+    return catch_up_aggregator.get_stats()
@@ -0,0 +1,338 @@
+"""
+💬 Konuşma Durumu Kaydı - Özel mesaj input akışları için tek tablo
+Her kullanıcının aktif input akışları (flow, step, payload) kaydı olarak
+burada tutulur. Özel mesaj geldiğinde tek sözlük araması ile kayıt
+bulunur ve akışın handler'ına gönderilir; modül modül dict taraması
+yapılmaz. Her akışın TTL'i vardır (son işlenen girdiden itibaren),
+süresi dolan kayıtlar temizlenir.
+
+Modüllerin mevcut state dict'leri FlowStateDict ile değiştirilir:
+dict'e yazma/silme otomatik olarak kayda yansır.
+
+Storage bağlanırsa (attach_storage) kayıtlar arka planda FSM storage'a
+yazılır ve restart sonrası geri yüklenir.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from aiogram.types import Message
+
+logger = logging.getLogger(__name__)
+
+# TTL verilmeyen akışlar için varsayılan (saniye)
+DEFAULT_FLOW_TTL = 1800  # 30 dakika
+
+# Handler False döndürürse mesaj işlenmemiş sayılır
+FlowHandler = Callable[[Message], Awaitable[Optional[bool]]]
+
+
+@dataclass
+class ConversationRecord:
+    """Kullanıcının tek bir akıştaki durumu"""
+    flow: str
+    step: Optional[str] = None
+    payload: Any = None
+    expires_at: float = 0.0
+    updated_at: float = field(default_factory=time.monotonic)
+
+    def get_step(self) -> Optional[str]:
+        """Açık step yoksa payload'dan oku (dict'ler yerinde güncellenir)"""
+        return self.step if self.step is not None else _step_of(self.payload)
+
+
+@dataclass
+class FlowSpec:
+    """Akış tanımı - öncelik düşük olan önce işlenir"""
+    name: str
+    priority: int
+    ttl: int = DEFAULT_FLOW_TTL
+    handler: Optional[FlowHandler] = None
+    on_expire: Optional[Callable[[int], None]] = None
+    # Restart sonrası kayıt geri yüklenince çağrılır (modül state'ini doldurur)
+    on_restore: Optional[Callable[[int, ConversationRecord], None]] = None
+
+
+class ConversationStateRegistry:
+    """user_id -> {flow: ConversationRecord} kaydı ve flow -> handler tablosu"""
+
+    def __init__(self):
+        self._states: Dict[int, Dict[str, ConversationRecord]] = {}
+        self._flows: Dict[str, FlowSpec] = {}
+        # Kalıcılık - (user_id, flow) -> son kayıt (None = silindi)
+        self._storage = None
+        self._bot_id = 0
+        self._dirty: Dict[Tuple[int, str], Optional[ConversationRecord]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    # ---------------- akış tanımları ----------------
+
+    def define_flow(
+        self,
+        name: str,
+        ttl: int = DEFAULT_FLOW_TTL,
+        on_expire: Optional[Callable[[int], None]] = None,
+        on_restore: Optional[Callable[[int, ConversationRecord], None]] = None
+    ) -> FlowSpec:
+        """Akışı tanımla (state sahibi modül tarafından, handler'sız)"""
+        spec = self._flows.get(name)
+        if spec is None:
+            spec = FlowSpec(name=name, priority=len(self._flows), ttl=ttl)
+            self._flows[name] = spec
+        else:
+            spec.ttl = ttl
+        if on_expire:
+            spec.on_expire = on_expire
+        if on_restore:
+            spec.on_restore = on_restore
+        return spec
+
+    def register_handlers(self, routes: List[tuple]) -> None:
+        """
+        Dispatch tablosunu kur: [(flow, handler), ...]
+        Liste sırası önceliktir - kullanıcı birden fazla akıştaysa ilki işlenir.
+        """
+        for priority, (name, handler) in enumerate(routes):
+            spec = self._flows.get(name) or self.define_flow(name)
+            spec.handler = handler
+            spec.priority = priority
+
+    # ---------------- durum işlemleri ----------------
+
+    def set_state(self, user_id: int, flow: str, step: Optional[str] = None, payload: Any = None) -> ConversationRecord:
+        spec = self._flows.get(flow) or self.define_flow(flow)
+        now = time.monotonic()
+        record = ConversationRecord(flow=flow, step=step, payload=payload, expires_at=now + spec.ttl, updated_at=now)
+        self._states.setdefault(user_id, {})[flow] = record
+        self._mark_dirty(user_id, flow, record)
+        return record
+
+    def clear_state(self, user_id: int, flow: Optional[str] = None) -> None:
+        """Kullanıcının tek akışını ya da tüm akışlarını temizle"""
+        flows = self._states.get(user_id)
+        if not flows:
+            return
+        cleared = list(flows.keys()) if flow is None else [flow] if flow in flows else []
+        for name in cleared:
+            flows.pop(name, None)
+            self._mark_dirty(user_id, name, None)
+        if not flows:
+            self._states.pop(user_id, None)
+
+    def get_state(self, user_id: int, flow: Optional[str] = None) -> Optional[ConversationRecord]:
+        """Aktif kayıt - flow verilmezse en yüksek öncelikli akış"""
+        flows = self._states.get(user_id)
+        if not flows:
+            return None
+
+        now = time.monotonic()
+        best = None
+        for name in list(flows.keys()):
+            record = flows[name]
+            if record.expires_at <= now:
+                self._expire(user_id, record)
+                continue
+            if flow is not None:
+                if name == flow:
+                    return record
+                continue
+            if best is None or self._priority(name) < self._priority(best.flow):
+                best = record
+        return best
+
+    def _priority(self, flow: str) -> int:
+        spec = self._flows.get(flow)
+        return spec.priority if spec else len(self._flows)
+
+    def _expire(self, user_id: int, record: ConversationRecord) -> None:
+        self.clear_state(user_id, record.flow)
+        spec = self._flows.get(record.flow)
+        if spec and spec.on_expire:
+            try:
+                spec.on_expire(user_id)
+            except Exception as e:
+                logger.error(f"❌ Akış expire hatası ({record.flow}, User: {user_id}): {e}")
+        logger.info(f"⌛ Konuşma durumu süresi doldu - User: {user_id}, Flow: {record.flow}")
+
+    def cleanup_expired(self) -> int:
+        """Süresi dolan tüm kayıtları temizle"""
+        now = time.monotonic()
+        expired = [
+            (user_id, record)
+            for user_id, flows in self._states.items()
+            for record in flows.values()
+            if record.expires_at <= now
+        ]
+        for user_id, record in expired:
+            self._expire(user_id, record)
+        return len(expired)
+
+    # ---------------- dispatch ----------------
+
+    async def dispatch(self, message: Message) -> bool:
+        """Mesajı kullanıcının aktif akışına gönder; işlendiyse True"""
+        user_id = message.from_user.id
+        flows = self._states.get(user_id)
+        if not flows:
+            return False
+
+        # Kullanıcı genelde tek akıştadır; handler'ı olmayan ya da mesajı
+        # işlemeyen (False dönen) akış sıradakine bırakır
+        for name in sorted(flows.keys(), key=self._priority):
+            record = self.get_state(user_id, name)
+            spec = self._flows.get(name)
+            if not record or not spec or not spec.handler:
+                continue
+            handled = await spec.handler(message)
+            # Handler payload'ı yerinde değiştirmiş olabilir - güncel halini yaz
+            current = self._states.get(user_id, {}).get(name)
+            if current:
+                if handled is not False:
+                    # TTL son girdiden sayılır - uzun sihirbazlar ortasında düşmesin
+                    now = time.monotonic()
+                    current.expires_at = now + spec.ttl
+                    current.updated_at = now
+                self._mark_dirty(user_id, name, current)
+            if handled is not False:
+                return True
+        return False
+
+    # ---------------- kalıcılık ----------------
+
+    async def attach_storage(self, storage, bot_id: int) -> int:
+        """
+        FSM storage'ı bağla ve kayıtlı akışları geri yükle.
+        Storage `set_record` ve `load_destiny` sağlamalıdır (utils.fsm_storage).
+        """
+        self._storage = storage
+        self._bot_id = bot_id
+        restored = 0
+        now = time.monotonic()
+        for spec in list(self._flows.values()):
+            for user_id, step, data, remaining in await storage.load_destiny(self._destiny(spec.name)):
+                record = ConversationRecord(
+                    flow=spec.name, step=step, payload=data.get('payload'),
+                    expires_at=now + min(remaining, spec.ttl), updated_at=now
+                )
+                self._states.setdefault(user_id, {})[spec.name] = record
+                if spec.on_restore:
+                    try:
+                        spec.on_restore(user_id, record)
+                    except Exception as e:
+                        logger.error(f"❌ Akış geri yükleme hatası ({spec.name}, User: {user_id}): {e}")
+                restored += 1
+        if restored:
+            logger.info(f"♻️ {restored} konuşma durumu geri yüklendi")
+        return restored
+
+    def _destiny(self, flow: str) -> str:
+        return f"flow:{flow}"
+
+    def _mark_dirty(self, user_id: int, flow: str, record: Optional[ConversationRecord]) -> None:
+        if self._storage is None:
+            return
+        self._dirty[(user_id, flow)] = record
+        if self._flush_task and not self._flush_task.done():
+            return
+        try:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+        except RuntimeError:
+            # Event loop yok - bir sonraki değişiklikte yazılır
+            pass
+
+    async def _flush_loop(self) -> None:
+        """Biriken değişiklikleri storage'a yaz (aynı anahtarın sadece son hali)"""
+        from aiogram.fsm.storage.base import StorageKey
+
+        while self._dirty:
+            batch, self._dirty = self._dirty, {}
+            for (user_id, flow), record in batch.items():
+                key = StorageKey(bot_id=self._bot_id, chat_id=user_id, user_id=user_id, destiny=self._destiny(flow))
+                if record is None:
+                    await self._storage.set_record(key, None, {})
+                    continue
+                try:
+                    data = json.loads(json.dumps({'payload': record.payload}, ensure_ascii=False))
+                except (TypeError, ValueError):
+                    logger.debug(f"Akış payload'ı JSON değil, kalıcı yazılmadı ({flow}, User: {user_id})")
+                    continue
+                await self._storage.set_record(key, record.step, data)
+
+    async def flush(self) -> None:
+        """Bekleyen yazmaları bitir (kapanışta)"""
+        if self._flush_task and not self._flush_task.done():
+            await self._flush_task
+        elif self._dirty and self._storage is not None:
+            await self._flush_loop()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Akış başına aktif kullanıcı sayısı"""
+        stats: Dict[str, int] = {}
+        for flows in self._states.values():
+            for name in flows:
+                stats[name] = stats.get(name, 0) + 1
+        return stats
+
+
+# Global registry instance
+conversation_state_registry = ConversationStateRegistry()
+
+
+def _step_of(value: Any) -> Optional[str]:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        step = value.get('step') or value.get('action')
+        return str(step) if step is not None else None
+    return None
+
+
+class FlowStateDict(dict):
+    """
+    Kayda yansıyan state dict'i.
+    Modüller eskisi gibi `states[user_id] = ...` / `del states[user_id]` kullanır;
+    TTL dolunca kayıt buradan da silinir.
+    """
+
+    def __init__(self, flow: str, ttl: int = DEFAULT_FLOW_TTL, registry: ConversationStateRegistry = conversation_state_registry):
+        super().__init__()
+        self.flow = flow
+        self.registry = registry
+        registry.define_flow(flow, ttl=ttl, on_expire=self._on_expire, on_restore=self._on_restore)
+
+    def _on_expire(self, user_id: int) -> None:
+        super().pop(user_id, None)
+
+    def _on_restore(self, user_id: int, record: ConversationRecord) -> None:
+        super().__setitem__(user_id, record.payload)
+
+    def __setitem__(self, user_id, value) -> None:
+        super().__setitem__(user_id, value)
+        self.registry.set_state(user_id, self.flow, payload=value)
+
+    def __delitem__(self, user_id) -> None:
+        super().__delitem__(user_id)
+        self.registry.clear_state(user_id, self.flow)
+
+    def pop(self, user_id, *default):
+        value = super().pop(user_id, *default)
+        self.registry.clear_state(user_id, self.flow)
+        return value
+
+    def setdefault(self, user_id, default=None):
+        if user_id not in self:
+            self[user_id] = default
+        return self[user_id]
+
+    def update(self, *args, **kwargs) -> None:
+        for user_id, value in dict(*args, **kwargs).items():
+            self[user_id] = value
+
+    def clear(self) -> None:
+        for user_id in list(self.keys()):
+            self.registry.clear_state(user_id, self.flow)
+        super().clear()
@@ -1,133 +1,290 @@
 """
-⏱️ Cooldown Manager - Bot Mesaj Kısıtlamaları
+⏱️ Cooldown Manager - Hashed timer wheel tabanlı tek cooldown servisi
+Tüm cooldown'lar (sohbet cevabı, kayıt hatırlatma, teşvik, flood) tek
+bir CooldownWheel'de, isim alanı (namespace) + anahtar ile tutulur:
+    • Kayıt ve iptal O(1): sözlük + slot kümesi
+    • Tek tick task'ı - sadece bekleyen kayıt varken çalışır, süresi
+      dolanları siler (ve varsa on_expire çağırır)
+    • Uzun süreler slot turu (round) ile çözülür, tick başına sadece
+      o slot taranır
+    • Kayıt sayısı MAX_COOLDOWN_ENTRIES ile sınırlı - aşılırsa en eski
+      kayıt atılır
+is_active / remaining kesin bitiş zamanına bakar; tick sadece temizlik yapar.
+
+Tekerlek process içidir. Çoklu worker modunda update'ler kullanıcıya göre
+dağıtıldığından kullanıcı bazlı kayıtlar doğrudur; bot geneli sohbet
+cevabı cooldown'u ise ayrıca Postgres'teki shared_cooldowns kaydıyla
+alınır (yoksa her worker 30 saniyede bir cevap verirdi).
 """
 
 import asyncio
-import time
+import logging
+import os
 import random
-from datetime import datetime, timedelta
-from typing import Dict, Optional
-from collections import defaultdict
+import socket
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Tekerlek ayarları - 512 slot x 1 saniye, daha uzun süreler tur sayar
+WHEEL_SLOTS = 512
+WHEEL_TICK = 1.0
+
+# Bellekteki maksimum cooldown kaydı
+MAX_COOLDOWN_ENTRIES = 100_000
+
+_TimerKey = Tuple[str, Hashable]
+
+
+class _Timer:
+    __slots__ = ("expires_at", "expire_tick", "value", "on_expire")
+
+    def __init__(self, expires_at: float, expire_tick: int, value: Any, on_expire: Optional[Callable]):
+        self.expires_at = expires_at
+        self.expire_tick = expire_tick
+        self.value = value
+        self.on_expire = on_expire
+
+
+class CooldownWheel:
+    """(namespace, key) -> bitiş zamanı; hashed timer wheel ile süre dolumu"""
+
+    def __init__(self, slots: int = WHEEL_SLOTS, tick: float = WHEEL_TICK, max_entries: int = MAX_COOLDOWN_ENTRIES):
+        self.slot_count = slots
+        self.tick = tick
+        self.max_entries = max_entries
+        self._slots: List[Set[_TimerKey]] = [set() for _ in range(slots)]
+        self._timers: Dict[_TimerKey, _Timer] = {}
+        self._origin = time.monotonic()
+        self._current_tick = 0
+        self._task: Optional[asyncio.Task] = None
+        self.expired = 0
+        self.evicted = 0
+
+    def _tick_of(self, moment: float) -> int:
+        return int((moment - self._origin) / self.tick)
+
+    # ---------------- kayıt ----------------
+
+    def start(self, namespace: str, key: Hashable, seconds: float, value: Any = None,
+              on_expire: Optional[Callable[[Hashable, Any], None]] = None) -> None:
+        """Cooldown başlat (varsa yeniden başlat)"""
+        timer_key = (namespace, key)
+        self._remove(timer_key)
+
+        now = time.monotonic()
+        expires_at = now + seconds
+        # Tick bitişten sonra düşsün - erken silinmesin
+        expire_tick = max(self._tick_of(expires_at) + 1, self._current_tick + 1)
+        self._timers[timer_key] = _Timer(expires_at, expire_tick, value, on_expire)
+        self._slots[expire_tick % self.slot_count].add(timer_key)
+
+        if len(self._timers) > self.max_entries:
+            # Sözlük ekleme sırasında - ilk kayıt en eski başlatılan
+            oldest = next(iter(self._timers))
+            self._remove(oldest)
+            self.evicted += 1
+
+        self._ensure_task()
+
+    def try_acquire(self, namespace: str, key: Hashable, seconds: float, value: Any = None) -> bool:
+        """Cooldown yoksa başlat ve True dön; aktifse False"""
+        if self.is_active(namespace, key):
+            return False
+        self.start(namespace, key, seconds, value)
+        return True
+
+    def cancel(self, namespace: str, key: Hashable) -> bool:
+        """Cooldown'u kaldır (on_expire çağrılmaz)"""
+        return self._remove((namespace, key)) is not None
+
+    def _remove(self, timer_key: _TimerKey) -> Optional[_Timer]:
+        timer = self._timers.pop(timer_key, None)
+        if timer is not None:
+            self._slots[timer.expire_tick % self.slot_count].discard(timer_key)
+        return timer
+
+    # ---------------- sorgu ----------------
+
+    def _get(self, namespace: str, key: Hashable) -> Optional[_Timer]:
+        timer = self._timers.get((namespace, key))
+        if timer is None or timer.expires_at <= time.monotonic():
+            return None
+        return timer
+
+    def is_active(self, namespace: str, key: Hashable) -> bool:
+        return self._get(namespace, key) is not None
+
+    def remaining(self, namespace: str, key: Hashable) -> float:
+        """Kalan süre (saniye) - cooldown yoksa 0"""
+        timer = self._get(namespace, key)
+        return max(0.0, timer.expires_at - time.monotonic()) if timer else 0.0
+
+    def get_value(self, namespace: str, key: Hashable, default: Any = None) -> Any:
+        """Aktif cooldown'a bağlı değer (sayaç vb.)"""
+        timer = self._get(namespace, key)
+        return timer.value if timer else default
+
+    # ---------------- tick ----------------
+
+    def _ensure_task(self) -> None:
+        if self._task and not self._task.done():
+            return
+        try:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        except RuntimeError:
+            # Event loop yok (import/test) - sorgular yine kesin, temizlik sonra
+            self._task = None
+
+    async def _run(self) -> None:
+        try:
+            while self._timers:
+                await asyncio.sleep(self.tick)
+                self.advance()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Cooldown tekerleği hatası: {e}")
+
+    def advance(self, now: Optional[float] = None) -> int:
+        """Geçen tick'lerin slotlarını işle - süresi dolanları sil"""
+        now = time.monotonic() if now is None else now
+        target_tick = self._tick_of(now)
+        # Uzun bir duraklamadan sonra en fazla bir tur taramak yeterli
+        first_tick = max(self._current_tick + 1, target_tick - self.slot_count + 1)
+        expired = 0
+        for tick in range(first_tick, target_tick + 1):
+            slot = self._slots[tick % self.slot_count]
+            if not slot:
+                continue
+            for timer_key in [k for k in slot if self._timers[k].expire_tick <= target_tick]:
+                timer = self._remove(timer_key)
+                expired += 1
+                if timer.on_expire:
+                    try:
+                        timer.on_expire(timer_key[1], timer.value)
+                    except Exception as e:
+                        logger.error(f"❌ Cooldown on_expire hatası ({timer_key[0]}): {e}")
+        self._current_tick = max(self._current_tick, target_tick)
+        self.expired += expired
+        return expired
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        namespaces: Dict[str, int] = {}
+        for namespace, _ in self._timers:
+            namespaces[namespace] = namespaces.get(namespace, 0) + 1
+        return {
+            "entries": len(self._timers),
+            "namespaces": namespaces,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
+
+
+# Global cooldown servisi
+cooldowns = CooldownWheel()
+
 
 class CooldownManager:
-    """Bot mesaj cooldown yöneticisi"""
-    
-    def __init__(self):
-        # Kullanıcı bazlı cooldown'lar
-        self.user_last_message: Dict[int, datetime] = {}
-        self.user_message_count: Dict[int, int] = defaultdict(int)
-        
-        # Global cooldown
-        self.last_bot_message: Optional[datetime] = None
-        self.global_cooldown = 60  # 1 dakika minimum
-        
+    """Bot sohbet cevabı cooldown'ları - kayıtlar cooldowns tekerleğinde"""
+
+    def __init__(self, wheel: CooldownWheel = cooldowns):
+        self.wheel = wheel
+
+        # Global cooldown - herhangi bir cevaptan sonra
+        self.global_cooldown = 30  # 30 saniye minimum
+
         # Ayarlar
         self.min_cooldown = 60  # 1 dakika minimum (daha seçici)
         self.max_cooldown = 120  # 2 dakika maksimum (daha seçici)
         self.response_probability = 0.3  # %30 ihtimalle cevap ver (daha seçici)
         self.max_consecutive_messages = 1  # Aynı kişiye maksimum 1 mesaj (daha seçici)
-        
+        self.count_window = 300  # Mesaj sayısı 5 dakika sonra sıfırlanır
+
+        # Çoklu worker modunda global cooldown'un DB'deki sahibi
+        self.holder = f"{socket.gethostname()}:{os.getpid()}"
+
     async def can_respond_to_user(self, user_id: int) -> bool:
         """Kullanıcıya cevap verilebilir mi kontrol et"""
         try:
-            now = datetime.now()
-            
-            # Kullanıcının son mesaj zamanını kontrol et
-            if user_id in self.user_last_message:
-                time_diff = (now - self.user_last_message[user_id]).total_seconds()
-                
-                # Minimum cooldown kontrolü
-                if time_diff < self.min_cooldown:
-                    return False
-                    
-                # Maksimum cooldown kontrolü
-                if time_diff < self.max_cooldown:
-                    # Rastgele cooldown (1-2 dakika arası)
-                    random_cooldown = random.randint(self.min_cooldown, self.max_cooldown)
-                    if time_diff < random_cooldown:
-                        return False
-            
+            # Kullanıcı cooldown'u (cevap anında 1-2 dakika arası rastgele seçildi)
+            if self.wheel.is_active("chat_reply", user_id):
+                return False
+
             # Global cooldown kontrolü
-            if self.last_bot_message:
-                global_time_diff = (now - self.last_bot_message).total_seconds()
-                if global_time_diff < 30:  # Global 30 saniye minimum (daha seçici)
-                    return False
-            
+            if self.wheel.is_active("chat_reply_global", None):
+                return False
+
             # Response probability kontrolü
             if random.random() > self.response_probability:
                 return False
-                
+
             # Kullanıcının mesaj sayısı kontrolü
-            if self.user_message_count[user_id] >= self.max_consecutive_messages:
+            if self.wheel.get_value("chat_reply_count", user_id, 0) >= self.max_consecutive_messages:
                 return False
-                
+
+            # Diğer worker'lar da cevap veriyor - global cooldown'u DB'de al (en son, sadece adaylar için)
+            from utils.update_sharding import get_worker_index
+            if get_worker_index() is not None:
+                from database import try_acquire_shared_cooldown
+                return await try_acquire_shared_cooldown("chat_reply_global", self.holder, self.global_cooldown)
+
             return True
-            
+
         except Exception as e:
-            print(f"❌ Cooldown kontrol hatası: {e}")
+            logger.error(f"❌ Cooldown kontrol hatası: {e}")
             return False
-    
+
     async def record_user_message(self, user_id: int):
-        """Kullanıcı mesajını kaydet"""
+        """Kullanıcıya verilen cevabı kaydet"""
         try:
-            now = datetime.now()
-            self.user_last_message[user_id] = now
-            self.user_message_count[user_id] += 1
-            self.last_bot_message = now
-            
-            # 5 dakika sonra mesaj sayısını sıfırla
-            asyncio.create_task(self._reset_user_count(user_id))
-            
-        except Exception as e:
-            print(f"❌ Mesaj kayıt hatası: {e}")
-    
-    async def _reset_user_count(self, user_id: int):
-        """Kullanıcı mesaj sayısını sıfırla"""
-        try:
-            await asyncio.sleep(300)  # 5 dakika bekle
-            self.user_message_count[user_id] = 0
+            self.wheel.start("chat_reply", user_id, random.randint(self.min_cooldown, self.max_cooldown))
+            self.wheel.start("chat_reply_global", None, self.global_cooldown)
+
+            # Sayaç kaydın değeri - pencere dolunca kayıtla birlikte silinir
+            count = self.wheel.get_value("chat_reply_count", user_id, 0)
+            self.wheel.start("chat_reply_count", user_id, self.count_window, value=count + 1)
+
         except Exception as e:
-            print(f"❌ Mesaj sayısı sıfırlama hatası: {e}")
-    
+            logger.error(f"❌ Mesaj kayıt hatası: {e}")
+
     async def check_user_registration(self, user_id: int) -> bool:
         """Kullanıcı kayıt durumunu kontrol et"""
         try:
             from database import is_user_registered
             return await is_user_registered(user_id)
         except Exception as e:
-            print(f"❌ Kayıt kontrol hatası: {e}")
+            logger.error(f"❌ Kayıt kontrol hatası: {e}")
             return False
-    
+
     async def should_redirect_to_registration(self, user_id: int) -> bool:
         """Kullanıcıyı kayıta yönlendir mi kontrol et"""
         try:
             is_registered = await self.check_user_registration(user_id)
             return not is_registered
         except Exception as e:
-            print(f"❌ Kayıt yönlendirme hatası: {e}")
+            logger.error(f"❌ Kayıt yönlendirme hatası: {e}")
             return True
-    
+
     def get_cooldown_status(self, user_id: int) -> Dict:
         """Cooldown durumunu getir"""
         try:
-            now = datetime.now()
-            last_message = self.user_last_message.get(user_id)
-            
-            if last_message:
-                time_diff = (now - last_message).total_seconds()
-                remaining = max(0, self.min_cooldown - time_diff)
-            else:
-                remaining = 0
-                
+            remaining = self.wheel.remaining("chat_reply", user_id)
             return {
                 "can_respond": remaining <= 0,
                 "remaining_seconds": remaining,
-                "message_count": self.user_message_count[user_id],
+                "message_count": self.wheel.get_value("chat_reply_count", user_id, 0),
                 "is_registered": True  # Bu değer ayrıca kontrol edilmeli
             }
         except Exception as e:
-            print(f"❌ Cooldown durum hatası: {e}")
+            logger.error(f"❌ Cooldown durum hatası: {e}")
             return {"can_respond": False, "remaining_seconds": 0, "message_count": 0, "is_registered": False}
 
 # Global cooldown manager instance
-cooldown_manager = CooldownManager()
\ No newline at end of file
+cooldown_manager = CooldownManager()
@@ -0,0 +1,286 @@
+"""
+⏳ Gecikmeli Aksiyon Zamanlayıcısı - Tek Sleeper Task
+Mesaj başına asyncio.sleep task'ı açmak yerine tüm gecikmeli işleri
+(mesaj silme, hatırlatma gönderme) bir timer heap'inde tutar ve tek
+bir task ile çalıştırır. Aksiyonlar delayed_actions tablosuna yazılır,
+böylece restart sonrası bekleyen işler kaybolmaz: tablodakileri sadece
+lider instance yükler (replay_pending) ve vadesi gelen kalıcı aksiyon
+çalıştırılmadan önce tablodan silinerek sahiplenilir - iki instance
+aynı aksiyonu çalıştırmaz.
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from aiogram import Bot
+
+logger = logging.getLogger(__name__)
+
+# Aksiyon tipleri
+ACTION_DELETE_MESSAGE = "delete_message"
+ACTION_SEND_MESSAGE = "send_message"
+
+# (bot, payload listesi) -> None
+ActionHandler = Callable[[Bot, List[Dict[str, Any]]], Awaitable[None]]
+
+# Heap elemanı: (due_ts, seq, db_id, action_type, payload)
+HeapItem = Tuple[float, int, Optional[int], str, Dict[str, Any]]
+
+
+async def _handle_delete_messages(bot: Bot, payloads: List[Dict[str, Any]]) -> None:
+    """Aynı anda vadesi gelen silmeleri chat bazında tek deleteMessages çağrısına topla"""
+    from utils.message_deletion import message_deletion_service
+
+    by_chat: Dict[int, List[int]] = defaultdict(list)
+    for payload in payloads:
+        by_chat[payload["chat_id"]].append(payload["message_id"])
+
+    for chat_id, message_ids in by_chat.items():
+        await message_deletion_service.delete_messages(bot, chat_id, message_ids)
+
+
+async def _handle_send_messages(bot: Bot, payloads: List[Dict[str, Any]]) -> None:
+    """Zamanı gelen hatırlatma mesajlarını gönder"""
+    for payload in payloads:
+        try:
+            await bot.send_message(
+                payload["chat_id"],
+                payload["text"],
+                parse_mode=payload.get("parse_mode")
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Zamanlanmış mesaj gönderilemedi (Chat: {payload.get('chat_id')}): {e}")
+
+
+class DelayedActionScheduler:
+    """Timer heap + tek sleeper task ile gecikmeli aksiyon yöneticisi"""
+
+    def __init__(self):
+        self._heap: List[HeapItem] = []
+        self._seq = itertools.count()
+        self._handlers: Dict[str, ActionHandler] = {
+            ACTION_DELETE_MESSAGE: _handle_delete_messages,
+            ACTION_SEND_MESSAGE: _handle_send_messages,
+        }
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._bot: Optional[Bot] = None
+
+    def register_handler(self, action_type: str, handler: ActionHandler) -> None:
+        """Yeni aksiyon tipi için handler kaydet"""
+        self._handlers[action_type] = handler
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._heap)
+
+    async def schedule(
+        self,
+        action_type: str,
+        payload: Dict[str, Any],
+        delay: Optional[float] = None,
+        run_at: Optional[datetime] = None,
+        persist: bool = True
+    ) -> None:
+        """Aksiyonu `delay` saniye sonra (veya `run_at` zamanında) çalışacak şekilde kuyruğa ekle"""
+        if action_type not in self._handlers:
+            logger.error(f"❌ Bilinmeyen aksiyon tipi: {action_type}")
+            return
+
+        due_ts = run_at.timestamp() if run_at else time.time() + (delay or 0)
+
+        db_id = None
+        if persist:
+            db_id = await self._persist(action_type, payload, due_ts)
+
+        self._push(due_ts, db_id, action_type, payload)
+
+    def _push(self, due_ts: float, db_id: Optional[int], action_type: str, payload: Dict[str, Any]) -> None:
+        earliest = self._heap[0][0] if self._heap else None
+        heapq.heappush(self._heap, (due_ts, next(self._seq), db_id, action_type, payload))
+        # Yeni eleman en erken vadeliyse sleeper'ı uyandır
+        if earliest is None or due_ts < earliest:
+            self._wakeup.set()
+
+    async def _persist(self, action_type: str, payload: Dict[str, Any], due_ts: float) -> Optional[int]:
+        """Aksiyonu delayed_actions tablosuna yaz"""
+        try:
+            from database import get_db_pool
+            pool = await get_db_pool()
+            if not pool:
+                return None
+            async with pool.acquire() as conn:
+                return await conn.fetchval(
+                    """
+                    INSERT INTO delayed_actions (action_type, payload, due_at)
+                    VALUES ($1, $2::jsonb, $3)
+                    RETURNING id
+                    """,
+                    action_type, json.dumps(payload), datetime.fromtimestamp(due_ts)
+                )
+        except Exception as e:
+            logger.warning(f"⚠️ Gecikmeli aksiyon kaydedilemedi, sadece bellekte tutulacak: {e}")
+            return None
+
+    async def _claim_persisted(self, db_ids: List[int]) -> Optional[Set[int]]:
+        """Vadesi gelen aksiyonları tablodan silerek sahiplen - başka instance aynısını çalıştırmaz.
+        DB'ye ulaşılamazsa None (hepsi yerelde çalıştırılır)"""
+        if not db_ids:
+            return set()
+        try:
+            from database import get_db_pool
+            pool = await get_db_pool()
+            if not pool:
+                return None
+            async with pool.acquire() as conn:
+                rows = await conn.fetch(
+                    "DELETE FROM delayed_actions WHERE id = ANY($1::bigint[]) RETURNING id", db_ids
+                )
+            return {row["id"] for row in rows}
+        except Exception as e:
+            logger.warning(f"⚠️ Gecikmeli aksiyonlar sahiplenilemedi: {e}")
+            return None
+
+    async def _load_pending(self) -> List[int]:
+        """Tablodaki bekleyen aksiyonları heap'e yükle (heap'te olanlar atlanır) - yüklenen id'ler"""
+        try:
+            from database import get_db_pool
+            pool = await get_db_pool()
+            if not pool:
+                return []
+            async with pool.acquire() as conn:
+                rows = await conn.fetch("SELECT id, action_type, payload, due_at FROM delayed_actions")
+        except Exception as e:
+            logger.warning(f"⚠️ Bekleyen aksiyonlar yüklenemedi: {e}")
+            return []
+
+        known = {item[2] for item in self._heap if item[2] is not None}
+        loaded = []
+        for row in rows:
+            if row["id"] in known:
+                continue
+            payload = row["payload"]
+            if isinstance(payload, str):
+                payload = json.loads(payload)
+            self._push(row["due_at"].timestamp(), row["id"], row["action_type"], payload)
+            loaded.append(row["id"])
+        return loaded
+
+    def _drop(self, db_ids: Set[int]) -> None:
+        """Verilen kalıcı aksiyonları heap'ten çıkar (tabloda kalırlar)"""
+        self._heap = [item for item in self._heap if item[2] not in db_ids]
+        heapq.heapify(self._heap)
+        self._wakeup.set()
+
+    async def replay_pending(self) -> None:
+        """
+        Lider işi: restart / ölen instance'lardan kalan aksiyonları yükler.
+        Liderlik kaybedilince (task iptali) henüz çalışmamış olanları bırakır,
+        yeni lider tablodan tekrar yükler.
+        """
+        loaded = await self._load_pending()
+        if loaded:
+            logger.info(f"⏳ {len(loaded)} bekleyen gecikmeli aksiyon yüklendi")
+        try:
+            await asyncio.Future()
+        finally:
+            self._drop(set(loaded))
+
+    def _pop_due(self, now: float) -> List[HeapItem]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap))
+        return due
+
+    async def _run(self) -> None:
+        """Tek sleeper loop - en erken vadeye kadar uyur"""
+        while True:
+            try:
+                if self._heap:
+                    timeout = self._heap[0][0] - time.time()
+                else:
+                    timeout = None
+
+                if timeout is None or timeout > 0:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                due = self._pop_due(time.time())
+                claimed = await self._claim_persisted([item[2] for item in due if item[2] is not None])
+                if claimed is not None:
+                    # Başka instance'ın zaten çalıştırdığı (tablodan silinmiş) aksiyonları atla
+                    due = [item for item in due if item[2] is None or item[2] in claimed]
+                by_type: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+                for _, _, _, action_type, payload in due:
+                    by_type[action_type].append(payload)
+
+                for action_type, payloads in by_type.items():
+                    handler = self._handlers.get(action_type)
+                    if not handler:
+                        logger.warning(f"⚠️ Handler bulunamadı: {action_type}")
+                        continue
+                    try:
+                        await handler(self._bot, payloads)
+                    except Exception as e:
+                        logger.error(f"❌ Gecikmeli aksiyon hatası ({action_type}): {e}")
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Delayed action loop hatası: {e}")
+                await asyncio.sleep(1)
+
+    async def start(self, bot: Bot) -> None:
+        """Sleeper task'ı başlat - tablodaki bekleyenleri lider replay_pending ile yükler"""
+        self._bot = bot
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        """Sleeper task'ı durdur - kalıcı aksiyonlar tabloda kalır"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+# Global scheduler instance
+delayed_action_scheduler = DelayedActionScheduler()
+
+
+async def start_delayed_action_scheduler(bot: Bot) -> None:
+    """Delayed action scheduler'ı başlat"""
+    try:
+        await delayed_action_scheduler.start(bot)
+        logger.info("⏳ Delayed action scheduler başlatıldı!")
+    except Exception as e:
+        logger.error(f"❌ Delayed action scheduler başlatma hatası: {e}")
+
+
+async def schedule_message_deletion(chat_id: int, message_id: int, delay: float = 5) -> None:
+    """`delay` saniye sonra chat'teki mesajı sil"""
+    await delayed_action_scheduler.schedule(
+        ACTION_DELETE_MESSAGE,
+        {"chat_id": chat_id, "message_id": message_id},
+        delay=delay
+    )
+
+
+async def schedule_reminder(chat_id: int, text: str, run_at: datetime, parse_mode: Optional[str] = None) -> None:
+    """Belirtilen zamanda chat'e hatırlatma mesajı gönder"""
+    await delayed_action_scheduler.schedule(
+        ACTION_SEND_MESSAGE,
+        {"chat_id": chat_id, "text": text, "parse_mode": parse_mode},
+        run_at=run_at
+    )
@@ -0,0 +1,153 @@
+"""
+✏️ Edit Coalescer - Canlı mesaj güncellemelerini birleştirme
+Aynı mesaj için art arda gelen edit isteklerini (chat_id, message_id)
+bazında toplar, interval başına en fazla bir edit uygular ve sadece
+son durumu gönderir. İçerik değişmediyse edit atlanır.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.types import InlineKeyboardMarkup
+
+logger = logging.getLogger(__name__)
+
+# Aynı mesaj için iki edit arasındaki minimum süre (saniye)
+DEFAULT_EDIT_INTERVAL = 3.0
+
+# Son uygulanan içeriği tutulacak mesaj sayısı
+MAX_TRACKED_MESSAGES = 1000
+
+EditKey = Tuple[int, int]
+# Edit anında çağrılır, (text, reply_markup) döndürür
+RenderFunc = Callable[[], Awaitable[Tuple[str, Optional[InlineKeyboardMarkup]]]]
+
+
+@dataclass
+class PendingEdit:
+    """Bekleyen son edit durumu"""
+    bot: Bot
+    parse_mode: Optional[str]
+    text: Optional[str] = None
+    reply_markup: Optional[InlineKeyboardMarkup] = None
+    render: Optional[RenderFunc] = None
+
+
+def _markup_fingerprint(reply_markup: Optional[InlineKeyboardMarkup]) -> Optional[str]:
+    if reply_markup is None:
+        return None
+    try:
+        return reply_markup.model_dump_json(exclude_none=True)
+    except Exception:
+        return repr(reply_markup)
+
+
+class EditCoalescer:
+    """(chat_id, message_id) bazında debounce edilmiş edit yöneticisi"""
+
+    def __init__(self, interval: float = DEFAULT_EDIT_INTERVAL):
+        self.interval = interval
+        self._pending: Dict[EditKey, PendingEdit] = {}
+        self._timers: Dict[EditKey, asyncio.Task] = {}
+        self._last_edit_at: Dict[EditKey, float] = {}
+        # key -> (text, markup fingerprint) - LRU ile sınırlı
+        self._last_applied: "OrderedDict[EditKey, Tuple[str, Optional[str]]]" = OrderedDict()
+
+    async def request_edit(
+        self,
+        bot: Bot,
+        chat_id: int,
+        message_id: int,
+        text: Optional[str] = None,
+        reply_markup: Optional[InlineKeyboardMarkup] = None,
+        parse_mode: Optional[str] = None,
+        render: Optional[RenderFunc] = None
+    ) -> None:
+        """
+        Mesaj için yeni durumu bildir.
+        `render` verilirse içerik edit anında üretilir; böylece bir interval içindeki
+        onlarca istek için liste sadece bir kez oluşturulur.
+        """
+        key = (chat_id, message_id)
+        self._pending[key] = PendingEdit(
+            bot=bot,
+            parse_mode=parse_mode,
+            text=text,
+            reply_markup=reply_markup,
+            render=render
+        )
+
+        if key in self._timers:
+            # Zaten bekleyen flush var, son durum onunla uygulanacak
+            return
+
+        wait = self._wait_for(key)
+        if wait <= 0:
+            await self._flush(key)
+        else:
+            self._timers[key] = asyncio.create_task(self._flush_later(key, wait))
+
+    def _wait_for(self, key: EditKey) -> float:
+        return self.interval - (time.monotonic() - self._last_edit_at.get(key, 0.0))
+
+    async def _flush_later(self, key: EditKey, wait: float) -> None:
+        try:
+            await asyncio.sleep(wait)
+            await self._flush(key)
+        finally:
+            self._timers.pop(key, None)
+        # Edit sürerken gelen istek sadece _pending'i güncelledi - onun için yeni timer kur
+        if key in self._pending:
+            self._timers[key] = asyncio.create_task(self._flush_later(key, max(0.0, self._wait_for(key))))
+
+    async def _flush(self, key: EditKey) -> None:
+        pending = self._pending.pop(key, None)
+        if not pending:
+            return
+
+        chat_id, message_id = key
+        state = None
+        # İlk await'ten önce işaretle - render/edit sürerken gelen istekler
+        # inline flush başlatmaz, timer yoluna düşer
+        self._last_edit_at[key] = time.monotonic()
+        try:
+            if pending.render:
+                text, reply_markup = await pending.render()
+            else:
+                text, reply_markup = pending.text, pending.reply_markup
+
+            state = (text, _markup_fingerprint(reply_markup))
+            if self._last_applied.get(key) == state:
+                return
+
+            await pending.bot.edit_message_text(
+                text=text,
+                chat_id=chat_id,
+                message_id=message_id,
+                parse_mode=pending.parse_mode,
+                reply_markup=reply_markup
+            )
+            self._remember(key, state)
+
+        except Exception as e:
+            if "message is not modified" in str(e):
+                if state:
+                    self._remember(key, state)
+            else:
+                logger.error(f"❌ Coalesced edit hatası (Chat: {chat_id}, Mesaj: {message_id}): {e}")
+
+    def _remember(self, key: EditKey, state: Tuple[str, Optional[str]]) -> None:
+        self._last_applied[key] = state
+        self._last_applied.move_to_end(key)
+        while len(self._last_applied) > MAX_TRACKED_MESSAGES:
+            old_key, _ = self._last_applied.popitem(last=False)
+            self._last_edit_at.pop(old_key, None)
+
+
+# Global edit coalescer instance
+edit_coalescer = EditCoalescer()
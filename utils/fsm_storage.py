@@ -0,0 +1,216 @@
+"""
+🗄️ Postgres FSM Storage - Restart'a dayanıklı konuşma durumu
+aiogram BaseStorage implementasyonu. Durumlar UNLOGGED fsm_storage
+tablosunda tutulur (WAL yazılmaz, hızlı), okumalar process içi
+write-through cache'ten karşılanır. Her kaydın TTL'i vardır; süresi
+dolanlar okunmaz ve periyodik olarak silinir.
+
+Database yoksa storage sadece cache ile çalışır (MemoryStorage gibi).
+"""
+
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+
+from database import get_db_pool
+
+logger = logging.getLogger(__name__)
+
+# Kayıt ömrü (saniye) - son yazmadan itibaren
+FSM_STATE_TTL = 86400  # 24 saat
+
+# Cache girdisi bu süreden sonra DB'den tazelenir (başka process yazmış olabilir)
+FSM_CACHE_TTL = 60
+
+# Cache'te tutulacak maksimum anahtar
+MAX_CACHE_ENTRIES = 10000
+
+
+@dataclass
+class _CacheEntry:
+    state: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+    expires_at: float = 0.0    # kaydın kendi TTL'i
+    fresh_until: float = 0.0   # cache tazeleme sınırı
+
+
+def build_storage_key(key: StorageKey) -> str:
+    return f"{key.bot_id}:{key.chat_id}:{key.user_id}:{key.thread_id or ''}:{key.destiny}"
+
+
+class PostgresStorage(BaseStorage):
+    """UNLOGGED Postgres tablosu + write-through cache ile FSM storage"""
+
+    def __init__(self, state_ttl: int = FSM_STATE_TTL, cache_ttl: int = FSM_CACHE_TTL):
+        self.state_ttl = state_ttl
+        self.cache_ttl = cache_ttl
+        self._cache: Dict[str, _CacheEntry] = {}
+
+    # ---------------- aiogram BaseStorage ----------------
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        entry = await self._get_entry(key)
+        entry.state = state.state if isinstance(state, State) else state
+        await self._write(key, entry)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        entry = await self._get_entry(key)
+        return entry.state
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        entry = await self._get_entry(key)
+        entry.data = data.copy()
+        await self._write(key, entry)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        entry = await self._get_entry(key)
+        return entry.data.copy()
+
+    async def close(self) -> None:
+        # Pool database modülüne ait - sadece cache'i bırak
+        self._cache.clear()
+
+    # ---------------- dahili ----------------
+
+    async def _get_entry(self, key: StorageKey) -> _CacheEntry:
+        storage_key = build_storage_key(key)
+        now = time.monotonic()
+        entry = self._cache.get(storage_key)
+
+        if entry and entry.expires_at and entry.expires_at <= now:
+            entry = _CacheEntry()
+            self._cache[storage_key] = entry
+        if entry and entry.fresh_until > now:
+            return entry
+
+        loaded = await self._load(storage_key)
+        if loaded is not None:
+            entry = loaded
+        elif entry is None:
+            entry = _CacheEntry()
+        entry.fresh_until = now + self.cache_ttl
+        self._remember(storage_key, entry)
+        return entry
+
+    def _remember(self, storage_key: str, entry: _CacheEntry) -> None:
+        self._cache[storage_key] = entry
+        if len(self._cache) > MAX_CACHE_ENTRIES:
+            # En eski eklenen girdileri at - DB'de duruyorlar
+            for old_key in list(self._cache.keys())[:len(self._cache) - MAX_CACHE_ENTRIES]:
+                self._cache.pop(old_key, None)
+
+    async def _load(self, storage_key: str) -> Optional[_CacheEntry]:
+        pool = await get_db_pool()
+        if not pool:
+            return None
+        try:
+            async with pool.acquire() as conn:
+                row = await conn.fetchrow('''
+                    SELECT state, data, EXTRACT(EPOCH FROM (expires_at - NOW())) AS remaining
+                    FROM fsm_storage
+                    WHERE storage_key = $1 AND expires_at > NOW()
+                ''', storage_key)
+        except Exception as e:
+            logger.error(f"❌ FSM state okuma hatası ({storage_key}): {e}")
+            return None
+
+        if not row:
+            return _CacheEntry()
+        data = row['data']
+        if isinstance(data, str):
+            data = json.loads(data)
+        return _CacheEntry(
+            state=row['state'],
+            data=data or {},
+            expires_at=time.monotonic() + float(row['remaining'])
+        )
+
+    async def _write(self, key: StorageKey, entry: _CacheEntry) -> None:
+        storage_key = build_storage_key(key)
+        now = time.monotonic()
+        entry.expires_at = now + self.state_ttl
+        entry.fresh_until = now + self.cache_ttl
+        self._remember(storage_key, entry)
+
+        pool = await get_db_pool()
+        if not pool:
+            return
+        try:
+            async with pool.acquire() as conn:
+                if entry.state is None and not entry.data:
+                    await conn.execute('DELETE FROM fsm_storage WHERE storage_key = $1', storage_key)
+                    return
+                await conn.execute('''
+                    INSERT INTO fsm_storage (storage_key, destiny, user_id, state, data, updated_at, expires_at)
+                    VALUES ($1, $2, $3, $4, $5::jsonb, NOW(), NOW() + make_interval(secs => $6))
+                    ON CONFLICT (storage_key) DO UPDATE SET
+                        state = EXCLUDED.state,
+                        data = EXCLUDED.data,
+                        updated_at = NOW(),
+                        expires_at = EXCLUDED.expires_at
+                ''', storage_key, key.destiny, key.user_id, entry.state,
+                    json.dumps(entry.data, ensure_ascii=False),
+                    float(self.state_ttl))
+        except Exception as e:
+            logger.error(f"❌ FSM state yazma hatası ({storage_key}): {e}")
+
+    # ---------------- yardımcılar ----------------
+
+    async def set_record(self, key: StorageKey, state: Optional[str], data: Dict[str, Any]) -> None:
+        """State ve data'yı tek yazmada değiştir (okuma yapmadan)"""
+        await self._write(key, _CacheEntry(state=state, data=dict(data)))
+
+    async def load_destiny(self, destiny: str) -> List[Tuple[int, Optional[str], Dict[str, Any], float]]:
+        """Bir destiny'deki süresi dolmamış kayıtlar: (user_id, state, data, kalan saniye)"""
+        pool = await get_db_pool()
+        if not pool:
+            return []
+        try:
+            async with pool.acquire() as conn:
+                rows = await conn.fetch('''
+                    SELECT user_id, state, data, EXTRACT(EPOCH FROM (expires_at - NOW())) AS remaining
+                    FROM fsm_storage
+                    WHERE destiny = $1 AND expires_at > NOW()
+                ''', destiny)
+        except Exception as e:
+            logger.error(f"❌ FSM destiny yükleme hatası ({destiny}): {e}")
+            return []
+
+        records = []
+        for row in rows:
+            data = row['data']
+            if isinstance(data, str):
+                data = json.loads(data)
+            records.append((row['user_id'], row['state'], data or {}, float(row['remaining'])))
+        return records
+
+    async def cleanup_expired(self, purge_table: bool = True) -> int:
+        """Süresi dolan kayıtları cache'ten ve (purge_table ise) tablodan sil"""
+        now = time.monotonic()
+        for storage_key in [k for k, e in self._cache.items() if e.expires_at and e.expires_at <= now]:
+            self._cache.pop(storage_key, None)
+
+        if not purge_table:
+            return 0
+        pool = await get_db_pool()
+        if not pool:
+            return 0
+        try:
+            async with pool.acquire() as conn:
+                result = await conn.execute('DELETE FROM fsm_storage WHERE expires_at <= NOW()')
+            deleted = int(result.split()[-1]) if result else 0
+            if deleted:
+                logger.info(f"🧹 Süresi dolan {deleted} FSM kaydı silindi")
+            return deleted
+        except Exception as e:
+            logger.error(f"❌ FSM cleanup hatası: {e}")
+            return 0
+
+
+# Global storage instance - Dispatcher(storage=fsm_storage)
+fsm_storage = PostgresStorage()
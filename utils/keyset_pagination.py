@@ -0,0 +1,147 @@
+"""
+📄 Keyset Sayfalama - (created_at, id) imleciyle sayfa sayfa listeleme
+Sipariş / ürün / komut listeleri hepsini çekip dilimlemez, OFFSET de
+kullanmaz:
+    • Sayfa = "(sıralama sütunu, id) < imleç" koşuluyla tek indeksli aralık
+      taraması; tablo ne kadar büyürse büyüsün maliyet sayfa boyutu kadar
+    • Bir fazla satır çekilir - o yönde devam sayfası olup olmadığı ek
+      COUNT sorgusu olmadan anlaşılır
+    • İmleç callback data'ya sığacak kadar kısadır: yön + base36 zaman
+      damgası (mikrosaniye) + base36 id, örn. "n1b3kq9x2m8g.2s"
+Callback data biçimi: "<prefix>:<token>"; token'sız prefix ilk sayfadır.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, List, Optional, Sequence, Tuple
+
+from aiogram.types import InlineKeyboardButton
+
+logger = logging.getLogger(__name__)
+
+PAGE_TOKEN_SEPARATOR = ":"
+
+# Yönler - "n": daha eski kayıtlar (sonraki sayfa), "p": daha yeni kayıtlar (önceki sayfa)
+NEXT_PAGE = "n"
+PREV_PAGE = "p"
+
+# Zaman damgası timezone'lu ise token'ın sonuna eklenir (base36 rakamları küçük harf - karışmaz)
+_AWARE_MARK = "Z"
+
+_EPOCH = datetime(1970, 1, 1)
+_BASE36 = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def _to_base36(value: int) -> str:
+    if value == 0:
+        return "0"
+    sign = "-" if value < 0 else ""
+    value = abs(value)
+    digits = []
+    while value:
+        value, remainder = divmod(value, 36)
+        digits.append(_BASE36[remainder])
+    return sign + "".join(reversed(digits))
+
+
+def encode_cursor(direction: str, sort_value: datetime, row_id: int) -> str:
+    """Satırın (zaman, id) anahtarından kısa sayfa token'ı"""
+    aware = sort_value.tzinfo is not None
+    if aware:
+        sort_value = sort_value.astimezone(timezone.utc).replace(tzinfo=None)
+    delta = sort_value - _EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+    return f"{direction}{_to_base36(micros)}.{_to_base36(row_id)}{_AWARE_MARK if aware else ''}"
+
+
+def decode_cursor(token: str) -> Tuple[str, datetime, int]:
+    """Token -> (yön, zaman, id); bozuk token ValueError"""
+    direction, body = token[:1], token[1:]
+    if direction not in (NEXT_PAGE, PREV_PAGE):
+        raise ValueError(f"Geçersiz sayfa yönü: {token}")
+    aware = body.endswith(_AWARE_MARK)
+    if aware:
+        body = body[:-1]
+    micros, row_id = body.split(".")
+    seconds, microseconds = divmod(int(micros, 36), 1_000_000)
+    sort_value = datetime.fromtimestamp(seconds, timezone.utc).replace(microsecond=microseconds)
+    if not aware:
+        sort_value = sort_value.replace(tzinfo=None)
+    return direction, sort_value, int(row_id, 36)
+
+
+def split_page_token(data: Optional[str], prefix: str) -> Optional[str]:
+    """"<prefix>:<token>" callback data'sından token (yoksa None - ilk sayfa)"""
+    if not data or not data.startswith(prefix + PAGE_TOKEN_SEPARATOR):
+        return None
+    return data[len(prefix) + 1:] or None
+
+
+@dataclass
+class KeysetPage:
+    """Tek sayfa - satırlar en yeniden en eskiye"""
+    rows: List[Any] = field(default_factory=list)
+    next_token: Optional[str] = None  # Daha eski kayıtlar
+    prev_token: Optional[str] = None  # Daha yeni kayıtlar
+
+
+async def fetch_keyset_page(conn, query: str, params: Sequence[Any] = (), *,
+                            sort_column: str, id_column: str,
+                            page_token: Optional[str] = None, page_size: int = 10) -> KeysetPage:
+    """
+    query: ORDER BY / LIMIT içermeyen, WHERE ile biten SELECT (koşul yoksa "WHERE TRUE").
+    Sıralama "sort_column DESC, id_column DESC"; (sort_column, id_column) üzerinde
+    indeks olmalı.
+    """
+    direction, cursor = NEXT_PAGE, None
+    if page_token:
+        try:
+            direction, sort_value, row_id = decode_cursor(page_token)
+            cursor = (sort_value, row_id)
+        except (ValueError, OverflowError) as e:
+            logger.warning(f"⚠️ Geçersiz sayfa token'ı, ilk sayfa gösteriliyor: {page_token} ({e})")
+
+    params = list(params)
+    sql = query
+    if cursor:
+        comparison = "<" if direction == NEXT_PAGE else ">"
+        sql += f" AND ({sort_column}, {id_column}) {comparison} (${len(params) + 1}, ${len(params) + 2})"
+        params.extend(cursor)
+    order = "DESC" if direction == NEXT_PAGE else "ASC"
+    sql += f" ORDER BY {sort_column} {order}, {id_column} {order} LIMIT {page_size + 1}"
+
+    rows = list(await conn.fetch(sql, *params))
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == PREV_PAGE:
+        rows.reverse()
+    if not rows:
+        return KeysetPage()
+
+    sort_key = sort_column.split(".")[-1]
+    id_key = id_column.split(".")[-1]
+    # İleri giderken geride kalan sayfa vardır; geri giderken ileride kalan
+    has_older = more if direction == NEXT_PAGE else cursor is not None
+    has_newer = cursor is not None if direction == NEXT_PAGE else more
+    return KeysetPage(
+        rows=rows,
+        next_token=encode_cursor(NEXT_PAGE, rows[-1][sort_key], rows[-1][id_key]) if has_older else None,
+        prev_token=encode_cursor(PREV_PAGE, rows[0][sort_key], rows[0][id_key]) if has_newer else None,
+    )
+
+
+def page_buttons(page: KeysetPage, callback_prefix: str) -> List[InlineKeyboardButton]:
+    """Önceki / Sonraki butonları (klavye satırı) - sayfa yoksa boş liste"""
+    buttons = []
+    if page.prev_token:
+        buttons.append(InlineKeyboardButton(
+            text="⬅️ Önceki",
+            callback_data=f"{callback_prefix}{PAGE_TOKEN_SEPARATOR}{page.prev_token}"
+        ))
+    if page.next_token:
+        buttons.append(InlineKeyboardButton(
+            text="Sonraki ➡️",
+            callback_data=f"{callback_prefix}{PAGE_TOKEN_SEPARATOR}{page.next_token}"
+        ))
+    return buttons
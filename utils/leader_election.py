@@ -0,0 +1,216 @@
+"""
+👑 Lider Seçimi - Tekil arka plan işleri için Postgres lease
+Birden fazla bot instance'ı (ya da worker) çalışırken zamanlanmış
+mesajlar gibi işlerin sadece bir yerde çalışması gerekir. Her instance
+leader_leases tablosundaki kaydı almaya / yenilemeye çalışır; kaydı
+tutan lider olur ve kayıtlı işleri başlatır.
+
+- Kayıt alma / yenileme tek bir INSERT ... ON CONFLICT ... WHERE ile
+  atomiktir; ek kilit yoktur (PgBouncer transaction modunda da güvenli).
+  Sadece kaydın başkasında olması liderliği bitirir.
+- Lider lease'i LEASE_RENEW_INTERVAL'da bir yeniler. Yenileyemezse
+  kendi süresi dolmadan işlerini durdurur (iki lider olmaz): her
+  deneme kalan lease süresiyle sınırlanır ve süre bitmeden
+  LEASE_SAFETY_MARGIN önce çalan yerel bir zamanlayıcı, DB çağrısı
+  takılı kalsa bile işleri durdurur.
+- Lider ölürse lease en geç LEASE_TTL sonra boşa düşer ve yedek
+  instance bir sonraki denemede devralır.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional
+
+from database import get_db_pool
+
+logger = logging.getLogger(__name__)
+
+# Lease süresi ve yenileme aralığı (saniye) - devralma en geç ~TTL + aralık
+LEASE_TTL = 10
+LEASE_RENEW_INTERVAL = 3
+# Yerel süre dolmadan bu kadar önce işler durdurulur (saat kayması / iptal gecikmesi payı)
+LEASE_SAFETY_MARGIN = 1
+
+DEFAULT_LEASE_NAME = "kirvehub_singleton_jobs"
+
+
+@dataclass
+class LeaderJob:
+    """Sadece liderde çalışan iş"""
+    name: str
+    factory: Callable[[], Awaitable]
+    run_once: bool = False  # Bir kez tamamlanınca yeni liderde tekrar çalışmaz
+    done: bool = False
+    task: Optional[asyncio.Task] = None
+
+
+class LeaderElector:
+    """Lease tabanlı lider seçimi + lider işlerinin yaşam döngüsü"""
+
+    def __init__(self, name: str = DEFAULT_LEASE_NAME, ttl: float = LEASE_TTL, renew_interval: float = LEASE_RENEW_INTERVAL):
+        self.name = name
+        self.ttl = ttl
+        self.renew_interval = renew_interval
+        self.holder = f"{socket.gethostname()}:{os.getpid()}"
+        self._jobs: Dict[str, LeaderJob] = {}
+        self._is_leader = False
+        self._lease_deadline = 0.0
+        self._expiry_timer: Optional[asyncio.TimerHandle] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._is_leader and time.monotonic() < self._lease_deadline
+
+    def add_job(self, name: str, factory: Callable[[], Awaitable], run_once: bool = False) -> None:
+        """İş kaydet - lider olunca başlar, liderlik kaybedilince iptal edilir"""
+        job = LeaderJob(name=name, factory=factory, run_once=run_once)
+        self._jobs[name] = job
+        if self._is_leader:
+            self._start_job(job)
+
+    # ---------------- lease ----------------
+
+    async def _try_acquire(self) -> bool:
+        """Lease'i al ya da yenile - kayıt başkasındaysa False"""
+        pool = await get_db_pool()
+        if not pool:
+            raise ConnectionError("Database pool yok")
+
+        async with pool.acquire() as conn:
+            # Satır kilidi yarışı çözer: eşzamanlı devralmada sadece biri RETURNING alır
+            row = await conn.fetchrow('''
+                INSERT INTO leader_leases (name, holder, acquired_at, expires_at)
+                VALUES ($1, $2, NOW(), NOW() + make_interval(secs => $3))
+                ON CONFLICT (name) DO UPDATE SET
+                    holder = EXCLUDED.holder,
+                    acquired_at = CASE WHEN leader_leases.holder = EXCLUDED.holder
+                                       THEN leader_leases.acquired_at ELSE NOW() END,
+                    expires_at = EXCLUDED.expires_at
+                WHERE leader_leases.holder = EXCLUDED.holder OR leader_leases.expires_at < NOW()
+                RETURNING holder
+            ''', self.name, self.holder, float(self.ttl))
+            return row is not None
+
+    async def _release(self) -> None:
+        pool = await get_db_pool()
+        if not pool:
+            return
+        try:
+            async with pool.acquire() as conn:
+                await conn.execute(
+                    "DELETE FROM leader_leases WHERE name = $1 AND holder = $2", self.name, self.holder
+                )
+        except Exception as e:
+            logger.warning(f"⚠️ Lider lease bırakılamadı: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            attempt_started = time.monotonic()
+            timeout = self.renew_interval
+            if self._is_leader:
+                # Deneme, lease bitmeden sonuçlanmalı - takılan DB çağrısı liderliği uzatmaz
+                timeout = max(0.1, min(timeout, self._lease_deadline - LEASE_SAFETY_MARGIN - attempt_started))
+            try:
+                acquired = await asyncio.wait_for(self._try_acquire(), timeout=timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # DB'ye ulaşılamıyor - mevcut lease süresi dolana kadar liderlik sürer
+                acquired = None
+                if self._is_leader:
+                    logger.warning(f"⚠️ Lider lease yenilenemedi: {e}")
+
+            if acquired:
+                # Süre DB'de NOW()'dan sayılıyor; yerelde deneme başından say (güvenli taraf)
+                self._lease_deadline = attempt_started + self.ttl
+                self._arm_expiry_timer()
+                if not self._is_leader:
+                    self._become_leader()
+            elif self._is_leader and (acquired is False or time.monotonic() >= self._lease_deadline - self.renew_interval):
+                self._step_down()
+
+            await asyncio.sleep(self.renew_interval)
+
+    def _arm_expiry_timer(self) -> None:
+        """Lease bitmeden LEASE_SAFETY_MARGIN önce işleri durduracak yerel zamanlayıcı"""
+        if self._expiry_timer:
+            self._expiry_timer.cancel()
+        delay = max(0.0, self._lease_deadline - LEASE_SAFETY_MARGIN - time.monotonic())
+        self._expiry_timer = asyncio.get_running_loop().call_later(delay, self._on_lease_expiring)
+
+    def _on_lease_expiring(self) -> None:
+        self._expiry_timer = None
+        # Bu arada yenilendiyse zamanlayıcı zaten yeniden kurulmuştur
+        if self._is_leader and time.monotonic() >= self._lease_deadline - LEASE_SAFETY_MARGIN:
+            logger.warning("⚠️ Lider lease süresi dolmak üzere, yenileme gelmedi")
+            self._step_down()
+
+    # ---------------- işler ----------------
+
+    def _become_leader(self) -> None:
+        self._is_leader = True
+        logger.info(f"👑 Lider olundu ({self.holder}) - {len(self._jobs)} tekil iş başlatılıyor")
+        for job in self._jobs.values():
+            self._start_job(job)
+
+    def _step_down(self) -> None:
+        self._is_leader = False
+        if self._expiry_timer:
+            self._expiry_timer.cancel()
+            self._expiry_timer = None
+        logger.warning(f"👑 Liderlik bırakıldı ({self.holder}) - tekil işler durduruluyor")
+        for job in self._jobs.values():
+            if job.task and not job.task.done():
+                job.task.cancel()
+            job.task = None
+
+    def _start_job(self, job: LeaderJob) -> None:
+        if job.done or (job.task and not job.task.done()):
+            return
+        job.task = asyncio.create_task(self._run_job(job))
+
+    async def _run_job(self, job: LeaderJob) -> None:
+        try:
+            await job.factory()
+            if job.run_once:
+                job.done = True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Lider işi hatası ({job.name}): {e}")
+
+    # ---------------- yaşam döngüsü ----------------
+
+    def start(self) -> None:
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"👑 Lider seçimi başlatıldı ({self.holder})")
+
+    async def stop(self) -> None:
+        """İşleri durdur ve lease'i bırak - yedek instance hemen devralır"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._is_leader:
+            self._step_down()
+            await self._release()
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            "holder": self.holder,
+            "is_leader": self.is_leader,
+            "jobs": {
+                name: "done" if job.done else "running" if job.task and not job.task.done() else "idle"
+                for name, job in self._jobs.items()
+            },
+        }
+
+
+# Global elector instance
+leader_elector = LeaderElector()
@@ -0,0 +1,150 @@
+"""
+🥇 Liderlik Tabloları - Top-N anlık görüntüleri ve hazır metinler
+Top 10 KP / mesaj listeleri her görüntülemede ORDER BY ... LIMIT 10
+sorgusuyla sıralanmaz:
+    • Her metrik için N'den biraz büyük bir aday kümesi tutulur; sıralama
+      indeksindeki (utils.rank_index) her skor değişikliği kümeyi O(1)
+      günceller. Küme dışındaki herkes "taban" skorun altındadır.
+    • Tabanın altına düşen üyeler yüzünden kesin sıralı üye sayısı N'in
+      altına inerse küme bellekteki skorlardan yeniden kurulur (DB'siz)
+    • İndeks periyodik olarak tablodan yenilendiğinde kümeler de baştan
+      kurulur
+    • Ekranlar (register_view) hazır metni önbellekte tutar; liste
+      değişmedikçe yeniden üretilmez
+Listeler indeks kadar tazedir - diğer worker'ların yazdıkları indeksin
+periyodik yenilemesinde yansır.
+"""
+
+import heapq
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.rank_index import SCORE_SCALE, UserRankIndex, user_rank_index
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_SIZE = 10
+
+# Aday kümesi = LEADERBOARD_SIZE * CANDIDATE_FACTOR
+CANDIDATE_FACTOR = 3
+
+LeaderboardEntry = Dict[str, Any]
+
+
+class TopN:
+    """En yüksek skorlu N kullanıcı - artımlı güncellenen aday kümesi"""
+
+    def __init__(self, size: int = LEADERBOARD_SIZE, capacity: int = LEADERBOARD_SIZE * CANDIDATE_FACTOR):
+        self.size = size
+        self.capacity = capacity
+        self._members: Dict[int, int] = {}
+        self._floor = 0  # Küme dışındaki herkesin skoru <= taban
+        self.version = 0
+        self.rebuilds = 0
+
+    def rebuild(self, scores: Dict[int, int]) -> None:
+        """Tüm skorlardan kümeyi baştan kur - O(n log k)"""
+        top = heapq.nlargest(self.capacity + 1, ((score, user_id) for user_id, score in scores.items() if score > 0))
+        self._floor = top.pop()[0] if len(top) > self.capacity else 0
+        self._members = {user_id: score for score, user_id in top}
+        self.version += 1
+        self.rebuilds += 1
+
+    def update(self, user_id: int, score: Optional[int]) -> None:
+        """Tek kullanıcının skoru değişti (None/0: listeden çıkar)"""
+        if not score:
+            if self._members.pop(user_id, None) is not None:
+                self.version += 1
+            return
+        if user_id in self._members:
+            self._members[user_id] = score
+            self.version += 1
+        elif score > self._floor:
+            self._members[user_id] = score
+            if len(self._members) > self.capacity:
+                lowest = min(self._members, key=self._members.get)
+                self._floor = max(self._floor, self._members.pop(lowest))
+            self.version += 1
+
+    def top(self) -> Optional[List[Tuple[int, int]]]:
+        """(user_id, skor) listesi - kesinliği kaybolduysa None (yeniden kurulmalı)"""
+        ordered = sorted(self._members.items(), key=lambda item: item[1], reverse=True)
+        certain = [item for item in ordered if item[1] >= self._floor]
+        if len(certain) < self.size and self._floor > 0:
+            return None
+        return certain[:self.size]
+
+
+class LeaderboardService:
+    """Metrik başına TopN + ekran bazında hazır metin önbelleği"""
+
+    def __init__(self, index: UserRankIndex = user_rank_index, size: int = LEADERBOARD_SIZE):
+        self.index = index
+        self.boards: Dict[str, TopN] = {"points": TopN(size), "messages": TopN(size)}
+        self._views: Dict[str, Tuple[str, Callable[[List[LeaderboardEntry]], str]]] = {}
+        self._rendered: Dict[str, Tuple[int, str]] = {}
+        self.renders = 0
+        index.add_listener(self._on_change)
+        if index.ready:
+            self._on_change(None)
+
+    def _scores(self, metric: str) -> Dict[int, int]:
+        return self.index.points.scores if metric == "points" else self.index.messages.scores
+
+    def _on_change(self, user_id: Optional[int]) -> None:
+        for metric, board in self.boards.items():
+            if user_id is None:
+                board.rebuild(self._scores(metric))
+            else:
+                board.update(user_id, self._scores(metric).get(user_id))
+
+    def get_top(self, metric: str) -> List[LeaderboardEntry]:
+        """Metriğin Top-N listesi (sorgusuz)"""
+        board = self.boards[metric]
+        entries = board.top()
+        if entries is None:
+            board.rebuild(self._scores(metric))
+            entries = board.top()
+        result = []
+        for user_id, _ in entries:
+            first_name, username = self.index.names.get(user_id, (None, None))
+            result.append({
+                "user_id": user_id,
+                "first_name": first_name or "Anonim",
+                "username": username,
+                "kirve_points": (self.index.points.get(user_id) or 0) / SCORE_SCALE,
+                "total_messages": self.index.messages.get(user_id) or 0,
+            })
+        return result
+
+    def register_view(self, name: str, metric: str, render: Callable[[List[LeaderboardEntry]], str]) -> None:
+        """Ekran kaydet - render(entries) liste değişince bir kez çağrılır"""
+        self._views[name] = (metric, render)
+        self._rendered.pop(name, None)
+
+    async def get_text(self, name: str) -> str:
+        """Ekranın hazır metni"""
+        if not self.index.ready:
+            await self.index.load()
+        metric, render = self._views[name]
+        board = self.boards[metric]
+        # top() yeniden kurulum tetikleyebilir - sürümü sonra oku
+        entries = self.get_top(metric)
+        cached = self._rendered.get(name)
+        if cached and cached[0] == board.version:
+            return cached[1]
+        text = render(entries)
+        self._rendered[name] = (board.version, text)
+        self.renders += 1
+        return text
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "views": len(self._views),
+            "renders": self.renders,
+            "rebuilds": {metric: board.rebuilds for metric, board in self.boards.items()},
+        }
+
+
+# Global leaderboard service
+leaderboards = LeaderboardService()
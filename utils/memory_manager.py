@@ -8,6 +8,8 @@ import gc
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
 
+from utils.conversation_state import conversation_state_registry
+
 logger = logging.getLogger(__name__)
 
 class CacheManager:
@@ -68,6 +70,26 @@ class CacheManager:
             self.cache_timestamps.pop(key, None)
             self.cache_ttl.pop(key, None)
 
+# Input state TTL'leri (saniye)
+INPUT_STATE_TTL = 300
+LOTTERY_DATA_TTL = 3600
+
+# Input state değerine göre konuşma akışı
+SETTINGS_INPUT_STATES = ("custom_points", "custom_daily", "custom_weekly")
+SCHEDULED_INPUT_PREFIXES = ("create_bot_", "recreate_bot_", "add_link_")
+INPUT_STATE_FLOWS = ("settings_input", "scheduled_input", "input_state")
+
+
+def get_input_state_flow(state: str) -> str:
+    """Input state değerinin ait olduğu konuşma akışı"""
+    if state in SETTINGS_INPUT_STATES:
+        return "settings_input"
+    if state.startswith(SCHEDULED_INPUT_PREFIXES):
+        return "scheduled_input"
+    return "input_state"
+
+
+
 class MemoryManager:
     """Memory yöneticisi - Performance optimization"""
     
@@ -86,6 +108,7 @@ class MemoryManager:
             try:
                 # Cache temizliği
                 self.cache_manager.cleanup_expired()
+                conversation_state_registry.cleanup_expired()
                 
                 # Garbage collection
                 collected = gc.collect()
@@ -114,7 +137,11 @@ class MemoryManager:
     def set_input_state(self, user_id: int, state: str) -> None:
         """Kullanıcının input state'ini ayarla"""
         key = f"input_state_{user_id}"
-        self.cache_manager.set_cache(key, state, ttl=300)  # 5 dakika
+        self.cache_manager.set_cache(key, state, ttl=INPUT_STATE_TTL)  # 5 dakika
+        # Tek input state anahtarı var - önceki akışın kaydını düşür
+        for flow in INPUT_STATE_FLOWS:
+            conversation_state_registry.clear_state(user_id, flow)
+        conversation_state_registry.set_state(user_id, get_input_state_flow(state), step=state)
         logger.info(f"🎯 INPUT STATE SET - User: {user_id}, State: {state}")
         
     def get_input_state(self, user_id: int) -> Optional[str]:
@@ -128,11 +155,14 @@ class MemoryManager:
         """Kullanıcının input state'ini temizle"""
         key = f"input_state_{user_id}"
         self.cache_manager.clear_cache(key)
+        for flow in INPUT_STATE_FLOWS:
+            conversation_state_registry.clear_state(user_id, flow)
         
     def set_lottery_data(self, user_id: int, data: Dict[str, Any]) -> None:
         """Çekiliş verilerini kaydet"""
         key = f"lottery_data_{user_id}"
-        self.cache_manager.set_cache(key, data, ttl=3600)  # 1 saat
+        self.cache_manager.set_cache(key, data, ttl=LOTTERY_DATA_TTL)  # 1 saat
+        conversation_state_registry.set_state(user_id, "lottery", payload=data)
         
     def get_lottery_data(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Çekiliş verilerini al"""
@@ -143,10 +173,24 @@ class MemoryManager:
         """Çekiliş verilerini temizle"""
         key = f"lottery_data_{user_id}"
         self.cache_manager.clear_cache(key)
+        conversation_state_registry.clear_state(user_id, "lottery")
 
 # Global instance
 memory_manager = MemoryManager()
 
+
+def _restore_input_state(user_id: int, record) -> None:
+    memory_manager.cache_manager.set_cache(f"input_state_{user_id}", record.step, ttl=INPUT_STATE_TTL)
+
+
+def _restore_lottery_data(user_id: int, record) -> None:
+    memory_manager.cache_manager.set_cache(f"lottery_data_{user_id}", record.payload, ttl=LOTTERY_DATA_TTL)
+
+
+for _flow in INPUT_STATE_FLOWS:
+    conversation_state_registry.define_flow(_flow, ttl=INPUT_STATE_TTL, on_restore=_restore_input_state)
+conversation_state_registry.define_flow("lottery", ttl=LOTTERY_DATA_TTL, on_restore=_restore_lottery_data)
+
 def cleanup_all_resources():
     """Tüm kaynakları temizle"""
     try:
@@ -0,0 +1,147 @@
+"""
+🗑️ Mesaj Silme Servisi - Toplu deleteMessages
+Silinecek mesaj ID'lerini 100'lük paketler halinde tek API çağrısıyla siler,
+bot'un her chat'te gönderdiği son mesaj ID'lerini ring buffer'da tutar.
+Buffer process içidir - çoklu worker modunda sadece bu worker'ın
+gönderdiği mesajlar silinebilir.
+"""
+
+import logging
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import Message
+
+logger = logging.getLogger(__name__)
+
+# Telegram deleteMessages limiti
+DELETE_BATCH_SIZE = 100
+
+# Chat başına tutulacak bot mesajı sayısı
+RECENT_BUFFER_SIZE = 200
+
+
+class MessageDeletionService:
+    """Toplu mesaj silme + bot mesajı takibi"""
+
+    def __init__(self, buffer_size: int = RECENT_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        # chat_id -> son gönderilen bot mesaj ID'leri (eskiden yeniye)
+        self.recent_ids: Dict[int, Deque[int]] = {}
+
+    def track_message(self, chat_id: int, message_id: int) -> None:
+        """Bot'un gönderdiği mesajı ring buffer'a ekle"""
+        buffer = self.recent_ids.get(chat_id)
+        if buffer is None:
+            buffer = deque(maxlen=self.buffer_size)
+            self.recent_ids[chat_id] = buffer
+        buffer.append(message_id)
+
+    def forget_messages(self, chat_id: int, message_ids: Iterable[int]) -> None:
+        """Silinen mesajları buffer'dan çıkar"""
+        buffer = self.recent_ids.get(chat_id)
+        if not buffer:
+            return
+        removed = set(message_ids)
+        remaining = [mid for mid in buffer if mid not in removed]
+        if remaining:
+            self.recent_ids[chat_id] = deque(remaining, maxlen=self.buffer_size)
+        else:
+            self.recent_ids.pop(chat_id, None)
+
+    def get_recent_ids(self, chat_id: int, limit: Optional[int] = None, before_id: Optional[int] = None) -> List[int]:
+        """Chat'teki son bot mesaj ID'lerini yeniden eskiye döndür"""
+        buffer = self.recent_ids.get(chat_id)
+        if not buffer:
+            return []
+        ids = [mid for mid in reversed(buffer) if before_id is None or mid < before_id]
+        return ids[:limit] if limit else ids
+
+    async def delete_messages(self, bot: Bot, chat_id: int, message_ids: Iterable[int]) -> int:
+        """
+        Mesajları 100'lük paketlerle sil.
+        Telegram paket başına sadece True döner (bulunamayanları sessizce atlar);
+        dönen sayı Telegram'ın onayladığı paketlerdeki ID sayısıdır.
+        """
+        ids = sorted(set(mid for mid in message_ids if mid and mid > 0))
+        if not ids:
+            return 0
+
+        confirmed: List[int] = []
+        for start in range(0, len(ids), DELETE_BATCH_SIZE):
+            batch = ids[start:start + DELETE_BATCH_SIZE]
+            try:
+                if await bot.delete_messages(chat_id, batch):
+                    confirmed.extend(batch)
+            except Exception as e:
+                logger.warning(f"⚠️ Toplu mesaj silme hatası (Chat: {chat_id}, {len(batch)} mesaj): {e}")
+
+        self.forget_messages(chat_id, confirmed)
+        return len(confirmed)
+
+    async def delete_recent(self, bot: Bot, chat_id: int, before_id: int, count: int) -> int:
+        """
+        before_id'den önceki son `count` mesajı sil.
+        Chat mesaj ID'leri ardışık olduğu için aralık tek çağrıda gönderilir;
+        çağrı başarısız olursa kalan aralıktaki sadece buffer'daki bot mesajları silinir.
+        Onaylanan silme sayısını döndürür (bkz. delete_messages).
+        """
+        if count <= 0:
+            return 0
+
+        candidate_ids = list(range(max(1, before_id - count), before_id))
+        confirmed: List[int] = []
+        try:
+            for start in range(0, len(candidate_ids), DELETE_BATCH_SIZE):
+                batch = candidate_ids[start:start + DELETE_BATCH_SIZE]
+                if await bot.delete_messages(chat_id, batch):
+                    confirmed.extend(batch)
+            self.forget_messages(chat_id, confirmed)
+            return len(confirmed)
+        except Exception as e:
+            logger.warning(f"⚠️ Aralık silme başarısız, bot mesajlarına düşülüyor (Chat: {chat_id}): {e}")
+
+        # Onaylanan paketler buffer'dan düşer, geri kalan bot mesajları denenir
+        self.forget_messages(chat_id, confirmed)
+        known_ids = self.get_recent_ids(chat_id, limit=count - len(confirmed), before_id=before_id)
+        return len(confirmed) + await self.delete_messages(bot, chat_id, known_ids)
+
+
+class MessageTrackingMiddleware(BaseRequestMiddleware):
+    """Bot session middleware'i - gönderilen her mesajı servise kaydeder"""
+
+    def __init__(self, service: "MessageDeletionService"):
+        self.service = service
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: "Bot",
+        method: TelegramMethod[TelegramType],
+    ) -> TelegramType:
+        # Session zinciri Response değil, doğrudan method sonucunu döndürür
+        result = await make_request(bot, method)
+        try:
+            if isinstance(result, Message):
+                self.service.track_message(result.chat.id, result.message_id)
+            elif isinstance(result, list):
+                # send_media_group
+                for item in result:
+                    if isinstance(item, Message):
+                        self.service.track_message(item.chat.id, item.message_id)
+        except Exception as e:
+            logger.debug(f"Mesaj takip hatası: {e}")
+        return result
+
+
+# Global deletion service instance
+message_deletion_service = MessageDeletionService()
+
+
+def setup_message_tracking(bot: Bot) -> None:
+    """Bot session'ına mesaj takip middleware'ini ekle"""
+    bot.session.middleware(MessageTrackingMiddleware(message_deletion_service))
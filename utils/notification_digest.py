@@ -0,0 +1,167 @@
+"""
+📬 Admin Bildirim Özeti (Digest) - Flood ve gönderim bütçesi koruması
+Admin bildirimlerini (admin, kategori) bazında biriktirir ve her
+ADMIN_DIGEST_INTERVAL saniyede ya da ADMIN_DIGEST_MAX_ITEMS bildirim
+birikince tek bir özet mesaj olarak gönderir. Kritik bildirimler
+beklemeden ayrı mesaj olarak gider.
+Özetler HTML olarak gönderilir: satırlar HTML'dir, içlerine giren
+kullanıcı verisi (isim, kullanıcı adı, ürün adı) html.escape ile
+kaçırılmalıdır.
+Tamponlar process içidir; çoklu worker modunda her worker kendi özetini
+gönderir.
+"""
+
+import asyncio
+import html
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.types import InlineKeyboardMarkup
+
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+# Telegram mesaj limiti (4096) altında güvenli pay
+MAX_DIGEST_LENGTH = 3800
+
+# Kategori başlıkları
+CATEGORY_TITLES = {
+    "surprise_event": "🎉 Sürpriz Etkinlik Özeti",
+    "new_order": "📦 Yeni Sipariş Özeti",
+}
+
+DigestKey = Tuple[int, str]
+
+
+@dataclass
+class DigestBuffer:
+    """Bir (admin, kategori) için biriken bildirimler"""
+    lines: List[str] = field(default_factory=list)
+    first_at: float = field(default_factory=time.monotonic)
+    reply_markup: Optional[InlineKeyboardMarkup] = None
+
+
+class AdminNotificationAggregator:
+    """Admin bildirimlerini biriktirip özet halinde gönderen servis"""
+
+    def __init__(self):
+        self._buffers: Dict[DigestKey, DigestBuffer] = {}
+        self._lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._bot: Optional[Bot] = None
+
+    def set_bot(self, bot: Bot) -> None:
+        self._bot = bot
+
+    async def notify(
+        self,
+        admin_id: int,
+        category: str,
+        line: str,
+        text: Optional[str] = None,
+        critical: bool = False,
+        parse_mode: Optional[str] = "Markdown",
+        reply_markup: Optional[InlineKeyboardMarkup] = None
+    ) -> None:
+        """
+        Admin bildirimi ekle.
+        `line` özet içindeki tek satırdır (HTML); `text` kritik/anlık gönderimde kullanılacak
+        tam metindir (`parse_mode` ile).
+        """
+        config = get_config()
+        if critical or not config.ADMIN_DIGEST_ENABLED:
+            if text:
+                await self._send(admin_id, text, parse_mode, reply_markup)
+            else:
+                await self._send(admin_id, line, "HTML", reply_markup)
+            return
+
+        key = (admin_id, category)
+        async with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                buffer = DigestBuffer(reply_markup=reply_markup)
+                self._buffers[key] = buffer
+            buffer.lines.append(line)
+            flush_now = len(buffer.lines) >= config.ADMIN_DIGEST_MAX_ITEMS
+
+        if flush_now:
+            await self.flush(key)
+        else:
+            self._ensure_flush_task()
+
+    def _ensure_flush_task(self) -> None:
+        if not self._flush_task or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        """Süresi dolan buffer'ları gönder, hepsi boşalınca dur"""
+        while self._buffers:
+            try:
+                interval = get_config().ADMIN_DIGEST_INTERVAL
+                now = time.monotonic()
+                oldest = min(buffer.first_at for buffer in self._buffers.values())
+                wait = oldest + interval - now
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    continue
+
+                due_keys = [
+                    key for key, buffer in self._buffers.items()
+                    if now - buffer.first_at >= interval
+                ]
+                for key in due_keys:
+                    await self.flush(key)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Digest flush loop hatası: {e}")
+                await asyncio.sleep(5)
+
+    async def flush(self, key: DigestKey) -> None:
+        """Tek bir (admin, kategori) buffer'ını özet mesaj olarak gönder"""
+        async with self._lock:
+            buffer = self._buffers.pop(key, None)
+        if not buffer or not buffer.lines:
+            return
+
+        admin_id, category = key
+        title = CATEGORY_TITLES.get(category, f"📬 {category} Özeti")
+        header = f"<b>{html.escape(title)}</b>\n<b>📊 Adet:</b> {len(buffer.lines)}\n<b>⏰ Tarih:</b> {datetime.now().strftime('%d.%m.%Y %H:%M')}\n\n"
+
+        body = ""
+        for index, line in enumerate(buffer.lines):
+            if len(header) + len(body) + len(line) + 1 > MAX_DIGEST_LENGTH:
+                body += f"\n<i>... ve {len(buffer.lines) - index} bildirim daha</i>"
+                break
+            body += line + "\n"
+
+        await self._send(admin_id, header + body, "HTML", buffer.reply_markup)
+
+    async def flush_all(self) -> None:
+        """Tüm bekleyen özetleri gönder (kapanışta)"""
+        for key in list(self._buffers.keys()):
+            await self.flush(key)
+
+    async def _send(self, admin_id: int, text: str, parse_mode: Optional[str], reply_markup: Optional[InlineKeyboardMarkup]) -> None:
+        if not self._bot:
+            logger.warning(f"⚠️ Digest bot instance yok, bildirim atlandı - Admin: {admin_id}")
+            return
+        try:
+            await self._bot.send_message(admin_id, text, parse_mode=parse_mode, reply_markup=reply_markup)
+        except Exception as e:
+            logger.error(f"❌ Admin bildirimi gönderilemedi - Admin: {admin_id}, Error: {e}")
+
+
+# Global aggregator instance
+admin_notification_aggregator = AdminNotificationAggregator()
+
+
+def set_bot_instance(bot_instance: Bot) -> None:
+    admin_notification_aggregator.set_bot(bot_instance)
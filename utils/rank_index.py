@@ -0,0 +1,273 @@
+"""
+🏆 Sıralama İndeksi - Fenwick ağacı ile bellek içi sıra istatistiği
+Profil sıralamaları (point, mesaj, genel skor) her görüntülemede
+users tablosunda COUNT(*) taraması yerine burada hesaplanır:
+    • Skorlar kuruşa (0.01) nicelenir - kirve_points DECIMAL(10,2) olduğu
+      için sıra birebir aynıdır; genel skor = point + mesaj * 0.1
+    • Her skor türü için bucket -> kullanıcı sayısı Fenwick ağacı;
+      "benden yüksek kaç kişi" sorgusu ve güncelleme O(log n)
+    • Ağaç ihtiyaç oldukça iki katına büyür (MAX_FENWICK_BUCKETS'a kadar),
+      üstündeki nadir skorlar sıralı listede tutulur
+İndeks açılışta tablodan kurulur, point/bakiye/kayıt değişikliklerinde
+güncellenir. Diğer instance'ların (çoklu worker modunda diğer worker'ların)
+yazdıkları RANK_INDEX_RESYNC_INTERVAL'da bir tam yeniden yüklemeyle
+yakalanır - arada sıralar en fazla bu kadar bayat kalır.
+"""
+
+import asyncio
+import bisect
+import logging
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from database import get_db_pool
+
+logger = logging.getLogger(__name__)
+
+# Skor birimi: 1 = 0.01 (kuruş)
+SCORE_SCALE = 100
+
+# Genel skor ağırlığı - mesaj başına 0.1 (kuruş cinsinden 10)
+MESSAGE_SCORE_WEIGHT = 10
+
+INITIAL_FENWICK_BUCKETS = 1 << 14
+MAX_FENWICK_BUCKETS = 1 << 20
+
+# Tam yeniden yükleme aralığı (saniye)
+RANK_INDEX_RESYNC_INTERVAL = 300
+
+
+class FenwickTree:
+    """Bucket sayaçları - prefix toplamı ve nokta güncellemesi O(log n)"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._tree = array("q", bytes(8 * (size + 1)))
+        self.total = 0
+
+    def add(self, index: int, delta: int) -> None:
+        self.total += delta
+        i = index + 1
+        tree, size = self._tree, self.size
+        while i <= size:
+            tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, index: int) -> int:
+        """0..index aralığındaki toplam"""
+        total = 0
+        i = min(index, self.size - 1) + 1
+        tree = self._tree
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+
+class ScoreRankIndex:
+    """Tek skor türü için kullanıcı -> skor ve sıra sorgusu"""
+
+    def __init__(self, buckets: int = INITIAL_FENWICK_BUCKETS, max_buckets: int = MAX_FENWICK_BUCKETS):
+        self.max_buckets = max_buckets
+        self._tree = FenwickTree(buckets)
+        self._overflow: List[int] = []  # max_buckets ve üstü skorlar, sıralı
+        self._scores: Dict[int, int] = {}
+
+    def _insert(self, score: int) -> None:
+        if score >= self.max_buckets:
+            bisect.insort(self._overflow, score)
+            return
+        if score >= self._tree.size:
+            size = self._tree.size
+            while size <= score:
+                size *= 2
+            # Yeni ağaç mevcut skorlardan kurulur (eklenen skor henüz _scores'ta değil)
+            self._tree = FenwickTree(min(size, self.max_buckets))
+            for existing in self._scores.values():
+                if existing < self.max_buckets:
+                    self._tree.add(existing, 1)
+        self._tree.add(score, 1)
+
+    def _delete(self, score: int) -> None:
+        if score >= self.max_buckets:
+            index = bisect.bisect_left(self._overflow, score)
+            del self._overflow[index]
+        else:
+            self._tree.add(score, -1)
+
+    def set(self, user_id: int, score: int) -> None:
+        score = max(0, score)
+        old = self._scores.get(user_id)
+        if old == score:
+            return
+        if old is not None:
+            del self._scores[user_id]
+            self._delete(old)
+        self._insert(score)
+        self._scores[user_id] = score
+
+    def remove(self, user_id: int) -> None:
+        old = self._scores.pop(user_id, None)
+        if old is not None:
+            self._delete(old)
+
+    def get(self, user_id: int) -> Optional[int]:
+        return self._scores.get(user_id)
+
+    @property
+    def scores(self) -> Dict[int, int]:
+        """user_id -> nicelenmiş skor (salt okunur kullanılmalı)"""
+        return self._scores
+
+    def count_above(self, score: int) -> int:
+        """Skoru verilenden yüksek kullanıcı sayısı"""
+        above_overflow = len(self._overflow) - bisect.bisect_right(self._overflow, score)
+        if score >= self.max_buckets:
+            return above_overflow
+        return self._tree.total - self._tree.prefix_sum(score) + above_overflow
+
+    def rank_of(self, score: int) -> int:
+        return self.count_above(score) + 1
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+
+def _point_score(points: float) -> int:
+    return int(round(float(points or 0) * SCORE_SCALE))
+
+
+class UserRankIndex:
+    """Kayıtlı kullanıcılar için point / mesaj / genel skor indeksleri"""
+
+    def __init__(self):
+        self.points = ScoreRankIndex()
+        self.messages = ScoreRankIndex()
+        self.general = ScoreRankIndex()
+        self.names: Dict[int, Tuple[Optional[str], Optional[str]]] = {}  # user_id -> (first_name, username)
+        self.ready = False
+        # Değişiklik dinleyicileri (liderlik tabloları) - None: tüm indeks yenilendi
+        self._listeners: List[Callable[[Optional[int]], None]] = []
+        self._load_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def add_listener(self, listener: Callable[[Optional[int]], None]) -> None:
+        self._listeners.append(listener)
+
+    def _notify(self, user_id: Optional[int]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(user_id)
+            except Exception as e:
+                logger.error(f"❌ Sıralama dinleyici hatası: {e}")
+
+    # ---------------- güncelleme ----------------
+
+    def set_user(self, user_id: int, points: float, messages: int) -> None:
+        """Kullanıcının güncel değerlerini yaz (kayıtlı kullanıcı)"""
+        point_score = max(0, _point_score(points))
+        message_count = max(0, int(messages or 0))
+        self.points.set(user_id, point_score)
+        self.messages.set(user_id, message_count)
+        self.general.set(user_id, point_score + message_count * MESSAGE_SCORE_WEIGHT)
+        self._notify(user_id)
+
+    def set_name(self, user_id: int, first_name: Optional[str], username: Optional[str]) -> None:
+        self.names[user_id] = (first_name, username)
+
+    def set_points(self, user_id: int, points: float) -> None:
+        """Bakiye mutlak olarak değişti"""
+        message_count = self.messages.get(user_id)
+        if message_count is not None:
+            self.set_user(user_id, float(points or 0), message_count)
+
+    def add(self, user_id: int, points_delta: float = 0.0, messages_delta: int = 0) -> None:
+        """Bakiye / mesaj sayısı göreli değişti - indekste olmayan kullanıcı atlanır"""
+        point_score = self.points.get(user_id)
+        if point_score is None:
+            return
+        point_score += _point_score(points_delta)
+        message_count = self.messages.get(user_id) + messages_delta
+        self.set_user(user_id, point_score / SCORE_SCALE, message_count)
+
+    def remove_user(self, user_id: int) -> None:
+        """Kayıt silindi / kullanıcı silindi"""
+        self.points.remove(user_id)
+        self.messages.remove(user_id)
+        self.general.remove(user_id)
+        self.names.pop(user_id, None)
+        self._notify(user_id)
+
+    # ---------------- sorgu ----------------
+
+    def get_user_ranks(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Kullanıcının değerleri ve sıraları - indekste yoksa None"""
+        point_score = self.points.get(user_id)
+        if point_score is None:
+            return None
+        return {
+            "points": point_score / SCORE_SCALE,
+            "messages": self.messages.get(user_id),
+            "point_rank": self.points.rank_of(point_score),
+            "message_rank": self.messages.rank_of(self.messages.get(user_id)),
+            "general_rank": self.general.rank_of(self.general.get(user_id)),
+            "total_participants": len(self.points),
+        }
+
+    # ---------------- yükleme ----------------
+
+    async def load(self) -> bool:
+        """Kayıtlı kullanıcılardan indeksleri baştan kur"""
+        async with self._load_lock:
+            pool = await get_db_pool()
+            if not pool:
+                return False
+            try:
+                async with pool.acquire() as conn:
+                    rows = await conn.fetch("""
+                        SELECT user_id, kirve_points, total_messages, first_name, username
+                        FROM users
+                        WHERE is_registered = true
+                    """)
+            except Exception as e:
+                logger.error(f"❌ Sıralama indeksi yüklenemedi: {e}")
+                return False
+
+            fresh = UserRankIndex()
+            for row in rows:
+                fresh.set_user(row["user_id"], row["kirve_points"] or 0, row["total_messages"] or 0)
+                fresh.set_name(row["user_id"], row["first_name"], row["username"])
+            # Tek adımda değiştir - yükleme sırasında gelen sorgular eski indeksi görür
+            self.points, self.messages, self.general = fresh.points, fresh.messages, fresh.general
+            self.names = fresh.names
+            self.ready = True
+            self._notify(None)
+            logger.info(f"🏆 Sıralama indeksi yüklendi - {len(rows)} kullanıcı")
+            return True
+
+    async def _resync_loop(self) -> None:
+        while True:
+            await asyncio.sleep(RANK_INDEX_RESYNC_INTERVAL)
+            await self.load()
+
+    async def start(self) -> None:
+        await self.load()
+        if not self._task or self._task.done():
+            self._task = asyncio.create_task(self._resync_loop())
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "users": len(self.points),
+            "point_buckets": self.points._tree.size,
+            "overflow": len(self.points._overflow) + len(self.general._overflow),
+        }
+
+
+# Global rank index instance
+user_rank_index = UserRankIndex()
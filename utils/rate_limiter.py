@@ -1,85 +1,133 @@
 """
-⏱️ Rate Limiting Sistemi - Performance Optimization
+⏱️ Rate Limiting Sistemi - GCRA (Generic Cell Rate Algorithm)
+Her anahtar için tek bir float tutulur: teorik varış zamanı (TAT).
+Kontrol O(1)'dir, zaman damgası listesi tutulmaz. Karar hemen döner:
+izin / red + ne kadar sonra tekrar denenebileceği (retry_after).
+Boşta kalan anahtarlar (TAT geçmişte = kova dolu) tembel olarak silinir.
+
+Limitler işlem tipine göre tanımlıdır (RATE_LIMITS) ve
+rate_limiter.configure() ile değiştirilebilir.
+
+Kovalar process içidir. Çoklu worker modunda kullanıcı limitleri yine
+doğrudur (bir kullanıcının update'leri tek worker'a gider); "global"
+limit ise worker sayısına bölünür ki toplam oran aynı kalsın.
 """
 
 import asyncio
+import logging
 import time
-from collections import defaultdict
-from typing import Dict, List, Tuple
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, NamedTuple
+
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.types import Message, TelegramObject
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """`period` saniyede en fazla `limit` işlem (hepsi art arda gelebilir)"""
+    limit: int
+    period: float
+
+    @property
+    def emission_interval(self) -> float:
+        return self.period / self.limit
+
+    @property
+    def burst_tolerance(self) -> float:
+        return self.period
+
+
+class RateDecision(NamedTuple):
+    allowed: bool
+    retry_after: float = 0.0
+
+
+# İşlem tipi -> limit (eski pencere limitleriyle aynı oranlar)
+RATE_LIMITS: Dict[str, RateLimit] = {
+    "message": RateLimit(limit=10, period=5.0),    # 5 saniyede 10 mesaj
+    "callback": RateLimit(limit=20, period=2.0),   # 2 saniyede 20 callback
+    "global": RateLimit(limit=200, period=1.0),    # saniyede 200 işlem
+}
+
+# Bu kadar kontrolde bir boşta kalan anahtarlar süpürülür
+EVICTION_EVERY = 1000
+
 
 class RateLimiter:
-    """Rate limiting sistemi"""
-    
-    def __init__(self):
-        self.user_limits: Dict[int, List[float]] = defaultdict(list)
-        self.global_limits: List[float] = []
-        
-        # Limit ayarları
-        self.user_message_limit = 0.5  # Kullanıcı başına 0.5 saniye (hızlandırıldı)
-        self.user_callback_limit = 0.2  # Callback başına 0.2 saniye (hızlandırıldı)
-        self.global_limit = 0.05  # Global 0.05 saniye (hızlandırıldı)
-        
+    """İşlem tipi başına {anahtar: TAT} tablosu"""
+
+    def __init__(self, limits: Dict[str, RateLimit] = None):
+        self.limits: Dict[str, RateLimit] = dict(limits or RATE_LIMITS)
+        self._tat: Dict[str, Dict[Hashable, float]] = {action: {} for action in self.limits}
+        self._ops = 0
+        self.allowed = 0
+        self.denied: Dict[str, int] = {}
+
+    def configure(self, action: str, limit: int, period: float) -> None:
+        """İşlem tipinin limitini ayarla (yoksa ekle)"""
+        self.limits[action] = RateLimit(limit=limit, period=period)
+        self._tat.setdefault(action, {})
+
+    def check(self, action: str, key: Hashable = None, now: float = None) -> RateDecision:
+        """İşleme izin ver ya da ne kadar beklenmesi gerektiğini söyle"""
+        rate = self.limits.get(action)
+        if rate is None:
+            return RateDecision(True)
+        now = time.monotonic() if now is None else now
+        table = self._tat[action]
+
+        self._ops += 1
+        if self._ops >= EVICTION_EVERY:
+            self._ops = 0
+            self._evict(now)
+
+        tat = max(table.get(key, now), now)
+        allow_at = tat + rate.emission_interval - rate.burst_tolerance
+        if now < allow_at:
+            self.denied[action] = self.denied.get(action, 0) + 1
+            return RateDecision(False, allow_at - now)
+
+        table[key] = tat + rate.emission_interval
+        self.allowed += 1
+        return RateDecision(True)
+
+    def _evict(self, now: float) -> None:
+        """TAT'i geçmişte kalan (kovası dolmuş) anahtarları sil"""
+        for table in self._tat.values():
+            for key in [k for k, tat in table.items() if tat <= now]:
+                del table[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "allowed": self.allowed,
+            "denied": dict(self.denied),
+            "tracked_keys": {action: len(table) for action, table in self._tat.items()},
+        }
+
+    # ---------------- eski API ----------------
+
     async def check_user_message_limit(self, user_id: int) -> bool:
         """Kullanıcı mesaj limitini kontrol et"""
-        current_time = time.time()
-        user_times = self.user_limits[user_id]
-        
-        # Eski kayıtları temizle (5 saniyeden eski)
-        user_times = [t for t in user_times if current_time - t < 5.0]
-        self.user_limits[user_id] = user_times
-        
-        # Limit kontrolü
-        if len(user_times) >= 10:  # 5 saniyede maksimum 10 mesaj (artırıldı)
-            return False
-            
-        # Yeni kayıt ekle
-        user_times.append(current_time)
-        return True
-        
+        return self.check("message", user_id).allowed
+
     async def check_user_callback_limit(self, user_id: int) -> bool:
         """Kullanıcı callback limitini kontrol et"""
-        current_time = time.time()
-        user_times = self.user_limits[f"{user_id}_callback"]
-        
-        # Eski kayıtları temizle (2 saniyeden eski)
-        user_times = [t for t in user_times if current_time - t < 2.0]
-        self.user_limits[f"{user_id}_callback"] = user_times
-        
-        # Limit kontrolü
-        if len(user_times) >= 20:  # 2 saniyede maksimum 20 callback (artırıldı)
-            return False
-            
-        # Yeni kayıt ekle
-        user_times.append(current_time)
-        return True
-        
+        return self.check("callback", user_id).allowed
+
     async def check_global_limit(self) -> bool:
         """Global limit kontrolü"""
-        current_time = time.time()
-        
-        # Eski kayıtları temizle (1 saniyeden eski)
-        self.global_limits = [t for t in self.global_limits if current_time - t < 1.0]
-        
-        # Limit kontrolü
-        if len(self.global_limits) >= 200:  # 1 saniyede maksimum 200 işlem (artırıldı)
-            return False
-            
-        # Yeni kayıt ekle
-        self.global_limits.append(current_time)
-        return True
-        
+        return self.check("global").allowed
+
     async def wait_if_needed(self, user_id: int, operation_type: str = "message"):
-        """Gerekirse bekle"""
-        if operation_type == "message":
-            while not await self.check_user_message_limit(user_id):
-                await asyncio.sleep(0.1)
-        elif operation_type == "callback":
-            while not await self.check_user_callback_limit(user_id):
-                await asyncio.sleep(0.05)
-                
-        # Global limit kontrolü
-        while not await self.check_global_limit():
-            await asyncio.sleep(0.01)
+        """Gerekirse bekle - döngü yerine retry_after kadar tek uyku"""
+        for action, key in ((operation_type, user_id), ("global", None)):
+            decision = self.check(action, key)
+            while not decision.allowed:
+                await asyncio.sleep(decision.retry_after)
+                decision = self.check(action, key)
 
 # Global rate limiter instance
 rate_limiter = RateLimiter()
@@ -94,10 +142,66 @@ def rate_limit(operation_type: str = "message"):
                 if hasattr(arg, 'from_user') and hasattr(arg.from_user, 'id'):
                     user_id = arg.from_user.id
                     break
-                    
+
             if user_id:
                 await rate_limiter.wait_if_needed(user_id, operation_type)
-                
+
             return await func(*args, **kwargs)
         return wrapper
-    return decorator 
\ No newline at end of file
+    return decorator
+
+
+class RateLimitMiddleware(BaseMiddleware):
+    """
+    Message / callback outer middleware - limit aşılırsa handler çağrılmaz,
+    handler içinde uyunmaz. Karar data["rate_limit"] olarak handler'a geçer.
+    """
+
+    def __init__(self, limiter: RateLimiter, action: str):
+        self.limiter = limiter
+        self.action = action
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        if user is None:
+            return await handler(event, data)
+
+        # Grup sohbeti pipeline'ın kendi flood korumasında - sadece özel mesajlar / komutlar
+        if isinstance(event, Message) and event.chat.type != "private" and not (event.text or "").startswith("/"):
+            return await handler(event, data)
+
+        decision = self.limiter.check(self.action, user.id)
+        if not decision.allowed:
+            logger.info(f"⏱️ Rate limit - User: {user.id}, İşlem: {self.action}, Tekrar: {decision.retry_after:.2f}s")
+            # Callback'ler erken onaylandı (callback_ack) - sessizce düşür
+            return None
+
+        data["rate_limit"] = decision
+        return await handler(event, data)
+
+
+def setup_rate_limiter(dp: Dispatcher) -> None:
+    """
+    Mesaj ve callback limitlerini dispatcher'a ekle.
+    Callback router'dan önce eklenmeli (router handler'ları outer middleware'de çağırır).
+    """
+    from utils.update_sharding import get_worker_index
+    if get_worker_index() is not None:
+        from config import get_config
+        workers = max(1, get_config().BOT_WORKERS)
+        rate = rate_limiter.limits["global"]
+        rate_limiter.configure("global", max(1, rate.limit // workers), rate.period)
+        logger.info(f"⏱️ Global limit {workers} worker'a bölündü: {rate_limiter.limits['global'].limit}/{rate.period:g}s")
+
+    dp.message.outer_middleware(RateLimitMiddleware(rate_limiter, "message"))
+    dp.callback_query.outer_middleware(RateLimitMiddleware(rate_limiter, "callback"))
+    logger.info("⏱️ Rate limit middleware'i hazır")
+
+
+def get_rate_limiter_stats() -> Dict[str, Any]:
+    return rate_limiter.get_stats()
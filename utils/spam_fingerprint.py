@@ -0,0 +1,181 @@
+"""
+🧬 Mesaj Parmak İzi İndeksi - SimHash ile yakın-kopya / spam tespiti
+Ham mesaj metni saklanmaz; her mesaj için 64-bit SimHash hesaplanır ve
+Hamming mesafesi (popcount) ile karşılaştırılır.
+    • Kullanıcı ring buffer'ı: aynı kullanıcının son mesajları
+    • Grup ring buffer'ı: aynı gruptaki başka kullanıcıların mesajları
+    • Global band indeksi: gruplar arası kopyala-yapıştır - 64 bit 4
+      banda bölünür, mesafe ≤ 3 olan iki izin en az bir bandı birebir
+      aynıdır; sadece aynı banttaki adaylar karşılaştırılır
+Kısa mesajlarda tek kelime değişikliği ~10 bit oynatır; ring'ler zaten
+sınırlı olduğundan orada daha geniş eşik kullanılır.
+Her kontrol sabit sayıda popcount yapar, bellek mesaj başına birkaç int.
+İndeks process içidir: çoklu worker modunda grup ring'i ve band indeksi
+sadece bu worker'a düşen kullanıcıların mesajlarını görür.
+"""
+
+import hashlib
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple
+
+# Bu süreden eski izler karşılaştırılmaz (saniye)
+FINGERPRINT_WINDOW = 600  # 10 dakika
+
+# Bu mesafe ve altı "yakın kopya" sayılır (64 bit üzerinden)
+RING_HAMMING_DISTANCE = 8   # kullanıcı / grup ring taraması
+BAND_HAMMING_DISTANCE = 3   # global band indeksi (band sayısını belirler)
+
+USER_RING_SIZE = 8
+GROUP_RING_SIZE = 128
+BAND_BUCKET_SIZE = 32
+
+# Kullanıcılar arası karşılaştırma için minimum kelime sayısı
+# ("selam", "günaydın" gibi kısa mesajlar herkes tarafından yazılır)
+MIN_CROSS_USER_TOKENS = 4
+
+BAND_COUNT = BAND_HAMMING_DISTANCE + 1
+BAND_BITS = 64 // BAND_COUNT
+BAND_MASK = (1 << BAND_BITS) - 1
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _feature_hash(feature: str) -> int:
+    # Process'ler arası kararlı 64-bit hash (hash() her process'te farklı)
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def simhash(tokens: List[str]) -> int:
+    """Kelime ve kelime ikilisi özelliklerinden 64-bit SimHash"""
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not features:
+        return 0
+    weights = [0] * 64
+    for feature in features:
+        value = _feature_hash(feature)
+        for bit in range(64):
+            if value >> bit & 1:
+                weights[bit] += 1
+            else:
+                weights[bit] -= 1
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class _Entry(NamedTuple):
+    fingerprint: int
+    seen_at: float
+    user_id: int
+    chat_id: Optional[int]
+
+
+@dataclass
+class DuplicateMatch:
+    """Bulunan yakın kopya - scope: user / group / global"""
+    scope: str
+    distance: int
+    user_id: int
+    chat_id: Optional[int]
+    age: float
+
+
+class FingerprintIndex:
+    """Kullanıcı/grup ring buffer'ları + global band indeksi"""
+
+    def __init__(self, window: float = FINGERPRINT_WINDOW, ring_distance: int = RING_HAMMING_DISTANCE):
+        self.window = window
+        self.ring_distance = ring_distance
+        self._users: Dict[int, Deque[_Entry]] = {}
+        self._groups: Dict[int, Deque[_Entry]] = {}
+        self._bands: Dict[Tuple[int, int], Deque[_Entry]] = {}
+        self.checked = 0
+        self.duplicates: Dict[str, int] = {"user": 0, "group": 0, "global": 0}
+
+    def _near(self, entries, fingerprint: int, now: float, max_distance: int, skip_user: Optional[int] = None) -> Optional[Tuple[_Entry, int]]:
+        for entry in entries:
+            if now - entry.seen_at > self.window or entry.user_id == skip_user:
+                continue
+            distance = hamming_distance(entry.fingerprint, fingerprint)
+            if distance <= max_distance:
+                return entry, distance
+        return None
+
+    def check_and_add(self, user_id: int, text: str, chat_id: Optional[int] = None, now: Optional[float] = None) -> Optional[DuplicateMatch]:
+        """Mesajı kontrol et ve indekse ekle; yakın kopyaysa eşleşmeyi döndür"""
+        now = time.monotonic() if now is None else now
+        tokens = tokenize(text)
+        if not tokens:
+            return None
+        fingerprint = simhash(tokens)
+        self.checked += 1
+
+        found = None
+        user_ring = self._users.get(user_id)
+        if user_ring:
+            hit = self._near(user_ring, fingerprint, now, self.ring_distance)
+            if hit:
+                found = DuplicateMatch("user", hit[1], user_id, hit[0].chat_id, now - hit[0].seen_at)
+
+        if found is None and len(tokens) >= MIN_CROSS_USER_TOKENS:
+            group_ring = self._groups.get(chat_id) if chat_id is not None else None
+            if group_ring:
+                hit = self._near(group_ring, fingerprint, now, self.ring_distance, skip_user=user_id)
+                if hit:
+                    found = DuplicateMatch("group", hit[1], hit[0].user_id, hit[0].chat_id, now - hit[0].seen_at)
+            if found is None:
+                for band in range(BAND_COUNT):
+                    bucket = self._bands.get((band, fingerprint >> (band * BAND_BITS) & BAND_MASK))
+                    hit = self._near(bucket, fingerprint, now, BAND_HAMMING_DISTANCE, skip_user=user_id) if bucket else None
+                    if hit:
+                        found = DuplicateMatch("global", hit[1], hit[0].user_id, hit[0].chat_id, now - hit[0].seen_at)
+                        break
+
+        entry = _Entry(fingerprint, now, user_id, chat_id)
+        self._users.setdefault(user_id, deque(maxlen=USER_RING_SIZE)).append(entry)
+        if len(tokens) >= MIN_CROSS_USER_TOKENS:
+            if chat_id is not None:
+                self._groups.setdefault(chat_id, deque(maxlen=GROUP_RING_SIZE)).append(entry)
+            for band in range(BAND_COUNT):
+                key = (band, fingerprint >> (band * BAND_BITS) & BAND_MASK)
+                self._bands.setdefault(key, deque(maxlen=BAND_BUCKET_SIZE)).append(entry)
+
+        if found:
+            self.duplicates[found.scope] += 1
+        return found
+
+    def cleanup(self, now: Optional[float] = None) -> int:
+        """Son izi pencereden eski olan ring'leri/bucket'ları at"""
+        now = time.monotonic() if now is None else now
+        removed = 0
+        for table in (self._users, self._groups, self._bands):
+            for key in [k for k, ring in table.items() if not ring or now - ring[-1].seen_at > self.window]:
+                del table[key]
+                removed += 1
+        return removed
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            "checked": self.checked,
+            "duplicates": dict(self.duplicates),
+            "users": len(self._users),
+            "groups": len(self._groups),
+            "band_buckets": len(self._bands),
+        }
+
+
+# Global index instance
+message_fingerprints = FingerprintIndex()
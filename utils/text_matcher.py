@@ -0,0 +1,116 @@
+"""
+🔎 Çoklu Kalıp Eşleştirici - Aho-Corasick otomatı
+Çok sayıda anahtar kelime/ifade metin üzerinde tek geçişte aranır.
+Her kalıp bir kategoriye ve anahtara bağlıdır; kelime sınırı isteyen
+kalıplar (regex'teki \\b gibi) eşleşme sonrası sınır kontrolünden geçer.
+Otomat bir kez kurulur, kalıp tabloları değişince yeniden kurulur.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, NamedTuple, Optional, Set
+
+
+class PatternMatch(NamedTuple):
+    category: str
+    key: str
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class _Pattern:
+    category: str
+    key: str
+    length: int
+    whole_word: bool
+
+
+def _is_word_char(char: str) -> bool:
+    # re modülündeki \w ile aynı: unicode harf/rakam ve alt çizgi
+    return char.isalnum() or char == "_"
+
+
+class MultiPatternMatcher:
+    """Aho-Corasick - kalıp ekle, build() et, metni tek geçişte tara"""
+
+    def __init__(self):
+        self._patterns: List[_Pattern] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._built = False
+
+    def add(self, pattern: str, category: str, key: Optional[str] = None, whole_word: bool = False) -> None:
+        """Kalıp ekle - eşleşme (category, key or pattern) olarak döner"""
+        if not pattern:
+            return
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append(len(self._patterns))
+        self._patterns.append(_Pattern(category, key if key is not None else pattern, len(pattern), whole_word))
+        self._built = False
+
+    def build(self) -> "MultiPatternMatcher":
+        """Failure link'lerini BFS ile kur"""
+        queue = list(self._goto[0].values())
+        for node in queue:
+            self._fail[node] = 0
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                # Suffix kalıplarının çıktıları da bu düğümde geçerli
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+        self._built = True
+        return self
+
+    def find_all(self, text: str) -> List[PatternMatch]:
+        """Metindeki tüm (üst üste binen dahil) eşleşmeler, bitiş sırasına göre"""
+        if not self._built:
+            self.build()
+        goto, fail, output, patterns = self._goto, self._fail, self._output, self._patterns
+        matches: List[PatternMatch] = []
+        node = 0
+        text_length = len(text)
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if not output[node]:
+                continue
+            end = index + 1
+            for pattern_id in output[node]:
+                pattern = patterns[pattern_id]
+                start = end - pattern.length
+                if pattern.whole_word and (
+                    (start > 0 and _is_word_char(text[start - 1]))
+                    or (end < text_length and _is_word_char(text[end]))
+                ):
+                    continue
+                matches.append(PatternMatch(pattern.category, pattern.key, start, end))
+        return matches
+
+    def match_keys(self, text: str) -> Dict[str, Set[str]]:
+        """Kategori -> eşleşen anahtarlar"""
+        found: Dict[str, Set[str]] = {}
+        for match in self.find_all(text):
+            found.setdefault(match.category, set()).add(match.key)
+        return found
+
+    def __len__(self) -> int:
+        return len(self._patterns)
@@ -0,0 +1,342 @@
+"""
+🚦 Update Yürütme Katmanı - Eşzamanlılık limiti + chat bazlı sıralama
+Polling her update için ayrı task açar; bu middleware o task'ların
+nasıl çalışacağını belirler:
+    • Aynı kullanıcının update'leri tek tek işlenir (grupta chat + kullanıcı,
+      özelde chat anahtarı - bir grubun üyeleri birbirini beklemez); sırada bekleyenler
+      arasında üst şerit önce, aynı şeritte geliş sırası (komutlar grup
+      sohbeti / catch-up yığınının arkasında beklemez)
+    • Aynı anda çalışan handler sayısı global semaphore ile sınırlıdır
+      (varsayılan: DB pool boyutu - pool'u tüketmemek için)
+    • Bekleyen update sayısı sınırlıdır; backlog doluysa yeni update düşürülür
+    • Update'ler öncelik şeritlerine ayrılır; boşalan slot en öncelikli
+      bekleyene verilir, backlog dolarken önce alt şeritler düşürülür
+    • Catch-up eşiğinden eski update'ler en alt şeritte bekler
+    • Backlog doluluğu ve event loop gecikmesine göre yük seviyesi
+      hesaplanır; alt şeritlerdeki opsiyonel işler (otomatik cevaplar,
+      anlık istatistik yazımı) yük düşene kadar kısılır
+Kuyruk derinliği ve bekleme süresi istatistikleri tutulur.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.types import TelegramObject, Update
+
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+
+# Öncelik şeritleri - küçük olan önce
+LANE_INTERACTIVE = 0   # özel mesajlar, callback'ler, komutlar
+LANE_ACCOUNTING = 1    # grup sohbeti (point / istatistik)
+LANE_BACKGROUND = 2    # üyelik değişiklikleri ve diğer update'ler
+LANE_CATCHUP = 3       # restart öncesinden kalan eski update'ler
+LANE_NAMES = {
+    LANE_INTERACTIVE: "interactive", LANE_ACCOUNTING: "accounting",
+    LANE_BACKGROUND: "background", LANE_CATCHUP: "catch_up",
+}
+
+# Şerit başına backlog kabul oranı - alt şeritler daha erken düşürülür
+LANE_BACKLOG_SHARE = {LANE_INTERACTIVE: 1.0, LANE_ACCOUNTING: 0.9, LANE_BACKGROUND: 0.75, LANE_CATCHUP: 0.6}
+
+# Yük seviyeleri
+LOAD_NORMAL = 0
+LOAD_ELEVATED = 1   # opsiyonel cevaplar kapalı
+LOAD_CRITICAL = 2   # + istatistikler write-behind buffer'a
+
+# Eşikler: (yükseltme, kritik)
+BACKLOG_RATIO_THRESHOLDS = (0.5, 0.8)
+LOOP_LAG_THRESHOLDS = (0.2, 1.0)  # saniye
+
+# Yük seviyesi ancak bu kadar süre eşiklerin altında kalınca düşer
+LOAD_RESTORE_DELAY = 15
+LOOP_LAG_SAMPLE_INTERVAL = 0.5
+
+
+def classify_update(update: Update) -> int:
+    """Update'in öncelik şeridi"""
+    from utils.catch_up import is_stale_message
+
+    if update.callback_query is not None:
+        return LANE_INTERACTIVE
+    message = update.message or update.edited_message
+    if message is not None:
+        # Eski update'ler canlı trafiğin arkasında (edit'lerde date orijinal mesajın)
+        if update.message is not None and is_stale_message(message):
+            return LANE_CATCHUP
+        if message.chat.type == "private":
+            return LANE_INTERACTIVE
+        text = message.text or ""
+        if text.startswith("/") or text.startswith("!"):
+            return LANE_INTERACTIVE
+        return LANE_ACCOUNTING
+    return LANE_BACKGROUND
+
+
+class PrioritySemaphore:
+    """Boşalan slotu en düşük şerit numaralı (sonra en eski) bekleyene veren semaphore"""
+
+    def __init__(self, value: int):
+        self._value = value
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+
+    async def acquire(self, lane: int) -> None:
+        if self._value > 0 and not self._waiters:
+            self._value -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (lane, next(self._counter), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot verilmişti ama iptal edildik - slotu devret
+                self.release()
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._value += 1
+
+    def waiting_by_lane(self) -> Dict[int, int]:
+        counts: Dict[int, int] = {}
+        for lane, _, future in self._waiters:
+            if not future.done():
+                counts[lane] = counts.get(lane, 0) + 1
+        return counts
+
+
+class LoadMonitor:
+    """Backlog doluluğu ve event loop gecikmesinden yük seviyesi hesaplar"""
+
+    def __init__(self):
+        self.level = LOAD_NORMAL
+        self.loop_lag = 0.0
+        self._below_since: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self.level_changes = 0
+
+    def start(self, executor: "UpdateExecutor") -> None:
+        if not self._task or self._task.done():
+            self._task = asyncio.create_task(self._run(executor))
+
+    def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+    async def _run(self, executor: "UpdateExecutor") -> None:
+        while True:
+            try:
+                started = time.monotonic()
+                await asyncio.sleep(LOOP_LAG_SAMPLE_INTERVAL)
+                lag = max(0.0, time.monotonic() - started - LOOP_LAG_SAMPLE_INTERVAL)
+                # Yumuşatılmış gecikme - tek seferlik takılmalar seviyeyi zıplatmasın
+                self.loop_lag = self.loop_lag * 0.7 + lag * 0.3
+                self.update(executor.pending / executor.max_backlog if executor.max_backlog else 0.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Load monitor hatası: {e}")
+                await asyncio.sleep(5)
+
+    def update(self, backlog_ratio: float) -> None:
+        target = LOAD_NORMAL
+        for level, (ratio_limit, lag_limit) in enumerate(zip(BACKLOG_RATIO_THRESHOLDS, LOOP_LAG_THRESHOLDS), start=1):
+            if backlog_ratio >= ratio_limit or self.loop_lag >= lag_limit:
+                target = level
+
+        now = time.monotonic()
+        if target > self.level:
+            self._set_level(target, backlog_ratio)
+            self._below_since = None
+        elif target < self.level:
+            # Kademeli dönüş - eşiklerin altında yeterince kalınca bir seviye in
+            if self._below_since is None:
+                self._below_since = now
+            elif now - self._below_since >= LOAD_RESTORE_DELAY:
+                self._set_level(self.level - 1, backlog_ratio)
+                self._below_since = now
+        else:
+            self._below_since = None
+
+    def _set_level(self, level: int, backlog_ratio: float) -> None:
+        logger.warning(
+            f"🚦 Yük seviyesi {self.level} → {level} "
+            f"(backlog: {backlog_ratio:.0%}, loop gecikmesi: {self.loop_lag * 1000:.0f}ms)"
+        )
+        self.level = level
+        self.level_changes += 1
+
+    def should_skip_optional(self) -> bool:
+        """Opsiyonel işler (sohbet otomatik cevapları) atlanmalı mı"""
+        return self.level >= LOAD_ELEVATED
+
+    def should_defer_stats(self) -> bool:
+        """İstatistik yazımları write-behind buffer'a ertelenmeli mi"""
+        return self.level >= LOAD_CRITICAL
+
+
+# Global load monitor instance
+load_monitor = LoadMonitor()
+
+
+@dataclass
+class _KeyQueue:
+    """Tek bir chat/kullanıcı için seri kuyruk - tek slotluk öncelikli kilit"""
+    lock: PrioritySemaphore
+    waiting: int = 0
+
+
+class UpdateExecutor:
+    """Global semaphore + anahtar bazlı seri kuyruklar"""
+
+    def __init__(self, max_concurrency: int, max_backlog: int):
+        self.max_concurrency = max_concurrency
+        self.max_backlog = max_backlog
+        self._semaphore = PrioritySemaphore(max_concurrency)
+        self._queues: Dict[Any, _KeyQueue] = {}
+
+        # Metrikler
+        self.pending = 0          # kabul edilmiş, henüz bitmemiş update'ler
+        self.in_flight = 0        # şu an handler'da olanlar
+        self.max_pending = 0
+        self.processed = 0
+        self.dropped = 0
+        self.dropped_by_lane: Dict[int, int] = {}
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def run(self, key: Any, call: Callable[[], Awaitable[Any]], lane: int = LANE_INTERACTIVE) -> Any:
+        if self.pending >= self.max_backlog * LANE_BACKLOG_SHARE.get(lane, 1.0):
+            self.dropped += 1
+            self.dropped_by_lane[lane] = self.dropped_by_lane.get(lane, 0) + 1
+            if self.dropped % 100 == 1:
+                logger.warning(f"⚠️ Update backlog dolu ({self.pending}), {LANE_NAMES.get(lane, lane)} update düşürüldü - toplam düşen: {self.dropped}")
+            return UNHANDLED
+
+        arrived = time.monotonic()
+        self.pending += 1
+        self.max_pending = max(self.max_pending, self.pending)
+
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = _KeyQueue(lock=PrioritySemaphore(1))
+            self._queues[key] = queue
+        queue.waiting += 1
+
+        try:
+            # Önce sıra (anahtar içi, şerit öncelikli), sonra global slot - sırada bekleyen slot tutmaz
+            await queue.lock.acquire(lane)
+            try:
+                await self._semaphore.acquire(lane)
+                try:
+                    wait = time.monotonic() - arrived
+                    self.total_wait += wait
+                    self.max_wait = max(self.max_wait, wait)
+                    self.in_flight += 1
+                    try:
+                        return await call()
+                    finally:
+                        self.in_flight -= 1
+                        self.processed += 1
+                finally:
+                    self._semaphore.release()
+            finally:
+                queue.lock.release()
+        finally:
+            self.pending -= 1
+            queue.waiting -= 1
+            if queue.waiting == 0 and self._queues.get(key) is queue:
+                del self._queues[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        started = self.processed + self.in_flight
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_backlog": self.max_backlog,
+            "pending": self.pending,
+            "in_flight": self.in_flight,
+            "max_pending": self.max_pending,
+            "active_keys": len(self._queues),
+            "deepest_key_queue": max((q.waiting for q in self._queues.values()), default=0),
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "dropped_by_lane": {LANE_NAMES.get(lane, lane): count for lane, count in self.dropped_by_lane.items()},
+            "waiting_by_lane": {LANE_NAMES.get(lane, lane): count for lane, count in self._semaphore.waiting_by_lane().items()},
+            "load_level": load_monitor.level,
+            "loop_lag_ms": round(load_monitor.loop_lag * 1000, 1),
+            "avg_wait_ms": round(self.total_wait / started * 1000, 2) if started else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+        }
+
+
+def get_update_key(data: Dict[str, Any]) -> Any:
+    """Sıralama anahtarı - grupta (chat, kullanıcı), özelde chat, chat yoksa kullanıcı"""
+    chat = data.get("event_chat")
+    user = data.get("event_from_user")
+    if chat is not None:
+        if user is not None and chat.type != "private":
+            return ("chat_user", chat.id, user.id)
+        return ("chat", chat.id)
+    if user is not None:
+        return ("user", user.id)
+    return None
+
+
+class UpdateExecutionMiddleware(BaseMiddleware):
+    """Update outer middleware - her update'i executor üzerinden çalıştırır"""
+
+    def __init__(self, executor: UpdateExecutor):
+        self.executor = executor
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        key = get_update_key(data)
+        if key is None:
+            # Chat/kullanıcı bilgisi olmayan update (poll vb.) - kendi anahtarı
+            key = ("update", getattr(event, "update_id", id(event)))
+        lane = classify_update(event) if isinstance(event, Update) else LANE_BACKGROUND
+        return await self.executor.run(key, lambda: handler(event, data), lane)
+
+
+update_executor: Optional[UpdateExecutor] = None
+
+
+def setup_update_executor(dp: Dispatcher) -> UpdateExecutor:
+    """
+    Executor'ı oluştur ve dispatcher'a ekle.
+    UserContextMiddleware'den sonra çalışır (event_chat / event_from_user hazır);
+    FSMContextMiddleware'den önce eklenmeli - state okuması da limit altında kalsın.
+    """
+    global update_executor
+    from database import POOL_MAX_SIZE
+
+    config = get_config()
+    max_concurrency = config.UPDATE_MAX_CONCURRENCY or POOL_MAX_SIZE
+    update_executor = UpdateExecutor(max_concurrency, config.UPDATE_MAX_BACKLOG)
+    dp.update.outer_middleware(UpdateExecutionMiddleware(update_executor))
+    load_monitor.start(update_executor)
+    logger.info(f"🚦 Update executor hazır - eşzamanlılık: {max_concurrency}, backlog: {config.UPDATE_MAX_BACKLOG}")
+    return update_executor
+
+
+def get_update_executor_stats() -> Dict[str, Any]:
+    return update_executor.get_stats() if update_executor else {}
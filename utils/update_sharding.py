@@ -0,0 +1,324 @@
+"""
+🧩 Çoklu Worker Modu - Update'leri kullanıcıya göre worker'lara dağıtma
+BOT_WORKERS > 1 olduğunda `python main.py` bir ön alıcı (front) olarak
+çalışır: update'leri tek noktadan alır (polling ya da webhook) ve
+kullanıcı/chat ID'sine göre N worker process'ten birine Unix socket
+üzerinden satır satır JSON olarak iletir. Worker'lar aynı main.py'dir
+(KIRVEHUB_WORKER_INDEX ile başlatılır) ve update'leri kendi
+dispatcher'larına verir.
+
+Sharding anahtarı önce kullanıcı ID'sidir: bir kullanıcının özel
+mesajları, callback'leri ve grup mesajları hep aynı worker'a gider,
+böylece kullanıcı bazlı bellek state'i (input akışları, kullanıcı
+cooldown'ları, kullanıcı rate limit kovaları, flood cache) tek
+process'te kalır. Kalıcı olması gereken konuşma durumları zaten
+Postgres FSM storage'ta tutulur.
+
+Kullanıcılar arası / bot geneli bellek state'i:
+    • Bot geneli sohbet cevabı cooldown'u - worker modunda Postgres
+      shared_cooldowns kaydıyla alınır (utils.cooldown_manager)
+    • "global" rate limit - worker sayısına bölünür (utils.rate_limiter)
+    • Gecikmeli aksiyonlar - tablodan sadece lider yükler, çalıştırmadan
+      önce satır silinerek sahiplenilir (utils.delayed_actions)
+Process içinde kalan ve worker modunda kısmi görünen yapılar:
+    • Spam parmak izi grup ring'i ve global band indeksi: farklı
+      worker'lardaki kullanıcıların yakın kopya mesajları birbirini
+      görmez; kullanıcılar arası tespit, kopyalar aynı worker'a düşen
+      kullanıcılar arasında çalışır (kullanıcının kendi tekrarı tam)
+    • Mesaj silme ring buffer'ı: her worker sadece kendi gönderdiği bot
+      mesajlarını tutar; admin toplu silmesi komutu işleyen worker'ın
+      mesajlarını siler
+    • Admin bildirim özetleri: her worker kendi tamponunu gönderir,
+      aralık başına admin başına N'e kadar özet mesajı gider
+    • Sıralama indeksi / liderlik tabloları: diğer worker'ların yazdığı
+      point ve mesaj sayıları RANK_INDEX_RESYNC_INTERVAL (5 dk) içinde
+      yakalanır; o zamana kadar sıralar bayat olabilir
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+WORKER_INDEX_ENV = "KIRVEHUB_WORKER_INDEX"
+
+# Front'un aldığı update tipleri (handler'ların kullandıkları)
+ALLOWED_UPDATES = ["message", "callback_query"]
+
+# Worker bağlantısı yokken shard başına tutulacak update sayısı
+MAX_SHARD_BUFFER = 5000
+
+# Worker çökerse yeniden başlatma bekleme süresi (saniye)
+WORKER_RESTART_DELAY = 3
+
+
+def get_worker_index() -> Optional[int]:
+    """Bu process bir worker ise index'i, değilse None"""
+    value = os.getenv(WORKER_INDEX_ENV)
+    return int(value) if value not in (None, "") else None
+
+
+def is_primary_worker() -> bool:
+    """Tek process modu ya da worker 0 - singleton işler burada çalışır"""
+    index = get_worker_index()
+    return index is None or index == 0
+
+
+def get_worker_socket_path(index: int) -> str:
+    return os.path.join(get_config().WORKER_SOCKET_DIR, f"kirvehub_worker_{index}.sock")
+
+
+def get_shard_key(update: Dict[str, Any]) -> int:
+    """Ham update'ten sharding anahtarı - kullanıcı, yoksa chat, yoksa update_id"""
+    for field in ("message", "edited_message", "callback_query", "inline_query",
+                  "chat_member", "my_chat_member", "chat_join_request", "channel_post"):
+        event = update.get(field)
+        if not event:
+            continue
+        user = event.get("from")
+        if user and user.get("id"):
+            return int(user["id"])
+        chat = event.get("chat") or (event.get("message") or {}).get("chat")
+        if chat and chat.get("id"):
+            return int(chat["id"])
+    return int(update.get("update_id", 0))
+
+
+# ==============================================
+# WORKER TARAFI
+# ==============================================
+
+async def run_shard_worker(dp, bot, index: int) -> None:
+    """Front'tan gelen update'leri socket'ten okuyup dispatcher'a ver"""
+    socket_path = get_worker_socket_path(index)
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    async def handle_front(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        logger.info(f"🧩 Worker {index}: front bağlandı")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    raw_update = json.loads(line)
+                except ValueError:
+                    logger.warning(f"⚠️ Worker {index}: bozuk update satırı atlandı")
+                    continue
+                # Sıralama/eşzamanlılık update executor middleware'inde
+                asyncio.create_task(_feed(dp, bot, raw_update))
+        finally:
+            writer.close()
+            logger.info(f"🧩 Worker {index}: front bağlantısı kapandı")
+
+    # Uzun mesaj/caption içeren update'ler varsayılan 64KB satır limitini aşabilir
+    server = await asyncio.start_unix_server(handle_front, path=socket_path, limit=2 ** 20)
+    await dp.emit_startup(bot=bot, dispatcher=dp, **dp.workflow_data)
+    logger.info(f"🧩 Worker {index} hazır: {socket_path}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await dp.emit_shutdown(bot=bot, dispatcher=dp, **dp.workflow_data)
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+async def _feed(dp, bot, raw_update: Dict[str, Any]) -> None:
+    try:
+        await dp.feed_raw_update(bot, raw_update)
+    except Exception as e:
+        logger.error(f"❌ Update işleme hatası (update_id={raw_update.get('update_id')}): {e}")
+
+
+# ==============================================
+# FRONT TARAFI
+# ==============================================
+
+class WorkerLink:
+    """Tek bir worker process'i ve ona giden update kuyruğu"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=MAX_SHARD_BUFFER)
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.sent = 0
+        self.dropped = 0
+
+    def submit(self, raw_update: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(raw_update)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped % 100 == 1:
+                logger.warning(f"⚠️ Worker {self.index} kuyruğu dolu, update düşürüldü - toplam: {self.dropped}")
+
+    async def supervise(self) -> None:
+        """Worker process'ini çalıştır, çökerse yeniden başlat"""
+        while True:
+            env = dict(os.environ, **{WORKER_INDEX_ENV: str(self.index)})
+            self.process = await asyncio.create_subprocess_exec(
+                sys.executable, os.path.abspath(sys.argv[0]), env=env
+            )
+            logger.info(f"🧩 Worker {self.index} başlatıldı (PID: {self.process.pid})")
+            code = await self.process.wait()
+            logger.error(f"❌ Worker {self.index} kapandı (kod: {code}), {WORKER_RESTART_DELAY}s sonra yeniden başlatılıyor")
+            await asyncio.sleep(WORKER_RESTART_DELAY)
+
+    async def pump(self) -> None:
+        """Kuyruktaki update'leri worker socket'ine yaz, bağlantı koparsa yeniden bağlan"""
+        socket_path = get_worker_socket_path(self.index)
+        pending: Optional[bytes] = None
+        while True:
+            try:
+                _, writer = await asyncio.open_unix_connection(socket_path)
+            except (FileNotFoundError, ConnectionRefusedError):
+                await asyncio.sleep(1)
+                continue
+
+            try:
+                while True:
+                    if pending is None:
+                        pending = (json.dumps(await self.queue.get(), ensure_ascii=False) + "\n").encode()
+                    writer.write(pending)
+                    await writer.drain()
+                    pending = None
+                    self.sent += 1
+            except (ConnectionError, OSError) as e:
+                logger.warning(f"⚠️ Worker {self.index} bağlantısı koptu: {e}")
+                await asyncio.sleep(1)
+            finally:
+                writer.close()
+
+    def stop(self) -> None:
+        if self.process and self.process.returncode is None:
+            self.process.terminate()
+
+
+class ShardFront:
+    """Update'leri tek noktadan alıp worker'lara dağıtan ön alıcı"""
+
+    def __init__(self, worker_count: int):
+        self.links: List[WorkerLink] = [WorkerLink(i) for i in range(worker_count)]
+        self._tasks: List[asyncio.Task] = []
+
+    def route(self, raw_update: Dict[str, Any]) -> None:
+        self.links[get_shard_key(raw_update) % len(self.links)].submit(raw_update)
+
+    def start_workers(self) -> None:
+        for link in self.links:
+            self._tasks.append(asyncio.create_task(link.supervise()))
+            self._tasks.append(asyncio.create_task(link.pump()))
+
+    def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for link in self.links:
+            link.stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            f"worker_{link.index}": {
+                "queued": link.queue.qsize(),
+                "sent": link.sent,
+                "dropped": link.dropped,
+                "pid": link.process.pid if link.process else None,
+            }
+            for link in self.links
+        }
+
+    async def poll(self) -> None:
+        """getUpdates long polling - ham JSON'u parse etmeden worker'a yönlendir"""
+        import aiohttp
+
+        config = get_config()
+        url = f"https://api.telegram.org/bot{config.BOT_TOKEN}"
+        offset = None
+        async with aiohttp.ClientSession() as session:
+            # Daha önce webhook modunda çalıştıysa getUpdates çakışmasın
+            await session.post(f"{url}/deleteWebhook", json={"drop_pending_updates": False})
+            while True:
+                try:
+                    payload = {"timeout": 50, "allowed_updates": ALLOWED_UPDATES}
+                    if offset is not None:
+                        payload["offset"] = offset
+                    async with session.post(f"{url}/getUpdates", json=payload, timeout=aiohttp.ClientTimeout(total=60)) as response:
+                        data = await response.json()
+                    if not data.get("ok"):
+                        logger.error(f"❌ getUpdates hatası: {data.get('description')}")
+                        await asyncio.sleep(5)
+                        continue
+                    for raw_update in data["result"]:
+                        offset = raw_update["update_id"] + 1
+                        self.route(raw_update)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"❌ Front polling hatası: {e}")
+                    await asyncio.sleep(5)
+
+    async def serve_webhook(self) -> None:
+        """Webhook alıcısı - secret token doğrula, shard'a ver, hemen 200 dön"""
+        from aiohttp import web
+        from utils.webhook_server import SECRET_HEADER, require_webhook_secret, verify_webhook_secret
+
+        config = get_config()
+        if not config.WEBHOOK_BASE_URL:
+            raise ValueError("WEBHOOK_BASE_URL ayarlanmadan webhook modu kullanılamaz")
+        secret = require_webhook_secret(config)
+
+        async def webhook_handler(request: web.Request) -> web.Response:
+            # Sahte update tüm worker'lara yayılmasın - secret her istekte zorunlu
+            if not verify_webhook_secret(request.headers.get(SECRET_HEADER, ""), secret):
+                return web.Response(status=401)
+            self.route(await request.json())
+            return web.Response(status=200)
+
+        async def health_handler(request: web.Request) -> web.Response:
+            return web.json_response({"status": "ok", "mode": "webhook-front", "workers": self.get_stats()})
+
+        app = web.Application()
+        app.router.add_post(config.WEBHOOK_PATH, webhook_handler)
+        app.router.add_get("/health", health_handler)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host=config.WEBAPP_HOST, port=config.WEBAPP_PORT).start()
+
+        from aiogram import Bot
+        bot = Bot(token=config.BOT_TOKEN)
+        try:
+            await bot.set_webhook(
+                url=config.WEBHOOK_BASE_URL.rstrip("/") + config.WEBHOOK_PATH,
+                secret_token=secret,
+                allowed_updates=ALLOWED_UPDATES,
+                drop_pending_updates=False,
+            )
+        finally:
+            await bot.session.close()
+
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+
+
+async def run_front() -> None:
+    """Worker'ları başlat ve update'leri dağıt (BOT_WORKERS > 1)"""
+    config = get_config()
+    front = ShardFront(config.BOT_WORKERS)
+    front.start_workers()
+    logger.info(f"🧩 Front başlatıldı - {config.BOT_WORKERS} worker, mod: {config.BOT_MODE}")
+    try:
+        if config.BOT_MODE == "webhook":
+            await front.serve_webhook()
+        else:
+            await front.poll()
+    finally:
+        front.stop()
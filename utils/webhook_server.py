@@ -0,0 +1,104 @@
+"""
+🌐 Webhook Sunucusu - aiogram aiohttp entegrasyonu
+BOT_MODE=webhook olduğunda polling yerine dahili aiohttp sunucusu
+çalışır. WEBHOOK_SECRET zorunludur (yoksa başlatılmaz); Telegram'ın
+X-Telegram-Bot-Api-Secret-Token header'ı her istekte sabit zamanlı
+karşılaştırılır - aksi halde URL'yi bilen herkes (örn. admin ID'siyle)
+sahte update gönderebilirdi. Update'ler arka planda işlenmek üzere
+kuyruğa verilip hemen 200 dönülür.
+/health endpoint'i load balancer / nginx kontrolleri içindir.
+"""
+
+import asyncio
+import hmac
+import logging
+
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+from config import Config, get_config
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def require_webhook_secret(config: Config) -> str:
+    """Webhook modunda WEBHOOK_SECRET zorunlu - yoksa başlatma"""
+    if not config.WEBHOOK_SECRET:
+        raise ValueError("WEBHOOK_SECRET ayarlanmadan webhook modu kullanılamaz")
+    return config.WEBHOOK_SECRET
+
+
+def verify_webhook_secret(header_value: str, secret: str) -> bool:
+    """Secret token header'ı sabit zamanlı karşılaştır - boş secret hiçbir isteği kabul etmez"""
+    if not secret:
+        return False
+    return hmac.compare_digest((header_value or "").encode(), secret.encode())
+
+
+class _SecretCheckedRequestHandler(SimpleRequestHandler):
+    """aiogram handler'ı - secret boşsa da her isteği reddeder"""
+
+    def verify_secret(self, telegram_secret_token: str, bot: Bot) -> bool:
+        return verify_webhook_secret(telegram_secret_token, self.secret_token)
+
+
+async def health_handler(request: web.Request) -> web.Response:
+    """Basit sağlık kontrolü + update kuyruğu durumu"""
+    from utils.update_executor import get_update_executor_stats
+
+    return web.json_response({
+        "status": "ok",
+        "mode": "webhook",
+        "updates": get_update_executor_stats(),
+    })
+
+
+def build_webhook_app(dp: Dispatcher, bot: Bot) -> web.Application:
+    config = get_config()
+    secret = require_webhook_secret(config)
+    app = web.Application()
+    app.router.add_get("/health", health_handler)
+
+    # handle_in_background=True: Telegram'a hemen 200, işleme task'ta
+    _SecretCheckedRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=secret,
+        handle_in_background=True,
+    ).register(app, path=config.WEBHOOK_PATH)
+
+    # Dispatcher startup/shutdown hook'larını aiohttp yaşam döngüsüne bağla
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot) -> None:
+    """Webhook'u kaydet ve sunucuyu iptal edilene kadar çalıştır"""
+    config = get_config()
+    if not config.WEBHOOK_BASE_URL:
+        raise ValueError("WEBHOOK_BASE_URL ayarlanmadan webhook modu kullanılamaz")
+    secret = require_webhook_secret(config)
+
+    app = build_webhook_app(dp, bot)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host=config.WEBAPP_HOST, port=config.WEBAPP_PORT)
+    await site.start()
+
+    webhook_url = config.WEBHOOK_BASE_URL.rstrip("/") + config.WEBHOOK_PATH
+    await bot.set_webhook(
+        url=webhook_url,
+        secret_token=secret,
+        allowed_updates=dp.resolve_used_update_types(),
+        drop_pending_updates=False,
+    )
+    logger.info(f"🌐 Webhook aktif: {webhook_url} (dinleniyor: {config.WEBAPP_HOST}:{config.WEBAPP_PORT})")
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+        logger.info("🌐 Webhook sunucusu kapatıldı")
@@ -0,0 +1,81 @@
+"""
+🎲 Kazanan Seçimi - Ağırlıklı rezervuar örnekleme (A-ExpJ)
+Katılımcılar tek geçişte akıtılır, bellekte sadece k aday tutulur:
+    • Her katılımcının seçilme şansı ağırlığıyla (katılım miktarı) orantılı
+      - Efraimidis & Spirakis: anahtar = u^(1/w), en büyük k anahtar kazanır
+    • Exponential jumps: rezervuar dolduktan sonra her katılımcı için
+      rastgele sayı çekilmez, atlanacak toplam ağırlık bir kerede çekilir
+    • Anahtarlar log uzayında tutulur (büyük ağırlıklarda hassasiyet kaybı yok)
+Aynı tohum (seed) + aynı katılımcı sırası = aynı kazananlar; çekiliş
+sonradan denetlenebilir.
+"""
+
+import heapq
+import math
+import random
+import secrets
+from typing import Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Ağırlığı 0 olan (ücretsiz) katılımcılar için taban ağırlık
+MIN_WINNER_WEIGHT = 0.01
+
+
+def new_draw_seed() -> int:
+    """Denetim için loglanacak 64-bit çekiliş tohumu"""
+    return secrets.randbits(64)
+
+
+class WeightedReservoir(Generic[T]):
+    """A-ExpJ - offer() ile akıt, result() ile kazananları al"""
+
+    def __init__(self, k: int, seed: Optional[int] = None):
+        self.k = k
+        self.rng = random.Random(seed)
+        self._heap: List[Tuple[float, int, T]] = []  # (log anahtar, sıra, öğe) - min-heap
+        self._skip = 0.0  # Sonraki değişime kadar atlanacak ağırlık
+        self.seen = 0
+
+    def _uniform(self) -> float:
+        # log(0) olmasın
+        return self.rng.random() or 5e-324
+
+    def _reset_skip(self) -> None:
+        # X_w = log(r) / log(T_w) - log(T_w) zaten heap'in tepesinde
+        self._skip = math.log(self._uniform()) / self._heap[0][0]
+
+    def offer(self, item: T, weight: float) -> None:
+        weight = max(float(weight or 0), MIN_WINNER_WEIGHT)
+        self.seen += 1
+        if self.k <= 0:
+            return
+
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, (math.log(self._uniform()) / weight, self.seen, item))
+            if len(self._heap) == self.k:
+                self._reset_skip()
+            return
+
+        self._skip -= weight
+        if self._skip > 0:
+            return
+
+        # Bu öğe rezervuara girer - anahtarı (T_w^w, 1) aralığından çekilir
+        threshold = math.exp(self._heap[0][0] * weight)
+        r = threshold + self._uniform() * (1.0 - threshold)
+        key = math.log(r) / weight if r < 1.0 else -5e-324
+        heapq.heapreplace(self._heap, (key, self.seen, item))
+        self._reset_skip()
+
+    def result(self) -> List[T]:
+        """Kazananlar - anahtarı en büyükten küçüğe (1. kazanan ilk)"""
+        return [item for _, _, item in sorted(self._heap, reverse=True)]
+
+
+def weighted_sample(items: List[Tuple[T, float]], k: int, seed: Optional[int] = None) -> List[T]:
+    """(öğe, ağırlık) listesinden k tekrarsız ağırlıklı örnek"""
+    reservoir: WeightedReservoir[T] = WeightedReservoir(k, seed)
+    for item, weight in items:
+        reservoir.offer(item, weight)
+    return reservoir.result()